@@ -36,8 +36,20 @@ import zlib
 import copy
 import math
 import base64
+import struct
+import hashlib
+import tempfile
+import time
+import io
+import sqlite3
+import asyncio
 from binascii import Error as BinasciiError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, as_completed
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Generator
+from typing import TextIO
 import shutil
+import stat
 from enum import Enum
 try:
     from termcolor import cprint, colored
@@ -57,6 +69,11 @@ try:
 except ImportError:
     print("IMPORT ERROR: cryptography is not installed. Please install it with 'pip install -U cryptography' and try again.")
     sys.exit(1)
+try:
+    import numpy as np
+except ImportError:
+    print("IMPORT ERROR: numpy is not installed. Please install it with 'pip install -U numpy' and try again.")
+    sys.exit(1)
 
 
 # +------------------------------------+
@@ -71,7 +88,7 @@ SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 SCRIPT_NAME = os.path.basename(__file__)
 
 # Version of the script
-SCRIPT_VERSION = "2.4.0"
+SCRIPT_VERSION = "2.20.0"
 SCRIPT_VERSION_MAJOR = SCRIPT_VERSION.split('.', 1)[0]
 
 TIME_STEP_MS = 16.666
@@ -81,77 +98,45 @@ DEFAULT_ARGS = {
     'title': { 'value': ['MyCustomSong'], 'description': '' },
     'ffmpeg_path': { 'value': ['ffmpeg'], 'description': 'Tries to find ffmpeg on your system (PATH)' },
     'ffprobe_path': { 'value': ['ffprobe'], 'description': 'Tries to find ffprobe on your system (PATH)' },
-    'output_path': { 'value': ['.'], 'description': 'The current working directory' }
+    'output_path': { 'value': ['.'], 'description': 'The current working directory' },
+    'jobs': { 'value': os.cpu_count() or 1, 'description': 'The number of CPU cores' }
 }
 
-# Enums
-class Cols(Enum):
-    FIVE_ZONE = 0
-    FIFTEEN_ZONE = 1
-    ELEVEN_ZONE = 2 # Unused
-    THIRTY_THREE_ZONE = 3
-    THREE_ZONE = 4 # Unused
-    TWENTY_SIX_ZONE = 5
-    THIRTY_SIX_ZONE = 6
-    SIX_TWENTY_FIVE_ZONE = 7
-    SIX_ZONE = 8
-    SEVEN_ZONE = 9
-    ONE_SIXTY_NINE_ZONE = 10
-class PhoneModel(Enum):
-    PHONE1 = 0
-    PHONE2 = 1
-    PHONE2A = 2
-    PHONE3A = 3
-    PHONE3 = 4
-    PHONE4A = 5
-    PHONE4APRO = 6
-
-# Cols lookup tables
-STRING_TO_COLS: dict[Cols, str] = {
-    Cols.FIVE_ZONE: '5cols',
-    Cols.FIFTEEN_ZONE: '5cols',
-    Cols.THIRTY_THREE_ZONE: '33cols',
-    Cols.TWENTY_SIX_ZONE: '26cols',
-    Cols.THIRTY_SIX_ZONE: '36cols',
-    Cols.SIX_TWENTY_FIVE_ZONE: '625cols',
-    Cols.SIX_ZONE: '6cols',
-    Cols.SEVEN_ZONE: '7cols',
-    Cols.ONE_SIXTY_NINE_ZONE: '169cols',
-}
-N_COLUMNS_TO_COLS = {
-    5: Cols.FIVE_ZONE,
-    15: Cols.FIFTEEN_ZONE,
-    33: Cols.THIRTY_THREE_ZONE,
-    26: Cols.TWENTY_SIX_ZONE,
-    36: Cols.THIRTY_SIX_ZONE,
-    625: Cols.SIX_TWENTY_FIVE_ZONE,
-    6: Cols.SIX_ZONE,
-    7: Cols.SEVEN_ZONE,
-    169: Cols.ONE_SIXTY_NINE_ZONE,
-}
+# Device profiles - describe the columns models of each phone model. Shared with the GlyphTranslator.
+DEVICE_PROFILES_FILE = os.path.join(SCRIPT_DIR, 'DeviceProfiles.json')
 
-# Device codename lookup table (used for the composer tag)
-DEVICE_CODENAME = {
-    Cols.FIVE_ZONE: 'Spacewar',
-    Cols.FIFTEEN_ZONE: 'Spacewar',
-    Cols.THIRTY_THREE_ZONE: 'Pong',
-    Cols.TWENTY_SIX_ZONE: 'Pacman',
-    Cols.THIRTY_SIX_ZONE: 'Asteroids',
-    Cols.SIX_TWENTY_FIVE_ZONE: 'Metroid',
-    Cols.SIX_ZONE: 'Frogger',
-    Cols.SEVEN_ZONE: 'Frogger',
-    Cols.ONE_SIXTY_NINE_ZONE: 'FroggerPro',
-}
-STRING_COLS_TO_PHONE_MODEL = {
-    '5cols': PhoneModel.PHONE1,
-    '33cols': PhoneModel.PHONE2,
-    '26cols': PhoneModel.PHONE2A,
-    '36cols': PhoneModel.PHONE3A,
-    '625cols': PhoneModel.PHONE3,
-    '6cols': PhoneModel.PHONE4A,
-    '7cols': PhoneModel.PHONE4A,
-    '169cols': PhoneModel.PHONE4APRO,
-}
+# Base directory for all caches
+CACHE_DIR = os.path.join(os.environ.get('LOCALAPPDATA', '') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME', '') or os.path.join(os.path.expanduser('~'), '.cache'), 'custom-nothing-glyph-tools')
+
+# Watermark key cache - deriving a key takes about half a second, so the keys can optionally be stored on disk. Shared with the GlyphTranslator.
+KEY_CACHE_DIR = os.path.join(CACHE_DIR, 'watermark-keys')
+KEY_CACHE_MAX_ENTRIES = 1000
+KEY_CACHE_MAX_AGE_S = 30 * 24 * 60 * 60
+
+# Transcode cache - converting the audio to opus takes a while, so the converted audio can optionally be stored on disk and reused for the same source audio
+TRANSCODE_CACHE_DIR = os.path.join(CACHE_DIR, 'transcoded-audio')
+TRANSCODE_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024
+
+# Capabilities of ffmpeg and ffprobe (version, build date, opus encoders) - cached per executable so they don't have to be started on every run
+TOOL_CAPABILITIES_CACHE_FILE = os.path.join(CACHE_DIR, 'tool-capabilities.json')
+TOOL_CAPABILITIES_CACHE_VERSION = 1
+
+# Payloads from this size on are compressed on multiple threads in blocks of this size (the same block size as pigz)
+PARALLEL_DEFLATE_MIN_SIZE = 1024 * 1024
+PARALLEL_DEFLATE_BLOCK_SIZE = 128 * 1024
+
+# How the AUTHOR data is fitted to the length of the audio: fill missing lines with zeros, also cut the lines after the end of the audio or stretch the whole timeline
+AUTHOR_FIT_MODES = ['pad', 'trim', 'stretch']
+
+# Catalog of the scan subcommand - a SQLite database with one row per scanned audio file
+CATALOG_FILE_NAME = 'glyph_catalog.sqlite'
+CATALOG_SCHEMA_VERSION = 1
+SCAN_AUDIO_EXTENSIONS = ['.ogg']
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# nglyph v2 files start with this magic number, the AUTHOR payload starts at a multiple of the alignment so it can be memory-mapped
+NGLYPH_V2_MAGIC = b'NGLYPHv2'
+NGLYPH_V2_ALIGNMENT = 64
 
 # +------------------------------------+
 # |                                    |
@@ -170,6 +155,8 @@ def build_arguments_parser() -> argparse.ArgumentParser:
     global_argument_group.add_argument('--ffmpeg', help=f"Path to ffmpeg executable. - default: '{DEFAULT_ARGS['ffmpeg_path']['value'][0]}' -> {DEFAULT_ARGS['ffmpeg_path']['description']}", default=copy.deepcopy(DEFAULT_ARGS['ffmpeg_path']['value']), type=str, nargs=1, dest='ffmpeg_path') # ffmpeg_path
     global_argument_group.add_argument('--ffprobe', help=f"Path to ffprobe executable. - default: '{DEFAULT_ARGS['ffprobe_path']['value'][0]}' -> {DEFAULT_ARGS['ffprobe_path']['description']}", default=copy.deepcopy(DEFAULT_ARGS['ffprobe_path']['value']), type=str, nargs=1, dest='ffprobe_path') # ffprobe_path
     global_argument_group.add_argument('--disable-ff-v-check', help="WARNING: Only do this if you know what you are doing! Disable the version check for ffmpeg AND ffprobe.", action='store_true', dest='disable_ff_v_check') # disable_ff_v_check
+    global_argument_group.add_argument('--key-cache', help=f"Cache the derived watermark keys on disk. Only the current user can read the cache. Optionally takes the cache directory. - default: '{KEY_CACHE_DIR}'", type=str, nargs='?', const=KEY_CACHE_DIR, metavar='DIR', dest='key_cache') # key_cache
+    global_argument_group.add_argument('--transcode-cache', help=f"Cache the audio that was converted to opus on disk and reuse it for the same source audio. The least recently used files are removed above {TRANSCODE_CACHE_MAX_SIZE // 1024 // 1024}MiB. Optionally takes the cache directory. - default: '{TRANSCODE_CACHE_DIR}'", type=str, nargs='?', const=TRANSCODE_CACHE_DIR, metavar='DIR', dest='transcode_cache') # transcode_cache
     global_argument_group.add_argument('--version', action='version', help='Show the version number and exit.', version=SCRIPT_VERSION) # version
     global_argument_group.add_argument('-h', '--help', action='help', help='Show this help message and exit.')
 
@@ -183,97 +170,194 @@ def build_arguments_parser() -> argparse.ArgumentParser:
     write_parser = subparsers.add_parser('write', aliases=['w'], help='Write metadata to the audio file.', parents=[parent_parser], add_help=False)
     write_argument_group = write_parser.add_argument_group(title='Write arguments', description="These arguments are used by the 'write' subcommand.")
     write_argument_group.add_argument('NGLYPH_PATH', help="A path to the nglyph file to write from.", type=str, nargs=1) # NGLYPH_PATH
-    write_argument_group.add_argument('AUDIO_PATH', help="A path to the audio file to write to.", type=str, nargs=1) # AUDIO_PATH
+    write_argument_group.add_argument('AUDIO_PATH', help="A path to the audio file to write to. Multiple audio files get the same composition - the nglyph file is only read and encoded once and the audio files are written in parallel. There are no prompts then.", type=str, nargs='+') # AUDIO_PATH
     write_argument_group.add_argument('-t', help=f"What title to write into the metadata. - default: '{DEFAULT_ARGS['title']['value'][0]}'", default=copy.deepcopy(DEFAULT_ARGS['title']['value']), type=str, nargs=1, metavar=('TITLE'), dest='title') # title
+    write_argument_group.add_argument('-j', '--jobs', help=f"The number of audio files that are written in parallel. - default: {DEFAULT_ARGS['jobs']['value']} -> {DEFAULT_ARGS['jobs']['description']}", type=int, default=DEFAULT_ARGS['jobs']['value'], dest='jobs') # jobs
     write_argument_group.add_argument('--auto-fix-audio', help="Do not ask for confirmation and automatically fix the audio file if the codec or extension is wrong.", action='store_true', dest='auto_fix_audio') # auto_fix_audio
+    write_argument_group.add_argument('--keep-fixed-audio', help="Also keep a fixed copy ('_fixed.ogg') of the audio file if its codec or extension is wrong. By default the audio file is fixed while writing the composition.", action='store_true', dest='keep_fixed_audio') # keep_fixed_audio
+    write_argument_group.add_argument('--fit', help="How to fit the AUTHOR data to the length of the audio. 'pad' fills missing lines with zeros, 'trim' also cuts the lines after the end of the audio and 'stretch' stretches or compresses the whole light timeline to the length of the audio. - default: 'pad'", type=str, choices=AUTHOR_FIT_MODES, default=AUTHOR_FIT_MODES[0], dest='fit_mode') # fit_mode
+    write_argument_group.add_argument('--timings', help="Print how long each stage of the write took. Only for a single audio file.", action='store_true', dest='timings') # timings
+    write_argument_group.add_argument('--in-place', help="Write the metadata into the audio file itself instead of creating a new '_composed' file (the output path is ignored). Space for later changes is reserved, so writing again only has to update the metadata and not the whole file.", action='store_true', dest='in_place') # in_place
 
     # Read subcommand
     read_parser = subparsers.add_parser('read', aliases=['r'], help='Read metadata from the audio file.', parents=[parent_parser], add_help=False)
     read_argument_group = read_parser.add_argument_group(title='Read arguments', description="These arguments are used by the 'read' subcommand.")
     read_argument_group.add_argument('AUDIO_PATH', help="A path to the audio file to read from.", type=str, nargs=1) # AUDIO_PATH
 
+    # Batch subcommand
+    batch_parser = subparsers.add_parser('batch', aliases=['b'], help='Write metadata to many audio files listed in a manifest.', parents=[parent_parser], add_help=False)
+    batch_argument_group = batch_parser.add_argument_group(title='Batch arguments', description="These arguments are used by the 'batch' subcommand.")
+    batch_argument_group.add_argument('MANIFEST_PATH', help="A path to the manifest file. Either a CSV file with the columns 'nglyph', 'audio' and optionally 'title' or a JSON file with a list of objects with these keys. Relative paths are relative to the manifest file.", type=str, nargs=1) # MANIFEST_PATH
+    batch_argument_group.add_argument('-t', help=f"What title to write into the metadata if the entry has none. - default: '{DEFAULT_ARGS['title']['value'][0]}'", default=copy.deepcopy(DEFAULT_ARGS['title']['value']), type=str, nargs=1, metavar=('TITLE'), dest='title') # title
+    batch_argument_group.add_argument('-j', '--jobs', help=f"The number of entries that are processed in parallel. - default: {DEFAULT_ARGS['jobs']['value']} -> {DEFAULT_ARGS['jobs']['description']}", type=int, default=DEFAULT_ARGS['jobs']['value'], dest='jobs') # jobs
+    batch_argument_group.add_argument('--report', help="Where to write the JSON report with the result of every entry. - default: '<output path>/<manifest name>_report.json'", type=str, nargs=1, dest='report_path') # report_path
+    batch_argument_group.add_argument('--auto-fix-audio', help="Automatically fix audio files with the wrong codec or extension. Without it these entries fail - there are no prompts in batch mode.", action='store_true', dest='auto_fix_audio') # auto_fix_audio
+    batch_argument_group.add_argument('--fit', help="How to fit the AUTHOR data to the length of the audio. 'pad' fills missing lines with zeros, 'trim' also cuts the lines after the end of the audio and 'stretch' stretches or compresses the whole light timeline to the length of the audio. - default: 'pad'", type=str, choices=AUTHOR_FIT_MODES, default=AUTHOR_FIT_MODES[0], dest='fit_mode') # fit_mode
+    batch_argument_group.add_argument('--keep-fixed-audio', help="Also keep a fixed copy ('_fixed.ogg') of the audio files that are fixed. By default the audio file is fixed while writing the composition.", action='store_true', dest='keep_fixed_audio') # keep_fixed_audio
+
+    # Scan subcommand
+    scan_parser = subparsers.add_parser('scan', aliases=['s'], help='Read the metadata from all audio files in a directory and index them in a catalog.', parents=[parent_parser], add_help=False)
+    scan_argument_group = scan_parser.add_argument_group(title='Scan arguments', description="These arguments are used by the 'scan' subcommand.")
+    scan_argument_group.add_argument('SCAN_PATH', help=f"A path to the directory to scan. All {', '.join(SCAN_AUDIO_EXTENSIONS)} files in it and its subdirectories are read. The nglyph files are written to the output path in the same directory structure.", type=str, nargs=1) # SCAN_PATH
+    scan_argument_group.add_argument('-j', '--jobs', help=f"The number of files that are read in parallel. - default: {DEFAULT_ARGS['jobs']['value']} -> {DEFAULT_ARGS['jobs']['description']}", type=int, default=DEFAULT_ARGS['jobs']['value'], dest='jobs') # jobs
+    scan_argument_group.add_argument('--catalog', help=f"Where to store the SQLite catalog. Files that did not change since the last scan are skipped. - default: '<output path>/{CATALOG_FILE_NAME}'", type=str, nargs=1, dest='catalog_path') # catalog_path
+
+    # Query subcommand
+    query_parser = subparsers.add_parser('query', aliases=['q'], help='List the audio files in a catalog created by the scan subcommand.', parents=[parent_parser], add_help=False)
+    query_argument_group = query_parser.add_argument_group(title='Query arguments', description="These arguments are used by the 'query' subcommand. All given filters must match.")
+    query_argument_group.add_argument('CATALOG_PATH', help="A path to the catalog to query.", type=str, nargs=1) # CATALOG_PATH
+    query_argument_group.add_argument('--phone-model', help=f"Only list compositions for this phone model. ({', '.join(phone_model.name for phone_model in PhoneModel)})", type=str.upper, choices=[phone_model.name for phone_model in PhoneModel], dest='phone_model') # phone_model
+    query_argument_group.add_argument('--legacy', help="Only list \"old\" compositions that might desync.", action='store_true', dest='legacy') # legacy
+    query_argument_group.add_argument('--watermark', help="Only list compositions with a watermark.", action='store_true', dest='watermark') # watermark
+    query_argument_group.add_argument('--failed', help="Only list the files that could not be read.", action='store_true', dest='failed') # failed
+
+    # Convert subcommand
+    convert_parser = subparsers.add_parser('convert', aliases=['c'], help='Convert a nglyph file to another format version.', parents=[parent_parser], add_help=False)
+    convert_argument_group = convert_parser.add_argument_group(title='Convert arguments', description="These arguments are used by the 'convert' subcommand.")
+    convert_argument_group.add_argument('NGLYPH_PATH', help="A path to the nglyph file to convert.", type=str, nargs=1) # NGLYPH_PATH
+    convert_argument_group.add_argument('--to', help="The format version to convert to. Version 1 is json, version 2 is a binary format that loads a lot faster. - default: 2", type=int, choices=NGlyphFile.SUPPORTED_FORMAT_VERSIONS, default=2, dest='to_version') # to_version
+
     return parser
 
 # Check the requirements
-def check_requirements(ffmpeg: str, ffprobe: str, write: bool, disable_ff_v_check: bool):
-    if write:
-        try:
-            # Check if ffmpeg is installed - write metadata
-            ffmpeg_result = subprocess.run([ffmpeg, "-version"],  capture_output=True, text=True)
-            if ffmpeg_result.returncode != 0:
-                raise FileNotFoundError
-        except FileNotFoundError:
-            print_critical_error(f"ffmpeg could not be found. ({ffmpeg})")
-        
-        if not disable_ff_v_check:
-            # Check if the ffmpeg version is at least 4.4.0 or newer than 2021-04-08
-            ffmpeg_version = re.search(r'ffmpeg version n?(\d+)\.(\d+)(?:\.(\d+))?', ffmpeg_result.stdout)
-            ffmpeg_date = re.search(r'ffmpeg version (\d{4})-(\d{2})-(\d{2})|ffmpeg version N-\d+-\w+-(\d{4})(\d{2})(\d{2})', ffmpeg_result.stdout)
-
-            # Check if we have a match
-            if (ffmpeg_version is None) and (ffmpeg_date is None):
-                print_critical_error(f"Could not check that the ffmpeg version is above 4.4.0 or newer than 2021-04-08! It you are sure that it is, you can disable this check by passing '--disable-ff-v-check' to the script. See '{SCRIPT_NAME} --help' for more info.")
-            
-            # Debug print the groups of the match
-            print_debug(f"ffmpeg_version groups: {ffmpeg_version.groups() if ffmpeg_version is not None else None}")
-            print_debug(f"ffmpeg_date groups: {ffmpeg_date.groups() if ffmpeg_date is not None else None}\n")
-
-            # Map the version to an int tuple
-            ffmpeg_version = tuple(map(lambda x: int(x) if x is not None else 0, ffmpeg_version.groups())) if ffmpeg_version is not None else None
-            ffmpeg_date = tuple(int(x) for x in ffmpeg_date.groups() if x is not None) if ffmpeg_date is not None else None
+def check_requirements(ffmpeg: str, ffprobe: str, write: bool, disable_ff_v_check: bool, check_ffprobe: bool = True, check_ffmpeg: bool = True):
+    # Ogg Opus files are written directly - ffmpeg is only needed to write or convert other files
+    if write and check_ffmpeg:
+        check_tool(ffmpeg, 'ffmpeg', disable_ff_v_check)
 
-            print_debug(f"ffmpeg_version: {ffmpeg_version}")
-            print_debug(f"ffmpeg_date: {ffmpeg_date}\n")
+    # We need ffprobe for both reading and writing (reading: get the metadata, writing: check the audio codec) - but not for Ogg files, those are read directly
+    if check_ffprobe:
+        check_tool(ffprobe, 'ffprobe', disable_ff_v_check)
 
-            if ((ffmpeg_version is not None) and (ffmpeg_version < (4, 4, 0))) or ((ffmpeg_date is not None) and (ffmpeg_date < (2021, 4, 8))):
-                print_critical_error(f"ffmpeg version is too old! (got: {ffmpeg_version if ffmpeg_version is not None else ffmpeg_date}, expected: 4.4.0 or higher or newer than 2021-04-08)")
+    if disable_ff_v_check:
+        # Print a warning if the ff_v_check is disabled
+        print_warning("The version check for ffmpeg and ffprobe is disabled!")
 
+# Check that ffmpeg or ffprobe can be run and is at least version 4.4.0 or newer than 2021-04-08
+def check_tool(tool_path: str, tool_name: str, disable_ff_v_check: bool) -> None:
+    capabilities = get_tool_capabilities(tool_path, tool_name)
+    if capabilities is None:
+        print_critical_error(f"{tool_name} could not be found. ({tool_path})")
+
+    if disable_ff_v_check:
+        return
+
+    tool_version = tuple(capabilities['version']) if capabilities['version'] is not None else None
+    tool_date = tuple(capabilities['date']) if capabilities['date'] is not None else None
+    print_debug(f"{tool_name}_version: {tool_version}")
+    print_debug(f"{tool_name}_date: {tool_date}\n")
+
+    # Check if we have a match
+    if (tool_version is None) and (tool_date is None):
+        print_critical_error(f"Could not check that the {tool_name} version is above 4.4.0 or newer than 2021-04-08! It you are sure that it is, you can disable this check by passing '--disable-ff-v-check' to the script. See '{SCRIPT_NAME} --help' for more info.")
+
+    if ((tool_version is not None) and (tool_version < (4, 4, 0))) or ((tool_date is not None) and (tool_date < (2021, 4, 8))):
+        print_critical_error(f"{tool_name} version is too old! (got: {tool_version if tool_version is not None else tool_date}, expected: 4.4.0 or higher or newer than 2021-04-08)")
+
+# Get the version, build date and opus encoders of ffmpeg or ffprobe. Returns None if the tool can't be run.
+# The result is cached per executable and only probed again if the size or modification time of the executable changes.
+def get_tool_capabilities(tool_path: str, tool_name: str) -> dict[str, ] | None:
+    resolved_path = shutil.which(tool_path)
+    if resolved_path is None:
+        return None
+    try:
+        stat = os.stat(resolved_path)
+    except OSError:
+        return None
 
+    cache = read_tool_capabilities_cache()
+    capabilities = cache.get(resolved_path, None)
+    if capabilities is not None and capabilities['size'] == stat.st_size and capabilities['mtime_ns'] == stat.st_mtime_ns:
+        print_debug(f"Using the cached {tool_name} capabilities: {capabilities}")
+        return capabilities
 
-    # We need ffprobe for both reading and writing (reading: get the metadata, writing: check the audio codec)
     try:
-        # Check if ffprobe is installed - read metadata
-        ffprobe_result = subprocess.run([ffprobe, "-version"],  capture_output=True, text=True)
-        if ffprobe_result.returncode != 0:
-            raise FileNotFoundError
-    except FileNotFoundError:
-        print_critical_error(f"ffprobe could not be found. ({ffprobe})")
-    
-    if not disable_ff_v_check:
-        # Check if the ffprobe version is at least 4.4.0 or newer than 2021-04-08
-        ffprobe_version = re.search(r'ffprobe version n?(\d+)\.(\d+)(?:\.(\d+))?', ffprobe_result.stdout)
-        ffprobe_date = re.search(r'ffprobe version (\d{4})-(\d{2})-(\d{2})|ffprobe version N-\d+-\w+-(\d{4})(\d{2})(\d{2})', ffprobe_result.stdout)
-
-        # Check if we have a match
-        if (ffprobe_version is None) and (ffprobe_date is None):
-            print_critical_error(f"Could not check that the ffprobe version is above 4.4.0 or newer than 2021-04-08! It you are sure that it is, you can disable this check by passing '--disable-ff-v-check' to the script. See '{SCRIPT_NAME} --help' for more info.")
-        
-        # Debug print the groups of the match
-        print_debug(f"ffprobe_version groups: {ffprobe_version.groups() if ffprobe_version is not None else None}")
-        print_debug(f"ffprobe_date groups: {ffprobe_date.groups() if ffprobe_date is not None else None}\n")
+        result = subprocess.run([resolved_path, "-version"], capture_output=True, text=True)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+
+    # Parse the version and the build date
+    tool_version = re.search(rf'{tool_name} version n?(\d+)\.(\d+)(?:\.(\d+))?', result.stdout)
+    tool_date = re.search(rf'{tool_name} version (\d{{4}})-(\d{{2}})-(\d{{2}})|{tool_name} version N-\d+-\w+-(\d{{4}})(\d{{2}})(\d{{2}})', result.stdout)
+    print_debug(f"{tool_name}_version groups: {tool_version.groups() if tool_version is not None else None}")
+    print_debug(f"{tool_name}_date groups: {tool_date.groups() if tool_date is not None else None}\n")
+    capabilities = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'version': [int(x) if x is not None else 0 for x in tool_version.groups()] if tool_version is not None else None,
+        'date': [int(x) for x in tool_date.groups() if x is not None] if tool_date is not None else None,
+        'opus_encoders': [],
+    }
 
-        # Map the version to an int tuple
-        ffprobe_version = tuple(map(lambda x: int(x) if x is not None else 0, ffprobe_version.groups())) if ffprobe_version is not None else None
-        ffprobe_date = tuple(int(x) for x in ffprobe_date.groups() if x is not None) if ffprobe_date is not None else None
+    # Find the available opus encoders - the lines look like ' A....D libopus              libopus Opus (codec opus)'
+    if tool_name == 'ffmpeg':
+        try:
+            result = subprocess.run([resolved_path, "-hide_banner", "-encoders"], capture_output=True, text=True)
+            encoders = re.findall(r'^\s*A[A-Z.]{5}\s+(\S+)', result.stdout, re.MULTILINE) if result.returncode == 0 else []
+            capabilities['opus_encoders'] = [encoder for encoder in FFmpeg.OPUS_ENCODERS if encoder in encoders]
+        except OSError:
+            pass
 
-        print_debug(f"ffprobe_version: {ffprobe_version}")
-        print_debug(f"ffprobe_date: {ffprobe_date}\n")
+    cache[resolved_path] = capabilities
+    write_tool_capabilities_cache(cache)
+    return capabilities
 
-        if ((ffprobe_version is not None) and (ffprobe_version < (4, 4, 0))) or ((ffprobe_date is not None) and (ffprobe_date < (2021, 4, 8))):
-            print_critical_error(f"ffprobe version is too old! (got: {ffprobe_version if ffprobe_version is not None else ffprobe_date}, expected: 4.4.0 or higher or newer than 2021-04-08)")
-    else:
-        # Print a warning if the ff_v_check is disabled
-        print_warning("The version check for ffmpeg and ffprobe is disabled!")
+def read_tool_capabilities_cache() -> dict[str, dict[str, ]]:
+    try:
+        with open(TOOL_CAPABILITIES_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Drop caches written by other versions of this script
+    if not isinstance(cache, dict) or cache.get('version', None) != TOOL_CAPABILITIES_CACHE_VERSION or not isinstance(cache.get('tools', None), dict):
+        return {}
+    return cache['tools']
+
+def write_tool_capabilities_cache(cache: dict[str, dict[str, ]]) -> None:
+    try:
+        os.makedirs(os.path.dirname(TOOL_CAPABILITIES_CACHE_FILE), exist_ok=True)
+        # Write to a temporary file first so other runs never see a half written cache
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(TOOL_CAPABILITIES_CACHE_FILE), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({ 'version': TOOL_CAPABILITIES_CACHE_VERSION, 'tools': cache }, f)
+            os.replace(temp_path, TOOL_CAPABILITIES_CACHE_FILE)
+        except OSError:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        # Not being able to store the cache is fine, the tools just have to be probed again next time
+        print_debug(f"Could not write the tool capabilities cache: {e}")
     
 
 # Perform argument checks
-def perform_checks(args: dict, write: bool):
-    # Check if the file exists
-    if not os.path.isfile(args['AUDIO_PATH'][0]):
-        raise Exception(f"Audio file does not exist: '{args['AUDIO_PATH'][0]}'")
-
-    # Check if we need to write metadata
-    if write:
+def perform_checks(args: dict, write: bool, convert: bool = False, batch: bool = False, scan: bool = False):
+    # Check if the file exists - converting does not need an audio file and the batch and scan files are checked one by one
+    if not convert and not batch and not scan:
+        for audio_path in args['AUDIO_PATH']:
+            if not os.path.isfile(audio_path):
+                raise Exception(f"Audio file does not exist: '{audio_path}'")
+
+    if batch:
+        # Check if the manifest file exists
+        if not os.path.isfile(args['MANIFEST_PATH'][0]):
+            raise Exception(f"The manifest file does not exist: '{args['MANIFEST_PATH'][0]}'")
+
+    if scan:
+        # Check if the directory exists
+        if not os.path.isdir(args['SCAN_PATH'][0]):
+            raise Exception(f"The directory to scan does not exist: '{args['SCAN_PATH'][0]}'")
+        if not os.path.isdir(os.path.dirname(args['catalog_path'][0])):
+            raise Exception(f"Can't write the catalog there! The directory structure does not exist: '{os.path.dirname(args['catalog_path'][0])}'")
+
+    # Check the number of jobs
+    if 'jobs' in args and args['jobs'] < 1:
+        raise Exception(f"The number of jobs must be at least 1, got {args['jobs']}.")
+
+    # Check if we need to read a nglyph file
+    if (write and not batch) or convert:
         # Check if the file exists
         if not os.path.isfile(args['NGLYPH_PATH'][0]):
             raise Exception(f"The nglyph file does not exist: '{args['NGLYPH_PATH'][0]}'")
@@ -311,16 +395,90 @@ def print_debug(message, start: str = "", **args):
 # |                                    |
 # +------------------------------------+
 
+# Error of reading or writing a composition - the command line prints it, the API raises it with the messages up to the error
+class GlyphModderError(Exception):
+    def __init__(self, message: str, messages: list[tuple[str, str]] | None = None) -> None:
+        super().__init__(message)
+        self.messages: list[tuple[str, str]] = messages if messages is not None else []
+
+# Collects the messages of reading or writing a composition as (level, text) with the level 'INFO', 'WARNING' or '' for plain output.
+# The command line also prints them to an output (e.g. sys.stdout) as they come in, the API only returns them.
+class MessageLog:
+    def __init__(self, output: TextIO | None = None) -> None:
+        self.output: TextIO | None = output
+        self.messages: list[tuple[str, str]] = []
+
+    def info(self, message: str, start: str = "") -> None:
+        self.messages.append(('INFO', message))
+        if self.output is not None:
+            print_info(message, start, file=self.output)
+
+    def warning(self, message: str, start: str = "") -> None:
+        self.messages.append(('WARNING', message))
+        if self.output is not None:
+            print_warning(message, start, file=self.output)
+
+    # Plain output - every line is indented with start and the values are printed in bold
+    def text(self, message: str, *values, start: str = "", end: str = "\n") -> None:
+        self.messages.append(('', message.format(*values) if values else message))
+        if self.output is not None:
+            message = message.format(*[colored(value, attrs=['bold']) for value in values]) if values else message
+            print(start + message.replace('\n', '\n' + start), end=end, file=self.output)
+
+class DeviceProfile:
+    # Exception for the DeviceProfile class
+    class DeviceProfileException(Exception):
+        pass
+
+    def __init__(self, phone_model: str, data: dict[str, ]) -> None:
+        self.phone_model: str = phone_model
+        self.codename: str = str(data['codename'])
+        self.columns_models: list[DeviceProfile.ColumnsModel] = [DeviceProfile.ColumnsModel(columns_model, phone_model, self.codename) for columns_model in data['columns_models']]
+
+    @staticmethod
+    def load(file_path: str) -> dict[str, 'DeviceProfile']:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data: dict[str, dict] = json.load(f)
+            return {phone_model: DeviceProfile(phone_model, profile) for phone_model, profile in data.items()}
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise DeviceProfile.DeviceProfileException(f"Could not load the device profiles from '{file_path}': {e}")
+
+    class ColumnsModel:
+        def __init__(self, data: dict[str, ], phone_model: str, codename: str) -> None:
+            self.name: str = str(data['name'])
+            self.columns: int = int(data['columns'])
+            self.custom2: str = str(data['custom2'])
+            self.phone_model: str = phone_model
+            self.codename: str = codename
+
+# Load the device profiles once and build the lookup tables - a broken profiles file must not exit a process that imports this module, so the error is kept until the profiles are used
+DEVICE_PROFILES_ERROR: str | None = None
+try:
+    DEVICE_PROFILES: dict[str, DeviceProfile] = DeviceProfile.load(DEVICE_PROFILES_FILE)
+except DeviceProfile.DeviceProfileException as e:
+    DEVICE_PROFILES = {}
+    DEVICE_PROFILES_ERROR = str(e)
+PhoneModel = Enum('PhoneModel', [(phone_model, n) for n, phone_model in enumerate(DEVICE_PROFILES.keys())])
+N_COLUMNS_TO_COLUMNS_MODEL: dict[int, DeviceProfile.ColumnsModel] = {columns_model.columns: columns_model for device_profile in DEVICE_PROFILES.values() for columns_model in device_profile.columns_models}
+CUSTOM2_TO_PHONE_MODEL: dict[str, PhoneModel] = {columns_model.custom2: PhoneModel[device_profile.phone_model] for device_profile in DEVICE_PROFILES.values() for columns_model in device_profile.columns_models}
+
+# Raise the error of loading the device profiles - main turns it into a critical error, the API into a GlyphModderError
+def check_device_profiles() -> None:
+    if DEVICE_PROFILES_ERROR is not None:
+        raise DeviceProfile.DeviceProfileException(DEVICE_PROFILES_ERROR)
+
 # Class for the nglyph file
 class NGlyphFile:
     # Constants
-    SUPPORTED_FORMAT_VERSIONS = [1] # Will most of the time only contain one element, but we can add more if we want to support multiple versions
+    SUPPORTED_FORMAT_VERSIONS = [1, 2] # Version 1 is json, version 2 is a json header followed by the binary AUTHOR data
 
     # Exception for the NGlyphFile class
     class NGlyphFileException(Exception):
         pass
     
-    def __init__(self, file_path: str):
+    # If data is given it is used instead of reading the file (v1 layout) - the file path is then only used in the messages
+    def __init__(self, file_path: str, data: dict[str, ] | None = None):
         self.file_path: str = file_path
         self.format_version: int = 0
         self.raw_data: bytes = b''
@@ -328,23 +486,42 @@ class NGlyphFile:
 
         self.phone_model: PhoneModel = PhoneModel.PHONE1
         self.author: AuthorData | None = None
+        # The AUTHOR data as it is stored in the file if it is encrypted
+        self.encrypted_author: AuthorData | None = None
         self.custom1: Custom1Data | None = None
         self.watermark: Watermark | None = None
         self.legacy: bool = False
 
-        # Check the file extension
-        if os.path.splitext(file_path)[1] != '.nglyph':
-            raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - Wrong extension. If you have a glypha and glyphc1 file then please consult the documentation on how to migrate your composition to the new format.")
-        
-        # Open the file and read the content
-        with open(file_path, 'rb') as f:
-            self.raw_data = f.read()
-        
-        # Parse json
-        try:
-            self.data = json.loads(self.raw_data)
-        except json.JSONDecodeError as e:
-            raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - Could not parse the json data.")
+        header_length: int = 0
+        is_v2 = False
+        if data is not None:
+            if not isinstance(data, dict):
+                raise NGlyphFile.NGlyphFileException(f"'{file_path}' is not valid nglyph data - It is not a dictionary.")
+            # Only a copy is changed
+            self.data = dict(data)
+        else:
+            # Check the file extension
+            if os.path.splitext(file_path)[1] != '.nglyph':
+                raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - Wrong extension. If you have a glypha and glyphc1 file then please consult the documentation on how to migrate your composition to the new format.")
+            
+            # Open the file and read the content - of v2 files we only read the header, the AUTHOR data gets memory-mapped later
+            with open(file_path, 'rb') as f:
+                is_v2 = f.read(len(NGLYPH_V2_MAGIC)) == NGLYPH_V2_MAGIC
+                if is_v2:
+                    try:
+                        header_length = struct.unpack('<I', f.read(4))[0]
+                    except struct.error:
+                        raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - The header is incomplete.")
+                    self.raw_data = f.read(header_length)
+                else:
+                    f.seek(0)
+                    self.raw_data = f.read()
+            
+            # Parse json
+            try:
+                self.data = json.loads(self.raw_data)
+            except json.JSONDecodeError as e:
+                raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - Could not parse the json data.")
 
         # Check the format version
         try:
@@ -358,6 +535,8 @@ class NGlyphFile:
                 raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not supported in this version of this script. Please update the script or use a different file.")
             else:
                 raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not supported in this version of this script. Please check the documentation on how to migrate the file to a newer version.")
+        if is_v2 != (self.format_version == 2):
+            raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - The VERSION does not match the file layout.")
                 
         
         # Get the phone model
@@ -367,15 +546,20 @@ class NGlyphFile:
             raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - No or invalid PHONE_MODEL found.")
 
         # Get the author data
-        author: list[str] = []
+        author: list[str] | np.ndarray = []
         try:
-            author = list(self.data['AUTHOR'])
-        except (KeyError, ValueError):
+            author = NGlyphFile._map_v2_author(file_path, header_length, self.data['AUTHOR']) if is_v2 else list(self.data['AUTHOR'])
+        except (KeyError, ValueError, TypeError):
             raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - No valid AUTHOR data found.")
         try:
             self.author = AuthorData(author)
         except AuthorData.AuthorDataException as e:
             raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - {e}.")
+        # The lines of v1 files are now stored in the AUTHOR data - do not keep them two more times
+        if not is_v2:
+            del author
+            self.data['AUTHOR'] = []
+            self.raw_data = b''
         
         # Get the custom1 data
         custom1: list[str] = []
@@ -427,78 +611,451 @@ class NGlyphFile:
         except Watermark.WatermarkException:
             raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - SALT length is not valid.")
 
-        # Decrypt the author data
+        # Decrypt the author data - keep the encrypted data so the file can be converted without encrypting it again
+        self.encrypted_author = copy.deepcopy(self.author)
         try:
             self.author.decrypt(self.watermark.to_key())
         except AuthorData.AuthorDataException as e:
             raise NGlyphFile.NGlyphFileException(f"File '{file_path}' is not a valid nglyph file - {e}.")
 
+    @staticmethod
+    def _get_v2_author_offset(header_length: int) -> int:
+        # The AUTHOR data starts after the magic number, the header length and the header at the next multiple of the alignment
+        return math.ceil((len(NGLYPH_V2_MAGIC) + 4 + header_length) / NGLYPH_V2_ALIGNMENT) * NGLYPH_V2_ALIGNMENT
+
+    @staticmethod
+    def _map_v2_author(file_path: str, header_length: int, author_header: dict[str, ]) -> np.ndarray:
+        # Map the AUTHOR data without reading it - raises KeyError, ValueError or TypeError if the header or the file is not valid
+        offset = NGlyphFile._get_v2_author_offset(header_length)
+        match author_header['ENCODING']:
+            case 'FRAMES':
+                # One row per time step, one little-endian int16 per column
+                rows, columns = (int(n) for n in author_header['SHAPE'])
+                return np.memmap(file_path, dtype='<i2', mode='r', offset=offset, shape=(rows, columns))
+            case 'ENCRYPTED':
+                # The encrypted token as bytes - rebuild the v1 layout: the token length followed by the token bytes
+                rows, columns = (int(n) for n in author_header['SHAPE'])
+                token = np.memmap(file_path, dtype=np.uint8, mode='r', offset=offset, shape=(int(author_header['TOKEN_LENGTH']),))
+                if len(token) + 1 > rows * columns:
+                    raise ValueError("The token does not fit into the AUTHOR data")
+                author = np.zeros(rows * columns, dtype=np.int64)
+                author[0] = len(token)
+                author[1:len(token) + 1] = token
+                return author.reshape((rows, columns))
+            case _:
+                raise ValueError(f"Unknown AUTHOR encoding: '{author_header['ENCODING']}'")
+
+    @staticmethod
+    def write_v2(file_path: str, header: dict[str, ], author: np.ndarray) -> None:
+        # Layout: magic number, header length (uint32 little-endian), json header, zero padding up to the alignment, AUTHOR data
+        header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        # Write to a temporary file next to the target and only replace the target once everything is written
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(NGLYPH_V2_MAGIC)
+                f.write(struct.pack('<I', len(header_bytes)))
+                f.write(header_bytes)
+                f.write(bytes(NGlyphFile._get_v2_author_offset(len(header_bytes)) - f.tell()))
+                f.write(author.tobytes())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            # Also on Ctrl+C - never leave a truncated nglyph file behind
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
 class AuthorData:
     # Exception for the AuthorData class
     class AuthorDataException(Exception):
         pass
 
-    def __init__(self, data: list[str]):
-        self.raw_data: bytes = b''
-        self.data: list[list[int]] = []
+    # The light values fit into uint16 - only the token length in front of a long encrypted token needs uint32
+    # A LOG fade from 0 to 0 of the GlyphTranslator results in -1, so negative values are kept too (as int16 if they fit)
+    MIN_VALUE = -0x80000000
+    MAX_VALUE = 0xFFFFFFFF
+    # Class of every byte: digit, minus sign, comma, end of a row (the same as str.splitlines() for ASCII), ignored whitespace or invalid
+    _INVALID, _DIGIT, _MINUS, _COMMA, _ROW_SEPARATOR, _WHITESPACE = range(6)
+    _BYTE_CLASSES = np.full(256, _INVALID, dtype=np.uint8)
+    _BYTE_CLASSES[np.frombuffer(b'0123456789', dtype=np.uint8)] = _DIGIT
+    _BYTE_CLASSES[ord('-')] = _MINUS
+    _BYTE_CLASSES[ord(',')] = _COMMA
+    _BYTE_CLASSES[np.frombuffer(b'\r\n\x0b\x0c\x1c\x1d\x1e', dtype=np.uint8)] = _ROW_SEPARATOR
+    _BYTE_CLASSES[np.frombuffer(b' \t', dtype=np.uint8)] = _WHITESPACE
+    # Number of values that are serialized or resampled and number of bytes that are parsed at once - limits the size of the temporary arrays
+    _CHUNK_VALUES = 1 << 22
+    _CHUNK_BYTES = 1 << 22
+
+    def __init__(self, data: bytes | list[str] | np.ndarray):
+        # The raw data is only built when it is needed, see raw_data
+        self._raw_data: bytes | None = None
+        self.data: np.ndarray = np.zeros((0, 0), dtype=np.uint16)
         self.columns: int = 0
-        self.columns_mode: Cols = Cols.FIFTEEN_ZONE
-
-        # Get data and raw_data
-        self._parse_author_data(data)
+        self.columns_mode: DeviceProfile.ColumnsModel | None = None
+
+        # Get data and raw_data - nglyph v2 files already contain the numbers, the lines of v1 files are kept as they are
+        if isinstance(data, np.ndarray):
+            self.data = AuthorData._to_compact_array(data)
+            self.regenerate_raw_data_from_data()
+        elif isinstance(data, bytes):
+            self.data = AuthorData._parse_csv(data)
+            self.regenerate_raw_data_from_data()
+        else:
+            try:
+                self._raw_data = ('\r\n'.join(data) + '\r\n').encode('utf-8')
+            except (TypeError, UnicodeEncodeError):
+                raise AuthorData.AuthorDataException("AUTHOR data is not valid")
+            self.data = AuthorData._parse_csv(self._raw_data)
 
         # Throw an error if the data is empty
-        if not self.data:
+        if self.data.size == 0:
             raise AuthorData.AuthorDataException("AUTHOR data is empty")
 
-        # Get the number of columns
-        self.columns = len(self.data[0])
-
-        # Check if the number of columns is the same for all lines
-        for line in self.data:
-            if len(line) != self.columns:
-                raise AuthorData.AuthorDataException("AUTHOR data has different number of columns in some lines")
+        # Get the number of columns - the parser already checked that all lines have the same number of columns
+        self.columns = self.data.shape[1]
         
         # Get the columns mode
         try:
-            self.columns_mode = N_COLUMNS_TO_COLS[self.columns]
+            self.columns_mode = N_COLUMNS_TO_COLUMNS_MODEL[self.columns]
         except KeyError:
             raise AuthorData.AuthorDataException(f"AUTHOR data has an invalid number of columns ({self.columns})")
-    
-    def _parse_author_data(self, data: list[str]):
-        # Get data and raw_data
-        self.raw_data = ('\r\n'.join(data) + '\r\n').encode('utf-8')
-        try:
-            reader = csv.reader(data, delimiter=',', strict=True)
-            # Read the content and remove all empty elements and all empty lines
-            self.data = [[int(e) for e in line if e.strip()] for line in list(reader) if ''.join(line).strip()]
-        except (csv.Error, ValueError):
+
+    @staticmethod
+    def _to_compact_array(data: np.ndarray) -> np.ndarray:
+        if data.ndim != 2:
+            raise AuthorData.AuthorDataException("AUTHOR data has different number of columns in some lines")
+        if data.size == 0:
+            return data.astype(np.uint16)
+        # 16 bit values are always in range - keep the array as it is, e.g. the memory-mapped AUTHOR data of a v2 nglyph file is not read or copied
+        if data.dtype.kind in 'iu' and data.dtype.itemsize == 2:
+            return data
+        min_value, max_value = int(data.min()), int(data.max())
+        if min_value < AuthorData.MIN_VALUE or max_value > AuthorData.MAX_VALUE:
+            raise AuthorData.AuthorDataException("AUTHOR data contains values that are out of range")
+        if min_value >= 0:
+            return data.astype(np.uint16 if max_value <= np.iinfo(np.uint16).max else np.uint32)
+        for dtype in (np.int16, np.int32):
+            if max_value <= np.iinfo(dtype).max and min_value >= np.iinfo(dtype).min:
+                return data.astype(dtype)
+        return data.astype(np.int64)
+
+    @staticmethod
+    def _parse_csv(raw_data: bytes) -> np.ndarray:
+        # Parse whole lines in chunks - a chunk always ends after a new line, so no number or line is split
+        chunks: list[np.ndarray] = []
+        offset = 0
+        while offset < len(raw_data):
+            end = raw_data.find(b'\n', offset + AuthorData._CHUNK_BYTES) + 1 or len(raw_data)
+            chunk = AuthorData._parse_csv_chunk(raw_data[offset:end])
+            offset = end
+            if chunk.size == 0:
+                continue
+            if len(chunks) > 0 and chunk.shape[1] != chunks[0].shape[1]:
+                raise AuthorData.AuthorDataException("AUTHOR data has different number of columns in some lines")
+            chunks.append(chunk)
+        if len(chunks) == 0:
+            return np.zeros((0, 0), dtype=np.uint16)
+        if len(chunks) == 1:
+            return chunks[0]
+        # Chunks with and without negative values have different types - pick the smallest type for all of them
+        data = np.concatenate(chunks)
+        return data if all(chunk.dtype == data.dtype for chunk in chunks) else AuthorData._to_compact_array(data)
+
+    @staticmethod
+    def _parse_csv_chunk(raw_data: bytes) -> np.ndarray:
+        # Parse all numbers at once: find the runs of digits, compute their values and assign them to the rows
+        # Empty elements and empty lines are ignored, like the csv reader did
+        buffer = np.frombuffer(raw_data, dtype=np.uint8)
+        byte_classes = AuthorData._BYTE_CLASSES[buffer]
+        if np.any(byte_classes == AuthorData._INVALID):
             raise AuthorData.AuthorDataException("AUTHOR data is not valid")
-    
+        is_digit = byte_classes == AuthorData._DIGIT
+        is_minus = byte_classes == AuthorData._MINUS
+
+        # A minus sign must be directly in front of the digits of a number ('-1' but not '- 1', '--1' or '1-2')
+        minus_positions = np.flatnonzero(is_minus)
+        if len(minus_positions) > 0:
+            if minus_positions[-1] == len(buffer) - 1 or not np.all(is_digit[minus_positions + 1]) or np.any(is_digit[np.maximum(minus_positions - 1, 0)] & (minus_positions > 0)):
+                raise AuthorData.AuthorDataException("AUTHOR data is not valid")
+
+        # Two numbers must be separated by a comma or a new line ('1 2' or '1 -2' is not valid)
+        if np.any(byte_classes == AuthorData._WHITESPACE):
+            positions = np.flatnonzero(byte_classes != AuthorData._WHITESPACE)
+            if np.any((is_digit | is_minus)[positions[1:]] & is_digit[positions[:-1]] & (np.diff(positions) > 1)):
+                raise AuthorData.AuthorDataException("AUTHOR data is not valid")
+
+        # Start and end (exclusive) of every number
+        starts = np.flatnonzero(is_digit[1:] & ~is_digit[:-1]) + 1
+        ends = np.flatnonzero(is_digit[:-1] & ~is_digit[1:]) + 1
+        if len(is_digit) > 0 and is_digit[0]:
+            starts = np.concatenate(([0], starts))
+        if len(is_digit) > 0 and is_digit[-1]:
+            ends = np.concatenate((ends, [len(is_digit)]))
+        if len(starts) == 0:
+            return np.zeros((0, 0), dtype=np.uint16)
+        lengths = ends - starts
+        max_length = int(lengths.max())
+        if max_length > len(str(AuthorData.MAX_VALUE)):
+            raise AuthorData.AuthorDataException("AUTHOR data contains values that are out of range")
+
+        # Add up the digits of all numbers one decimal place at a time, starting with the last digit
+        value_dtype = np.uint32 if max_length < len(str(AuthorData.MAX_VALUE)) else np.uint64
+        positions = ends - 1
+        values = buffer[positions].astype(value_dtype) - ord('0')
+        for decimal_place in range(1, max_length):
+            positions -= 1
+            np.maximum(positions, 0, out=positions)
+            digits = buffer[positions] - ord('0')
+            digits *= lengths > decimal_place
+            values += digits.astype(value_dtype) * value_dtype(10 ** decimal_place)
+        if values.max() > AuthorData.MAX_VALUE:
+            raise AuthorData.AuthorDataException("AUTHOR data contains values that are out of range")
+
+        # Negate the numbers with a minus sign in front of them
+        if len(minus_positions) > 0:
+            is_negative = is_minus[np.maximum(starts - 1, 0)] & (starts > 0)
+            values = values.astype(np.int64)
+            np.negative(values, out=values, where=is_negative)
+
+        # Check that all non-empty rows have the same number of columns - count the numbers between the row separators
+        columns_per_row = np.diff(np.searchsorted(starts, np.flatnonzero(byte_classes == AuthorData._ROW_SEPARATOR)), prepend=0, append=len(starts))
+        columns_per_row = columns_per_row[columns_per_row > 0]
+        if np.any(columns_per_row != columns_per_row[0]):
+            raise AuthorData.AuthorDataException("AUTHOR data has different number of columns in some lines")
+
+        return AuthorData._to_compact_array(values.reshape(-1, int(columns_per_row[0])))
+
+    @staticmethod
+    def _to_csv(data: np.ndarray) -> bytes:
+        return b''.join(AuthorData._iter_csv(data))
+
+    @staticmethod
+    def _iter_csv(data: np.ndarray) -> Iterator[bytes]:
+        # Every row is written as 'value,value,...,value,\r\n'
+        # Each value gets a fixed width record (digits, comma, CRLF) and the unused bytes are removed at the end
+        if data.size == 0:
+            return
+        columns = data.shape[1]
+        chunk_rows = max(1, AuthorData._CHUNK_VALUES // columns)
+        for first_row in range(0, len(data), chunk_rows):
+            chunk = data[first_row:first_row + chunk_rows].reshape(-1)
+            # Negative values get a minus sign in front of the digits of their absolute value
+            is_negative = chunk < 0 if np.issubdtype(chunk.dtype, np.signedinteger) else np.zeros(0, dtype=bool)
+            sign_width = 1 if np.any(is_negative) else 0
+            values = np.abs(chunk.astype(np.int64)).astype(np.uint32) if sign_width else chunk.astype(np.uint32)
+            width = len(str(int(values.max())))
+            records = np.zeros((len(values), sign_width + width + 3), dtype=np.uint8)
+            if sign_width:
+                records[is_negative, 0] = ord('-')
+            remaining = values.copy()
+            for place in range(width - 1, -1, -1):
+                digits = (remaining % 10).astype(np.uint8) + ord('0')
+                # No leading zeros - the last place is always written
+                records[:, sign_width + place] = digits if place == width - 1 else np.where(values >= 10 ** (width - 1 - place), digits, 0)
+                remaining //= 10
+            records[:, sign_width + width] = ord(',')
+            records[columns - 1::columns, sign_width + width + 1] = ord('\r')
+            records[columns - 1::columns, sign_width + width + 2] = ord('\n')
+            yield records[records != 0].tobytes()
+
+    # The AUTHOR data as CSV with CRLF line endings
+    @property
+    def raw_data(self) -> bytes:
+        if self._raw_data is None:
+            self._raw_data = AuthorData._to_csv(self.data)
+        return self._raw_data
+
+    # The AUTHOR data as CSV in chunks - unlike raw_data the whole CSV is never built
+    def iter_raw_data(self) -> Iterator[bytes]:
+        if self._raw_data is None:
+            yield from AuthorData._iter_csv(self.data)
+            return
+        for offset in range(0, len(self._raw_data), AuthorData._CHUNK_VALUES):
+            yield self._raw_data[offset:offset + AuthorData._CHUNK_VALUES]
+
     def regenerate_raw_data_from_data(self) -> None:
-        self.raw_data = ('\r\n'.join([f"{','.join([str(e) for e in line])}," for line in self.data]) + '\r\n').encode('utf-8')
+        self._raw_data = None
+
+    # Get the lines as they are stored in v1 nglyph files
+    def to_lines(self) -> list[str]:
+        return AuthorData._to_csv(self.data).decode('ascii').split('\r\n')[:-1]
+
+    def append_empty_rows(self, n_rows: int) -> None:
+        self.data = np.concatenate((self.data, np.zeros((n_rows, self.columns), dtype=self.data.dtype)))
+        # Only the new lines have to be serialized
+        if self._raw_data is not None:
+            self._raw_data += (b'0,' * self.columns + b'\r\n') * n_rows
+
+    def truncate_rows(self, n_rows: int) -> None:
+        self.data = self.data[:n_rows]
+        self.regenerate_raw_data_from_data()
+
+    # Stretch or compress the timeline to n_rows lines - the first and last line stay in place, the lines in between are interpolated linearly
+    def resample_rows(self, n_rows: int) -> None:
+        positions = np.linspace(0, len(self.data) - 1, n_rows)
+        resampled = np.empty((n_rows, self.columns), dtype=self.data.dtype)
+        chunk_rows = max(1, AuthorData._CHUNK_VALUES // self.columns)
+        for first_row in range(0, n_rows, chunk_rows):
+            chunk_positions = positions[first_row:first_row + chunk_rows]
+            previous_rows = np.floor(chunk_positions).astype(np.int64)
+            next_rows = np.minimum(previous_rows + 1, len(self.data) - 1)
+            weights = (chunk_positions - previous_rows)[:, None]
+            resampled[first_row:first_row + chunk_rows] = np.rint(self.data[previous_rows] * (1 - weights) + self.data[next_rows] * weights)
+        self.data = resampled
+        self.regenerate_raw_data_from_data()
 
     def decrypt(self, key: bytes) -> None:
         f = Fernet(key)
-        author_len = self.data[0][0]
-        compressed_token = bytes([e for line in self.data for e in line][1:author_len+1]) # If author_len is invalid it does not throw an error here
-        data: list[str] = []
+        values = self.data.reshape(-1)
+        author_len = int(values[0])
+        token = values[1:author_len+1] # If author_len is invalid it does not throw an error here
+        if token.size > 0 and (token.min() < 0 or token.max() > 0xFF):
+            raise AuthorData.AuthorDataException("AUTHOR decryption failed")
         try:
-            data = zlib.decompress(f.decrypt(zlib.decompress(compressed_token))).decode('utf-8').splitlines()
-        except (zlib.error, FernetInvalidToken, UnicodeDecodeError):
+            data = zlib.decompress(f.decrypt(zlib.decompress(token.astype(np.uint8).tobytes())))
+        except (zlib.error, FernetInvalidToken):
             raise AuthorData.AuthorDataException("AUTHOR decryption failed")
         
         # Get data and raw_data
-        self._parse_author_data(data)
+        self.data = AuthorData._parse_csv(data)
+        self.regenerate_raw_data_from_data()
     
     def encrypt(self, key: bytes) -> None:
         f = Fernet(key)
-        compressed_token = zlib.compress(f.encrypt(zlib.compress('\r\n'.join([f"{','.join([str(e) for e in line])}," for line in self.data]).encode('utf-8'), zlib.Z_BEST_COMPRESSION)), zlib.Z_BEST_COMPRESSION)
-        encrypt_author_data: list[list[int]] = [[0 for n_column in range(self.columns)] for n_row in range(math.ceil((len(compressed_token) + 1) / self.columns))]
-        encrypt_author_data[0][0] = len(compressed_token)
-        for i, byte in enumerate(compressed_token, 1):
-            encrypt_author_data[i // self.columns][i % self.columns] = byte
-        self._parse_author_data([f"{','.join([str(e) for e in line])}," for line in encrypt_author_data])
+        # The encrypted lines have no CRLF after the last line
+        compressed_token = compress_zlib(f.encrypt(compress_zlib(AuthorData._to_csv(self.data)[:-2])))
+        # Layout: the token length followed by the token bytes, filled up with zeros to full rows
+        encrypted_data = np.zeros(math.ceil((len(compressed_token) + 1) / self.columns) * self.columns, dtype=np.uint16 if len(compressed_token) <= np.iinfo(np.uint16).max else np.uint32)
+        encrypted_data[0] = len(compressed_token)
+        encrypted_data[1:len(compressed_token) + 1] = np.frombuffer(compressed_token, dtype=np.uint8)
+        self.data = encrypted_data.reshape(-1, self.columns)
+        self.regenerate_raw_data_from_data()
+
+# Compresses data like zlib.compressobj() but deflates blocks of it on multiple threads, like pigz does.
+# Every block is deflated with the 32 KiB in front of it as the dictionary and ends with a sync flush, so the joined blocks form one deflate stream.
+# Together with the zlib header and the combined Adler-32 checksums of the blocks the output is a normal zlib stream.
+# Payloads smaller than min_size are compressed with zlib directly, larger ones with only one thread are streamed through zlib.compressobj().
+class ParallelCompressor:
+
+    # Number of threads of new compressors - lowered in worker processes so parallel jobs do not oversubscribe the CPU
+    max_threads: int = os.cpu_count() or 1
+
+    DICTIONARY_SIZE = 32 * 1024
+    _ADLER_BASE = 65521
+
+    def __init__(self, level: int = zlib.Z_BEST_COMPRESSION, block_size: int = PARALLEL_DEFLATE_BLOCK_SIZE, min_size: int = PARALLEL_DEFLATE_MIN_SIZE, n_threads: int | None = None) -> None:
+        self.level: int = level
+        self.block_size: int = block_size
+        self.min_size: int = min_size
+        self.n_threads: int = n_threads if n_threads is not None else ParallelCompressor.max_threads
+        self._buffer: bytearray = bytearray()
+        self._executor: ThreadPoolExecutor | None = None
+        self._serial_compressor = None
+        self._pending: deque[Future] = deque()
+        self._dictionary: bytes = b''
+        self._adler: int = 1
+
+    def compress(self, data: bytes) -> bytes:
+        if self._serial_compressor is not None:
+            return self._serial_compressor.compress(data)
+        self._buffer += data
+        output: list[bytes] = []
+        # Stay serial until there is enough data - with only one thread the data is not buffered any longer then
+        if self._executor is None:
+            if len(self._buffer) < self.min_size:
+                return b''
+            if self.n_threads < 2:
+                self._serial_compressor = zlib.compressobj(self.level)
+                data = self._serial_compressor.compress(self._buffer)
+                self._buffer = bytearray()
+                return data
+            self._executor = ThreadPoolExecutor(max_workers=self.n_threads)
+            output.append(self._get_zlib_header())
+
+        # Deflate all full blocks - the remaining data is kept for the next call or the last block
+        offset = 0
+        with memoryview(self._buffer) as buffer:
+            while len(buffer) - offset >= self.block_size:
+                block = bytes(buffer[offset:offset + self.block_size])
+                offset += self.block_size
+                self._pending.append(self._executor.submit(ParallelCompressor._deflate_block, block, self._dictionary, self.level, False))
+                self._dictionary = block[-ParallelCompressor.DICTIONARY_SIZE:]
+                # Limit the number of blocks in memory
+                output += self._collect(2 * self.n_threads)
+        del self._buffer[:offset]
+        return b''.join(output + self._collect(2 * self.n_threads))
+
+    def flush(self) -> bytes:
+        if self._serial_compressor is not None:
+            data = self._serial_compressor.flush()
+            self._serial_compressor = None
+            return data
+        if self._executor is None:
+            data = zlib.compress(bytes(self._buffer), self.level)
+            self._buffer = bytearray()
+            return data
+
+        # The last block ends the deflate stream, the zlib stream ends with the Adler-32 checksum of the uncompressed data
+        self._pending.append(self._executor.submit(ParallelCompressor._deflate_block, bytes(self._buffer), self._dictionary, self.level, True))
+        self._buffer = bytearray()
+        output = self._collect(0)
+        self._executor.shutdown()
+        self._executor = None
+        return b''.join(output) + struct.pack('>I', self._adler)
+
+    # Get the deflated blocks that are done in order. Waits until at most max_pending blocks are left.
+    def _collect(self, max_pending: int) -> list[bytes]:
+        output: list[bytes] = []
+        while len(self._pending) > 0 and (self._pending[0].done() or len(self._pending) > max_pending):
+            compressed, adler, length = self._pending.popleft().result()
+            self._adler = ParallelCompressor._combine_adler32(self._adler, adler, length)
+            output.append(compressed)
+        return output
+
+    def _get_zlib_header(self) -> bytes:
+        # Deflate with a 32 KiB window, the level flags are only informative - the same values zlib uses
+        level_flags = 0 if self.level < 2 else 1 if self.level < 6 else 2 if self.level == 6 else 3
+        header = (0x78 << 8) | (level_flags << 6)
+        return struct.pack('>H', header + 31 - header % 31)
+
+    @staticmethod
+    def _deflate_block(block: bytes, dictionary: bytes, level: int, last: bool) -> tuple[bytes, int, int]:
+        # Raw deflate without a header - zlib releases the GIL while compressing, so this runs in parallel
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary) if dictionary else zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        compressed = compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        return (compressed, zlib.adler32(block), len(block))
+
+    @staticmethod
+    def _combine_adler32(adler1: int, adler2: int, length2: int) -> int:
+        # The Adler-32 checksum of the concatenated data from the checksums of both parts (adler32_combine of zlib)
+        base = ParallelCompressor._ADLER_BASE
+        remainder = length2 % base
+        sum1 = ((adler1 & 0xFFFF) + (adler2 & 0xFFFF) + base - 1) % base
+        sum2 = (remainder * (adler1 & 0xFFFF) + ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + base - remainder) % base
+        return sum1 | (sum2 << 16)
+
+# Compress data to a zlib stream - large data is compressed on multiple threads
+def compress_zlib(data: bytes, level: int = zlib.Z_BEST_COMPRESSION) -> bytes:
+    compressor = ParallelCompressor(level)
+    return compressor.compress(data) + compressor.flush()
+
+# mkstemp creates files that only the owner can read - give a temporary file the permissions it should have once it replaces the target:
+# the ones of the target if it exists (e.g. an audio file edited in place), otherwise the ones of a normally created file
+def set_replacement_file_mode(temp_path: str, target_path: str) -> None:
+    try:
+        target_stat = os.stat(target_path)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        return
+    # Keep the owner and group too - only possible if we are allowed to (e.g. as root or as a member of the group)
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(temp_path, target_stat.st_uid, target_stat.st_gid)
+        except OSError:
+            pass
+    os.chmod(temp_path, stat.S_IMODE(target_stat.st_mode))
 
 class Custom1Data:
     # Exception for the Custom1Data class
@@ -524,11 +1081,185 @@ class Custom1Data:
             if len(line) != self.COLUMNS:
                 raise Custom1Data.Custom1DataException("CUSTOM1 data has an invalid format")
 
+class KeyCache:
+    # Exception for the KeyCache class
+    class KeyCacheException(Exception):
+        pass
+
+    def __init__(self, directory: str, max_entries: int = KEY_CACHE_MAX_ENTRIES, max_age_s: float = KEY_CACHE_MAX_AGE_S) -> None:
+        self.directory: str = directory
+        self.max_entries: int = max_entries
+        self.max_age_s: float = max_age_s
+
+        # The cached keys decrypt the AUTHOR data => only the current user may access them
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if os.name == 'posix':
+                os.chmod(self.directory, 0o700)
+        except OSError as e:
+            raise KeyCache.KeyCacheException(f"Can't create the key cache directory '{self.directory}': {e}")
+
+    def get_key(self, content: str, salt: bytes) -> bytes | None:
+        return self._read_entry(KeyCache._get_entry_name(content, salt) + '.key')
+
+    def put_key(self, content: str, salt: bytes, key: bytes) -> None:
+        self._write_entry(KeyCache._get_entry_name(content, salt) + '.key', key)
+
+    @staticmethod
+    def _get_entry_name(content: str, salt: bytes) -> str:
+        return hashlib.sha256(salt + content.encode('utf-8')).hexdigest()
+
+    def _read_entry(self, name: str) -> bytes | None:
+        path = os.path.join(self.directory, name)
+        try:
+            # Expired entries are treated as missing
+            if time.time() - os.path.getmtime(path) > self.max_age_s:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print_warning(f"Can't read the key cache entry '{path}': {e}")
+            return None
+        return data
+
+    def _write_entry(self, name: str, data: bytes) -> None:
+        # mkstemp creates the file with 0600 permissions, os.replace makes the entry appear atomically
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, os.path.join(self.directory, name))
+            except OSError:
+                os.remove(temp_path)
+                raise
+            self._evict()
+        except OSError as e:
+            print_warning(f"Can't write the key cache entry '{name}': {e}")
+
+    def _evict(self) -> None:
+        # Remove expired entries and then the least recently used ones until we are within the limit
+        entries: list[tuple[float, str]] = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not (name.endswith('.key') or name.endswith('.salt')):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+                if now - mtime > self.max_age_s:
+                    os.remove(path)
+                else:
+                    entries.append((mtime, path))
+            except FileNotFoundError:
+                # Another process removed it already
+                continue
+        entries.sort()
+        for _, path in entries[:max(len(entries) - self.max_entries, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+class TranscodeCache:
+    # Exception for the TranscodeCache class
+    class TranscodeCacheException(Exception):
+        pass
+
+    # Entries are named after the hash of their key, files that are still being written end with TEMP_SUFFIX
+    ENTRY_SUFFIX = '.ogg'
+    TEMP_SUFFIX = '.tmp.ogg'
+
+    def __init__(self, directory: str, max_size: int = TRANSCODE_CACHE_MAX_SIZE) -> None:
+        self.directory: str = directory
+        self.max_size: int = max_size
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            raise TranscodeCache.TranscodeCacheException(f"Can't create the transcode cache directory '{self.directory}': {e}")
+
+    # Returns the path of the cached file or None if there is no entry for the key
+    def get_entry(self, key: list) -> str | None:
+        path = os.path.join(self.directory, TranscodeCache._get_entry_name(key))
+        try:
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print_warning(f"Can't read the transcode cache entry '{path}': {e}")
+            return None
+        return path
+
+    # Creates the entry for the key - create_file writes the file to the given path. Returns the path of the entry.
+    def put_entry(self, key: list, create_file: Callable[[str], None]) -> str:
+        path = os.path.join(self.directory, TranscodeCache._get_entry_name(key))
+        # os.replace makes the entry appear atomically, so other processes never use a half written file
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=TranscodeCache.TEMP_SUFFIX)
+            os.close(fd)
+        except OSError as e:
+            raise TranscodeCache.TranscodeCacheException(f"Can't write the transcode cache entry '{path}': {e}")
+        try:
+            create_file(temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            raise TranscodeCache.TranscodeCacheException(f"Can't write the transcode cache entry '{path}': {e}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._evict(path)
+        return path
+
+    @staticmethod
+    def _get_entry_name(key: list) -> str:
+        return hashlib.sha256(json.dumps(key, separators=(',', ':')).encode('utf-8')).hexdigest() + TranscodeCache.ENTRY_SUFFIX
+
+    def _evict(self, keep_path: str) -> None:
+        # Remove the least recently used entries until we are within the size limit - the new entry is always kept
+        entries: list[tuple[float, int, str]] = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            print_warning(f"Can't clean up the transcode cache '{self.directory}': {e}")
+            return
+        for name in names:
+            if not name.endswith(TranscodeCache.ENTRY_SUFFIX) or name.endswith(TranscodeCache.TEMP_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Another process removed it already
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)
+        total_size = 0
+        for _, size, path in entries:
+            total_size += size
+            if total_size <= self.max_size or path == keep_path:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print_warning(f"Can't remove the transcode cache entry '{path}': {e}")
+
 class Watermark:
     # Exception for the Watermark class
     class WatermarkException(Exception):
         pass
 
+    # Optional on disk cache for the derived keys - set in main
+    key_cache: KeyCache | None = None
+
     def __init__(self, watermark: str, salt: bytes = os.urandom(16)) -> None:
         self.content = watermark.replace('\r\n', '\n').replace('\r', '\n')
         self.salt = salt
@@ -537,6 +1268,12 @@ class Watermark:
             raise Watermark.WatermarkException("The salt has to be 16 bytes long.")
     
     def to_key(self) -> bytes:
+        # Look for an already derived key
+        if Watermark.key_cache is not None:
+            key = Watermark.key_cache.get_key(self.content, self.salt)
+            if key is not None:
+                return key
+
         # Get the key for the watermark
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
@@ -545,6 +1282,9 @@ class Watermark:
             iterations=480000,
         )
         key = base64.urlsafe_b64encode(kdf.derive(self.content.encode('utf-8')))
+
+        if Watermark.key_cache is not None:
+            Watermark.key_cache.put_key(self.content, self.salt, key)
         return key
 
 class FFmpeg:
@@ -552,16 +1292,18 @@ class FFmpeg:
     class FFmpegError(Exception):
         pass
 
+    # Opus encoders from fastest to slowest - the native 'opus' encoder is also experimental
+    OPUS_ENCODERS = ['libopus', 'opus']
+
     def __init__(self, ffmpeg_path: str, ffprobe_path: str):
         self.ffmpeg_path = ffmpeg_path
         self.ffprobe_path = ffprobe_path
         self.ffmpeg_base_command = [self.ffmpeg_path, '-v', 'error']
         self.ffprobe_base_command = [self.ffprobe_path, '-v', 'error', '-of', 'json']
     
-    def write_metadata_to_audio_file(self, input_audio: str, output_file: str, metadata: dict[str, str]) -> None:
-        # Construct the ffmetadata file content
-        ffmetadata_content = ';FFMETADATA1\n' + '\n'.join([f"{self._escape_ffmetadata(key)}={self._escape_ffmetadata(value)}" for key, value in metadata.items()]) + '\n'
-        
+    # Writes the metadata to a copy of the audio file. If transcode is set the audio is also converted to opus in the same pass.
+    # A value can also be given in chunks (e.g. an EncodedMetadataStream), they are streamed into ffmpeg without joining them.
+    def write_metadata_to_audio_file(self, input_audio: str, output_file: str, metadata: dict[str, str | Iterable[str]], transcode: bool = False) -> None:
         # Construct the command
         ffmpeg_command = self.ffmpeg_base_command + ['-i', input_audio, '-i', '-', '-y']
         
@@ -571,66 +1313,512 @@ class FFmpeg:
             ffmpeg_command += ['-metadata:s:a:0', f"{key}="]
 
         # Add the metadata
-        ffmpeg_command += ['-map_metadata', '1', '-c:a', 'copy',
-                          '-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact',
+        ffmpeg_command += ['-map_metadata', '1']
+        ffmpeg_command += (['-map', '0:a:0'] + self.get_opus_encoder_arguments()) if transcode else ['-c:a', 'copy']
+        ffmpeg_command += ['-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact',
                           output_file]
         
-        # Run the command and handle the result
+        # Run the command and stream the ffmetadata file into it
         print_debug(f"ffmpeg_command: {ffmpeg_command}")
-        result = subprocess.run(ffmpeg_command, input=ffmetadata_content.encode('utf-8'), capture_output=True, text=False) # This somehow fucks up on windows in text mode...
-        if result.returncode != 0:
-            raise FFmpeg.FFmpegError(f"Failed to write the metadata to the audio file: {result.stderr.decode('utf-8')}")
-        
+        try:
+            process = subprocess.Popen(ffmpeg_command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) # Binary mode - this somehow fucks up on windows in text mode...
+        except FileNotFoundError:
+            raise FFmpeg.FFmpegError(f"ffmpeg could not be found. ({self.ffmpeg_path}) It is needed to write audio files that are not Ogg Opus.")
+        # Read stderr on another thread so ffmpeg never blocks on it while we are writing
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            stderr = executor.submit(process.stderr.read)
+            try:
+                for chunk in self._iter_ffmetadata(metadata):
+                    process.stdin.write(chunk)
+                process.stdin.close()
+            except BrokenPipeError:
+                # ffmpeg stopped reading - the error is in stderr
+                pass
+            returncode = process.wait()
+            stderr_content = stderr.result()
+        process.stderr.close()
+        if returncode != 0:
+            raise FFmpeg.FFmpegError(f"Failed to write the metadata to the audio file: {stderr_content.decode('utf-8')}")
+
+    # The content of the ffmetadata file in chunks
+    def _iter_ffmetadata(self, metadata: dict[str, str | Iterable[str]]) -> Iterator[bytes]:
+        yield b';FFMETADATA1\n'
+        for key, value in metadata.items():
+            yield f"{self._escape_ffmetadata(key)}=".encode('utf-8')
+            # Escaping works character by character, so every chunk can be escaped on its own
+            for chunk in ([value] if isinstance(value, str) else value):
+                yield self._escape_ffmetadata(chunk).encode('utf-8')
+            yield b'\n'
+
+    def get_opus_encoder(self) -> str:
+        capabilities = get_tool_capabilities(self.ffmpeg_path, 'ffmpeg')
+        opus_encoders = capabilities['opus_encoders'] if capabilities is not None else []
+        # Default to the native encoder - ffmpeg reports the error if it is missing
+        return opus_encoders[0] if len(opus_encoders) > 0 else 'opus'
+
+    def get_opus_encoder_arguments(self) -> list[str]:
+        # Use the fastest available encoder - the native one needs '-strict -2' because it is experimental
+        opus_encoder = self.get_opus_encoder()
+        print_debug(f"opus_encoder: {opus_encoder}", start="\t")
+        return ['-c:a', opus_encoder] + (['-strict', '-2'] if opus_encoder == 'opus' else [])
+
     def _escape_ffmetadata(self, content: str) -> str:
         # Special characters need to be escaped with a backslash ('\', '=', ';', '#', '\n')
         return content.replace('\\', '\\\\').replace('=', '\\=').replace(';', '\\;').replace('#', '\\#').replace('\n', '\\\n')
 
+class OggFile:
+    # Exception for the OggFile class
+    class OggFileError(Exception):
+        pass
+
+    # Page header: capture pattern, version, header type, granule position, serial number, page sequence number, checksum, number of segments
+    PAGE_HEADER = struct.Struct('<4sBBqIIIB')
+    PAGE_CAPTURE_PATTERN = b'OggS'
+    HEADER_TYPE_CONTINUED = 0x01
+    HEADER_TYPE_BOS = 0x02
+    # Big enough to always contain the last page (max. page size: 27 + 255 + 255 * 255 bytes)
+    TAIL_CHUNK_SIZE = 65536
+    # Identification header signatures of the audio codecs that can be stored in Ogg
+    AUDIO_CODEC_SIGNATURES = { b'OpusHead': 'opus', b'\x01vorbis': 'vorbis', b'\x7fFLAC': 'flac', b'Speex   ': 'speex' }
+    # Codecs we can read the tags and duration of - everything else is left to ffprobe
+    SUPPORTED_CODECS = ['opus', 'vorbis']
+    # Opus always uses a 48kHz granule position
+    OPUS_SAMPLE_RATE = 48000
+    MAX_SEGMENTS_PER_PAGE = 255
+    # Buffer size for copying the audio pages when writing
+    COPY_BUFFER_SIZE = 1024 * 1024
+    # Padding reserved at the end of the comment header so later tag updates can be written in place - at least 4KiB or 1/8 of the comment header
+    PADDING_MIN_SIZE = 4096
+    PADDING_DIVISOR = 8
+    # The Ogg checksum is a CRC-32 without bit reflection - zlib.crc32 computes it on bit reversed bytes
+    _BIT_REVERSE_TABLE = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+    def __init__(self, audio_path: str):
+        self.audio_path = audio_path
+        self.codec_name: str = ''
+        self.n_audio_streams: int = 0
+        self.serial_number: int = 0
+        self.sample_rate: int = 0
+        self.pre_skip: int = 0
+        self.vendor: str = ''
+        self.tags: dict[str, str] = {}
+        self.duration_s: float = 0.0
+        # The raw comment header content - needed to write the file again
+        self._vendor: bytes = b''
+        self._comments: list[bytes] = []
+        # The comment header packet including padding and the (offset, header, segment table) of the pages it is stored in
+        self._comment_header_length: int = 0
+        self._comment_pages: list[tuple[int, bytes, bytes]] = []
+
+        try:
+            with open(audio_path, 'rb') as f:
+                self._read_headers(f)
+                self.duration_s = self._get_last_granule_position(f) / self.sample_rate
+        except OSError as e:
+            raise OggFile.OggFileError(f"Could not read the Ogg file: {e}")
+
+    @staticmethod
+    def is_ogg(audio_path: str) -> bool:
+        try:
+            with open(audio_path, 'rb') as f:
+                return f.read(len(OggFile.PAGE_CAPTURE_PATTERN)) == OggFile.PAGE_CAPTURE_PATTERN
+        except OSError:
+            return False
+
+    @staticmethod
+    def is_ogg_opus(audio_path: str) -> bool:
+        # Only checks the first stream
+        try:
+            with open(audio_path, 'rb') as f:
+                header = f.read(OggFile.PAGE_HEADER.size)
+                if len(header) < OggFile.PAGE_HEADER.size:
+                    return False
+                capture_pattern, _, header_type, _, _, _, _, n_segments = OggFile.PAGE_HEADER.unpack(header)
+                f.seek(n_segments, os.SEEK_CUR)
+                return capture_pattern == OggFile.PAGE_CAPTURE_PATTERN and bool(header_type & OggFile.HEADER_TYPE_BOS) and f.read(8) == b'OpusHead'
+        except OSError:
+            return False
+
+    # Writes a copy of the file with new tags. Existing tags with the same keys are replaced, all other tags are kept.
+    # Only the comment header is rebuilt, the audio pages are copied as they are. The output path can be the path of this file.
+    def write_tags(self, output_path: str, tags: dict[str, str], reserve_padding: bool = False) -> None:
+        comment_header = self._build_comment_header(tags)
+        if reserve_padding:
+            # Padding starts with a 0 byte so readers know that it can be discarded
+            comment_header += bytes(max(OggFile.PADDING_MIN_SIZE, len(comment_header) // OggFile.PADDING_DIVISOR))
+
+        # Write to a temporary file first so we never leave a half written file behind
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix='.tmp')
+        except OSError as e:
+            raise OggFile.OggFileError(f"Could not write the Ogg file: {e}")
+        try:
+            try:
+                with open(self.audio_path, 'rb', buffering=OggFile.COPY_BUFFER_SIZE) as input_file, os.fdopen(fd, 'wb', buffering=OggFile.COPY_BUFFER_SIZE) as output_file:
+                    self._write_pages(input_file, output_file, comment_header)
+                set_replacement_file_mode(temp_path, output_path)
+                os.replace(temp_path, output_path)
+            except OSError as e:
+                raise OggFile.OggFileError(f"Could not write the Ogg file: {e}")
+        except BaseException:
+            # Also on Ctrl+C - never leave the temporary file behind
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    # Overwrites only the pages of the comment header. Returns False if the new tags do not fit into the current comment header.
+    def update_tags_in_place(self, tags: dict[str, str]) -> bool:
+        comment_header = self._build_comment_header(tags)
+        # The pages must not contain anything but the comment header
+        if len(comment_header) > self._comment_header_length or sum(sum(segment_table) for _, _, segment_table in self._comment_pages) != self._comment_header_length:
+            return False
+        # Fill the rest with padding - the packet keeps its size, so the lacing values and all following pages stay the same
+        comment_header += bytes(self._comment_header_length - len(comment_header))
+
+        try:
+            with open(self.audio_path, 'r+b') as f:
+                position = 0
+                for offset, header, segment_table in self._comment_pages:
+                    body_length = sum(segment_table)
+                    f.seek(offset)
+                    f.write(OggFile._set_checksum(bytearray(header + segment_table + comment_header[position:position + body_length])))
+                    position += body_length
+        except OSError as e:
+            raise OggFile.OggFileError(f"Could not write the Ogg file: {e}")
+
+        self.tags = {}
+        self._comments = []
+        self._parse_comment_header(comment_header)
+        return True
+
+    def _build_comment_header(self, tags: dict[str, str]) -> bytes:
+        if self.codec_name != 'opus':
+            raise OggFile.OggFileError(f"Writing tags to '{self.codec_name}' streams is not supported.")
+
+        # Keys are not case sensitive
+        replaced_keys = [key.upper() for key in tags.keys()]
+        comments = [comment for comment in self._comments if comment.partition(b'=')[0].decode('utf-8', errors='replace').upper() not in replaced_keys]
+        comments += [f"{key.upper()}={value}".encode('utf-8') for key, value in tags.items()]
+        return b'OpusTags' + struct.pack('<I', len(self._vendor)) + self._vendor + struct.pack('<I', len(comments)) + b''.join(struct.pack('<I', len(comment)) + comment for comment in comments)
+
+    def _write_pages(self, input_file, output_file, comment_header: bytes) -> None:
+        n_old_comment_pages = 0
+        first_sequence_number = 0
+        sequence_number_delta = 0
+        while True:
+            page = self._read_page(input_file)
+            if page is None:
+                raise OggFile.OggFileError("The Ogg file ended before the comment header.")
+            header_type, _, serial_number, sequence_number, header, segment_table, body = page
+
+            # Other streams and the identification header stay as they are
+            if serial_number != self.serial_number or header_type & OggFile.HEADER_TYPE_BOS:
+                output_file.write(header + segment_table + body)
+                continue
+
+            # Drop the pages of the old comment header
+            if n_old_comment_pages == 0:
+                first_sequence_number = sequence_number
+            n_old_comment_pages += 1
+            packet_ends = [i for i, lacing_value in enumerate(segment_table) if lacing_value < 255]
+            if len(packet_ends) == 0:
+                continue
+            if packet_ends != [len(segment_table) - 1]:
+                raise OggFile.OggFileError("The comment header does not end on a page boundary.")
+
+            # Write the new comment header
+            comment_pages = self._build_pages(comment_header, first_sequence_number)
+            for comment_page in comment_pages:
+                output_file.write(comment_page)
+            sequence_number_delta = len(comment_pages) - n_old_comment_pages
+            break
+
+        # Nothing else changes if the comment header still has the same number of pages
+        if sequence_number_delta == 0:
+            shutil.copyfileobj(input_file, output_file, OggFile.COPY_BUFFER_SIZE)
+            return
+
+        # Otherwise the following pages of the stream have to be renumbered (and get a new checksum)
+        while (page := self._read_page(input_file)) is not None:
+            _, _, serial_number, sequence_number, header, segment_table, body = page
+            if serial_number != self.serial_number:
+                output_file.write(header + segment_table + body)
+                continue
+            new_page = bytearray(header + segment_table + body)
+            struct.pack_into('<I', new_page, 18, (sequence_number + sequence_number_delta) & 0xFFFFFFFF)
+            output_file.write(OggFile._set_checksum(new_page))
+
+    def _build_pages(self, packet: bytes, first_sequence_number: int) -> list[bytes]:
+        # Split the packet into 255 byte segments, a packet that is a multiple of 255 bytes long ends with an empty segment
+        lacing_values = [255] * (len(packet) // 255) + [len(packet) % 255]
+        pages: list[bytes] = []
+        position = 0
+        for page_nr, start in enumerate(range(0, len(lacing_values), OggFile.MAX_SEGMENTS_PER_PAGE)):
+            segment_table = bytes(lacing_values[start:start + OggFile.MAX_SEGMENTS_PER_PAGE])
+            body_length = sum(segment_table)
+            is_last_page = start + OggFile.MAX_SEGMENTS_PER_PAGE >= len(lacing_values)
+            # Header pages have a granule position of 0, pages on which no packet ends -1
+            header = OggFile.PAGE_HEADER.pack(OggFile.PAGE_CAPTURE_PATTERN, 0, OggFile.HEADER_TYPE_CONTINUED if page_nr > 0 else 0, 0 if is_last_page else -1, self.serial_number, (first_sequence_number + page_nr) & 0xFFFFFFFF, 0, len(segment_table))
+            pages.append(OggFile._set_checksum(bytearray(header + segment_table + packet[position:position + body_length])))
+            position += body_length
+        return pages
+
+    @staticmethod
+    def _set_checksum(page: bytearray) -> bytes:
+        # The checksum is calculated with the checksum field set to 0
+        struct.pack_into('<I', page, 22, 0)
+        # zlib.crc32 reflects the bits and inverts the register before and after - undo all of that
+        checksum = zlib.crc32(page.translate(OggFile._BIT_REVERSE_TABLE), 0xFFFFFFFF) ^ 0xFFFFFFFF
+        struct.pack_into('<I', page, 22, int(f"{checksum:032b}"[::-1], 2))
+        return bytes(page)
+
+    def _read_page(self, f) -> tuple[int, int, int, int, bytes, bytes, bytes] | None:
+        # Returns (header type, granule position, serial number, sequence number, header, segment table, body) or None at the end of the file
+        offset = f.tell()
+        header = f.read(OggFile.PAGE_HEADER.size)
+        if len(header) == 0:
+            return None
+        if len(header) < OggFile.PAGE_HEADER.size:
+            raise OggFile.OggFileError(f"Truncated Ogg page at offset {offset}.")
+        capture_pattern, version, header_type, granule_position, serial_number, sequence_number, _, n_segments = OggFile.PAGE_HEADER.unpack(header)
+        if capture_pattern != OggFile.PAGE_CAPTURE_PATTERN or version != 0:
+            raise OggFile.OggFileError(f"Invalid Ogg page at offset {offset}.")
+        segment_table = f.read(n_segments)
+        body = f.read(sum(segment_table))
+        if len(segment_table) < n_segments or len(body) < sum(segment_table):
+            raise OggFile.OggFileError(f"Truncated Ogg page at offset {offset}.")
+        return (header_type, granule_position, serial_number, sequence_number, header, segment_table, body)
+
+    def _read_headers(self, f) -> None:
+        # Every stream starts with a page that only contains its identification header (BOS page) and all BOS pages come first
+        # The comment header is the second packet of the stream and can span multiple pages
+        identification_header = b''
+        comment_header_parts: list[bytes] = []
+        while True:
+            offset = f.tell()
+            page = self._read_page(f)
+            if page is None:
+                raise OggFile.OggFileError("The Ogg file ended before the comment header.")
+            header_type, _, serial_number, _, header, segment_table, body = page
+
+            if header_type & OggFile.HEADER_TYPE_BOS:
+                codec_name = next((name for signature, name in OggFile.AUDIO_CODEC_SIGNATURES.items() if body.startswith(signature)), None)
+                if codec_name is not None:
+                    self.n_audio_streams += 1
+                    # Use the first audio stream
+                    if self.n_audio_streams == 1:
+                        if codec_name not in OggFile.SUPPORTED_CODECS:
+                            raise OggFile.OggFileError(f"Reading '{codec_name}' streams is not supported.")
+                        self.codec_name = codec_name
+                        self.serial_number = serial_number
+                        identification_header = body
+                continue
+            if self.n_audio_streams == 0:
+                raise OggFile.OggFileError("The Ogg file does not contain an audio stream.")
+            if serial_number != self.serial_number:
+                continue
+
+            # Reassemble the comment header - a packet ends with the first segment shorter than 255 bytes
+            if len(comment_header_parts) == 0 and header_type & OggFile.HEADER_TYPE_CONTINUED:
+                raise OggFile.OggFileError("The identification header spans more than one page.")
+            self._comment_pages.append((offset, header, segment_table))
+            position = 0
+            for lacing_value in segment_table:
+                position += lacing_value
+                if lacing_value < 255:
+                    comment_header_parts.append(body[:position])
+                    comment_header = b''.join(comment_header_parts)
+                    self._comment_header_length = len(comment_header)
+                    self._parse_identification_header(identification_header)
+                    self._parse_comment_header(comment_header)
+                    return
+            comment_header_parts.append(body)
+
+    def _parse_identification_header(self, packet: bytes) -> None:
+        try:
+            if self.codec_name == 'opus':
+                # 'OpusHead', version, channel count, pre-skip, ...
+                self.pre_skip = struct.unpack_from('<H', packet, 10)[0]
+                self.sample_rate = OggFile.OPUS_SAMPLE_RATE
+            else:
+                # '\x01vorbis', version, channel count, sample rate, ...
+                self.sample_rate = struct.unpack_from('<I', packet, 12)[0]
+        except struct.error:
+            raise OggFile.OggFileError("The identification header is truncated.")
+        if self.sample_rate == 0:
+            raise OggFile.OggFileError("The identification header has a sample rate of 0.")
+
+    def _parse_comment_header(self, packet: bytes) -> None:
+        signature = b'OpusTags' if self.codec_name == 'opus' else b'\x03vorbis'
+        if not packet.startswith(signature):
+            raise OggFile.OggFileError("The second packet of the stream is not a comment header.")
+
+        # Vorbis comment: vendor length, vendor, number of comments, (comment length, comment)...
+        try:
+            offset = len(signature)
+            vendor_length = struct.unpack_from('<I', packet, offset)[0]
+            offset += 4
+            self._vendor = packet[offset:offset + vendor_length]
+            self.vendor = self._vendor.decode('utf-8', errors='replace')
+            offset += vendor_length
+            n_comments = struct.unpack_from('<I', packet, offset)[0]
+            offset += 4
+            comments = self._comments
+            for _ in range(n_comments):
+                comment_length = struct.unpack_from('<I', packet, offset)[0]
+                offset += 4
+                if offset + comment_length > len(packet):
+                    raise struct.error
+                comments.append(packet[offset:offset + comment_length])
+                offset += comment_length
+        except struct.error:
+            raise OggFile.OggFileError("The comment header is truncated.")
+
+        # Store the tags the same way ffprobe reports them: upper case keys, the vendor as 'encoder' and repeated keys joined by ';'
+        if self.vendor:
+            self.tags['encoder'] = self.vendor
+        for comment in comments:
+            key, separator, value = comment.decode('utf-8', errors='replace').partition('=')
+            if not separator or not key or key.upper() == 'METADATA_BLOCK_PICTURE':
+                continue
+            key = key.upper()
+            self.tags[key] = f"{self.tags[key]};{value}" if key in self.tags else value
+
+    def _get_last_granule_position(self, f) -> int:
+        # Search backwards from the end of the file for the last page of the stream that finishes a packet
+        file_size = f.seek(0, os.SEEK_END)
+        chunk_size = OggFile.TAIL_CHUNK_SIZE
+        while True:
+            start = max(0, file_size - chunk_size)
+            f.seek(start)
+            data = f.read(file_size - start)
+            position = len(data)
+            while True:
+                position = data.rfind(OggFile.PAGE_CAPTURE_PATTERN, 0, position)
+                if position == -1:
+                    break
+                if position + OggFile.PAGE_HEADER.size > len(data):
+                    continue
+                _, version, _, granule_position, serial_number, _, _, n_segments = OggFile.PAGE_HEADER.unpack_from(data, position)
+                # Skip random matches in the audio data
+                segment_table = data[position + OggFile.PAGE_HEADER.size:position + OggFile.PAGE_HEADER.size + n_segments]
+                if version != 0 or len(segment_table) < n_segments or position + OggFile.PAGE_HEADER.size + n_segments + sum(segment_table) > len(data):
+                    continue
+                if serial_number == self.serial_number and granule_position != -1:
+                    # Opus: the first pre-skip samples are not played
+                    return max(0, granule_position - self.pre_skip)
+            if start == 0:
+                raise OggFile.OggFileError("Could not find the end of the audio stream.")
+            chunk_size *= 2
+
 class AudioFile:
     # Exception for the AudioFile class
     class AudioFileError(Exception):
         pass
 
-    def __init__(self, audio_path: str, ffmpeg: FFmpeg):
+    # Output arguments of the conversion to opus - only the first audio stream and its tags are kept
+    OPUS_OUTPUT_ARGUMENTS = ['-map', '0:a:0', '-map_metadata', '0:s:a:0', '-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact']
+    # Optional cache of the audio converted to opus - set in main
+    transcode_cache: TranscodeCache | None = None
+
+    def __init__(self, audio_path: str, ffmpeg: FFmpeg, log: MessageLog):
         self.audio_path = audio_path
+
+        # Read Ogg files directly - ffprobe is only needed for other containers and codecs
+        self.ogg_file: OggFile | None = None
+        self.metadata = self._read_ogg_metadata(audio_path)
+        if self.metadata is None:
+            self.metadata = self._read_ffprobe_metadata(audio_path, ffmpeg)
+        
+        # Check if we have a stream
+        if len(self.metadata['streams']) == 0:
+            raise AudioFile.AudioFileError("The file has no audio streams. Did you pass in the right file?")
+
+        # Check if we have more than one stream
+        if len(self.metadata['streams']) > 1:
+            log.warning("The file has more than one audio stream. Using the first one.", start="\t")
         
+        # Check if the codec type is audio (Should never happen because we only return audio streams from ffprobe => assert)
+        assert self.metadata['streams'][0]['codec_type'] == 'audio', "[Development Error] This file does not contain an audio stream. What happened here?"
+
+    # Returns the metadata in the same format as ffprobe or None if the file has to be read with ffprobe
+    def _read_ogg_metadata(self, audio_path: str) -> dict[str, ] | None:
+        if not OggFile.is_ogg(audio_path):
+            return None
+        try:
+            ogg_file = OggFile(audio_path)
+        except OggFile.OggFileError as e:
+            print_debug(f"Reading the Ogg file failed, falling back to ffprobe: {e}")
+            return None
+        self.ogg_file = ogg_file
+
+        # Only the first audio stream is read, the others only have to be counted
+        streams = [{ 'codec_type': 'audio', 'codec_name': ogg_file.codec_name, 'tags': ogg_file.tags, 'duration': f"{ogg_file.duration_s:.6f}" }]
+        streams += [{ 'codec_type': 'audio' } for _ in range(ogg_file.n_audio_streams - 1)]
+        return { 'streams': streams }
+
+    def _read_ffprobe_metadata(self, audio_path: str, ffmpeg: FFmpeg) -> dict[str, ]:
         # Construct the ffprobe command
         ffprobe_command = ffmpeg.ffprobe_base_command + ['-show_streams', '-select_streams', 'a', audio_path]
         
         # Run the command and handle the result
-        result = subprocess.run(ffprobe_command, capture_output=True, text=True, encoding='utf-8')
+        try:
+            result = subprocess.run(ffprobe_command, capture_output=True, text=True, encoding='utf-8')
+        except FileNotFoundError:
+            raise AudioFile.AudioFileError(f"ffprobe could not be found. ({ffmpeg.ffprobe_path}) It is needed to read audio files that are not Ogg Opus or Ogg Vorbis.")
         if result.returncode != 0:
             raise AudioFile.AudioFileError(f"Failed to get the audio file metadata: {result.stderr}")
         
         # Parse the output as json
         try:
-            self.metadata = json.loads(result.stdout)
+            return json.loads(result.stdout)
         except json.JSONDecodeError as e:
             raise AudioFile.AudioFileError(f"Failed to parse the ffprobe output: {e}")
-        
-        # Check if we have a stream
-        if len(self.metadata['streams']) == 0:
-            raise AudioFile.AudioFileError("The file has no audio streams. Did you pass in the right file?")
-
-        # Check if we have more than one stream
-        if len(self.metadata['streams']) > 1:
-            print_warning("The file has more than one audio stream. Using the first one.", start="\t")
-        
-        # Check if the codec type is audio (Should never happen because we only return audio streams from ffprobe => assert)
-        assert self.metadata['streams'][0]['codec_type'] == 'audio', "[Development Error] This file does not contain an audio stream. What happened here?"
     
     # Fix the audio codec. Returns the new path to the audio file.
-    def fix_audio_codec(self, ffmpeg: FFmpeg, new_audio_path: str) -> str:
+    def fix_audio_codec(self, ffmpeg: FFmpeg, new_audio_path: str, log: MessageLog) -> str:
         assert new_audio_path != self.audio_path, "[Development Error] The new audio path is the same as the old one. What happened here?"
 
-        ffmpeg_command = ffmpeg.ffmpeg_base_command + ['-y', '-i', self.audio_path, '-strict', '-2', '-c:a', 'opus', '-map', '0:a:0', '-map_metadata', '0:s:a:0', '-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact', new_audio_path]
+        # Copy the cached opus audio if there is a cache - it is only converted if it is not cached yet
+        converted = False
+        if AudioFile.transcode_cache is not None:
+            try:
+                shutil.copyfile(self.get_cached_opus_audio_path(ffmpeg), new_audio_path)
+                converted = True
+            except TranscodeCache.TranscodeCacheException as e:
+                log.warning(f"Converting the audio without the transcode cache: {e}", start="\t")
+            except OSError as e:
+                raise AudioFile.AudioFileError(f"Failed to copy the cached audio: {e}")
+        if not converted:
+            self._convert_to_opus(ffmpeg, new_audio_path)
+
+        self.audio_path = new_audio_path
+        return new_audio_path
+
+    # Returns the path of the audio converted to opus in the transcode cache. The entry is keyed by the content of the audio file, the encoder settings and the ffmpeg version.
+    def get_cached_opus_audio_path(self, ffmpeg: FFmpeg) -> str:
+        assert AudioFile.transcode_cache is not None, "[Development Error] There is no transcode cache. What happened here?"
+
+        try:
+            audio_hash = get_file_hash(self.audio_path)
+        except OSError as e:
+            raise AudioFile.AudioFileError(f"Can't read the audio file: {e}")
+        capabilities = get_tool_capabilities(ffmpeg.ffmpeg_path, 'ffmpeg')
+        key = [audio_hash, ffmpeg.get_opus_encoder_arguments() + AudioFile.OPUS_OUTPUT_ARGUMENTS, capabilities['version'] if capabilities is not None else None, capabilities['date'] if capabilities is not None else None]
+
+        cached_audio_path = AudioFile.transcode_cache.get_entry(key)
+        if cached_audio_path is not None:
+            print_debug(f"Using the cached opus audio: {cached_audio_path}", start="\t")
+            return cached_audio_path
+        return AudioFile.transcode_cache.put_entry(key, lambda path: self._convert_to_opus(ffmpeg, path))
+
+    def _convert_to_opus(self, ffmpeg: FFmpeg, new_audio_path: str) -> None:
+        ffmpeg_command = ffmpeg.ffmpeg_base_command + ['-y', '-i', self.audio_path] + ffmpeg.get_opus_encoder_arguments() + AudioFile.OPUS_OUTPUT_ARGUMENTS + [new_audio_path]
 
         result = subprocess.run(ffmpeg_command, capture_output=True, text=True)
         if result.returncode != 0:
             raise AudioFile.AudioFileError(f"Failed to fix the audio codec: {result.stderr}")
 
-        self.audio_path = new_audio_path
-        return new_audio_path
-
     # Fix the audio extension. Returns the new path to the audio file.
     def fix_audio_extension(self, new_audio_path: str) -> str:
         assert new_audio_path != self.audio_path, "[Development Error] The new audio path is the same as the old one. What happened here?"
@@ -641,6 +1829,8 @@ class AudioFile:
             raise AudioFile.AudioFileError(f"Could not automatically fix the file extension. Please consult the documentation on how to fix it and try again: {e}")
         
         self.audio_path = new_audio_path
+        if self.ogg_file is not None:
+            self.ogg_file.audio_path = new_audio_path
         return new_audio_path
 
     def get_audio_codec(self) -> str:
@@ -671,21 +1861,89 @@ def decode_base64(data: str) -> bytes:
 def encode_base64(data: bytes) -> str:
     return base64.b64encode(data).decode('utf-8').removesuffix('==').removesuffix('=')
 
-def read_metadata_from_audio_file(audio_file: AudioFile, output_path: str, ffmpeg: FFmpeg) -> None:
+# Compresses and base64 encodes the AUTHOR or CUSTOM1 data for the metadata one chunk at a time, with a new line every 76th character.
+# Only the base64 lines of one compressed chunk are in memory at once. Can only be iterated once, afterwards size is the number of encoded bytes.
+class EncodedMetadataStream:
+    # 57 bytes are one line of 76 base64 characters
+    LINE_BYTES = 57
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks: Iterable[bytes] = chunks
+        self.size: int = 0
+
+    def __iter__(self) -> Iterator[str]:
+        compressor = ParallelCompressor()
+        remainder = b''
+        for chunk in self.chunks:
+            remainder = yield from self._encode_lines(remainder + compressor.compress(chunk))
+        remainder = yield from self._encode_lines(remainder + compressor.flush())
+
+        # The last line is not padded
+        if len(remainder) > 0 or self.size == 0:
+            last_line = encode_base64(remainder) + '\n'
+            self.size += len(last_line)
+            yield last_line
+
+    # Yields all full lines and returns the bytes that are left
+    def _encode_lines(self, data: bytes) -> Generator[str, None, bytes]:
+        n_bytes = len(data) - len(data) % EncodedMetadataStream.LINE_BYTES
+        if n_bytes > 0:
+            lines = base64.encodebytes(data[:n_bytes]).decode('ascii')
+            self.size += len(lines)
+            yield lines
+        return data[n_bytes:]
+
+# Compress and encode the AUTHOR or CUSTOM1 data for the metadata
+def encode_metadata_value(data: bytes) -> str:
+    return ''.join(EncodedMetadataStream([data]))
+
+# Compress and encode the AUTHOR data without building the whole CSV
+def encode_author_data(author: AuthorData) -> str:
+    return ''.join(EncodedMetadataStream(author.iter_raw_data()))
+
+# Encode the metadata of a nglyph file once so it can be written to many audio files. Returns (number of AUTHOR lines, AUTHOR, CUSTOM1).
+def encode_nglyph_payload(nglyph_file: NGlyphFile) -> tuple[int, str, str]:
+    return (len(nglyph_file.author.data), encode_author_data(nglyph_file.author), encode_metadata_value(nglyph_file.custom1.raw_data))
+
+# Returns the path of the nglyph file, its content and the number of AUTHOR rows
+def read_metadata_from_audio_file(audio_file: AudioFile, output_path: str, ffmpeg: FFmpeg, log: MessageLog) -> tuple[str, dict[str, ], int]:
+    nglyph_data, n_author_rows = read_nglyph_data_from_audio_file(audio_file, log)
+
+    # Get the filenames
+    base_filename = os.path.splitext(os.path.basename(audio_file.audio_path))[0]
+    nglyph_file_path = os.path.join(output_path, base_filename + ".nglyph")
+    
+    # Print info
+    log.info(f"Writing the nglyph file to '{nglyph_file_path}'")
+    
+    # Write the nglyph file
+    write_nglyph_data(nglyph_file_path, nglyph_data)
+
+    return (nglyph_file_path, nglyph_data, n_author_rows)
+
+# Write nglyph data as a v1 nglyph file
+def write_nglyph_data(file_path: str, nglyph_data: dict[str, ]) -> None:
+    with open(file_path, 'w', newline='\r\n', encoding='utf-8') as f:
+        json.dump(nglyph_data, f, indent=4)
+
+# Returns the content of the nglyph file of the composition in the audio file and the number of AUTHOR rows
+# The number of rows is the one of the decrypted AUTHOR data - the encrypted AUTHOR lines of a watermarked composition are not its frames
+# Raises GlyphModderError if the audio file does not contain a valid composition
+def read_nglyph_data_from_audio_file(audio_file: AudioFile, log: MessageLog) -> tuple[dict[str, ], int]:
     # Check the audio codec and print a warning if it is not opus
     audio_file_codec = audio_file.get_audio_codec()
     if audio_file_codec != "opus":
-        print_warning(f"The audio file has the wrong codec (got: {audio_file_codec}, expected: opus). Please consult the documentation on how to fix it.", start="\t")
+        log.warning(f"The audio file has the wrong codec (got: {audio_file_codec}, expected: opus). Please consult the documentation on how to fix it.", start="\t")
     # Check the audio extension and print a warning if it is not ogg
     audio_file_extension = os.path.splitext(audio_file.audio_path)[1]
     if audio_file_extension != '.ogg':
-        print_warning(f"The audio file has the wrong extension (got: {audio_file_extension}, expected: .ogg). Please consult the documentation on how to fix it.", start="\t")
+        log.warning(f"The audio file has the wrong extension (got: {audio_file_extension}, expected: .ogg). Please consult the documentation on how to fix it.", start="\t")
     
     # Get the tags
     tags = audio_file.get_tags()
     author_compressed_base64 = tags.get('AUTHOR', None)
     custom1_compressed_base64 = tags.get('CUSTOM1', None)
-    custom2 = tags.get('CUSTOM2', STRING_TO_COLS[Cols.FIVE_ZONE]) # Default to 5 Column mode because the pre 1.4.0 compositions do not have this tag
+    custom2 = tags.get('CUSTOM2', N_COLUMNS_TO_COLUMNS_MODEL[5].custom2) # Default to 5 Column mode because the pre 1.4.0 compositions do not have this tag
     composer = tags.get('COMPOSER', None)
     watermark_str = tags.get('GLYPHER_WATERMARK', None)
     watermark = Watermark(watermark_str.removeprefix('\n')) if watermark_str is not None else None
@@ -693,26 +1951,26 @@ def read_metadata_from_audio_file(audio_file: AudioFile, output_path: str, ffmpe
 
     # Check if the tags are present
     if author_compressed_base64 is None or custom1_compressed_base64 is None or custom2 is None or composer is None or album is None:
-        print_critical_error("This is not a valid composition because the audio file does not contain the required metadata.", start="\t")
+        raise GlyphModderError("This is not a valid composition because the audio file does not contain the required metadata.")
 
     # Check if we have a pre 1.4.0 composition
     is_legacy = False
     if not composer.startswith('v1-'):
-        print_warning("This is an \"old\" composition. Depending on the length of it and if it was made with the old Glyph Tools (pre v1 Glyph Format), it might desync when playing it back on device or in the GlyphVisualizer!", start="\t")
+        log.warning("This is an \"old\" composition. Depending on the length of it and if it was made with the old Glyph Tools (pre v1 Glyph Format), it might desync when playing it back on device or in the GlyphVisualizer!", start="\t")
         is_legacy = True
 
     # Legacy checks for other creation tools - 'v1-Glyphify' is fine
     if album == 'Glyphify':
-        print_warning("This looks like an \"old\" Glyphify composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!", start="\t")
+        log.warning("This looks like an \"old\" Glyphify composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!", start="\t")
         is_legacy = True
     ## https://github.com/Krishnagopal-Sinha/better-nothing-glyph-composer
     if album == 'custom':
-        print_warning("This looks like an \"old\" better-nothing-glyph-composer composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!", start="\t")
+        log.warning("This looks like an \"old\" better-nothing-glyph-composer composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!", start="\t")
         is_legacy = True
     
     # Check if the custom2 tag is valid
-    if custom2 not in STRING_COLS_TO_PHONE_MODEL.keys():
-        print_critical_error(f"The custom2 tag is not valid ({custom2}). Is this a new phone?.", start="\t")
+    if custom2 not in CUSTOM2_TO_PHONE_MODEL.keys():
+        raise GlyphModderError(f"The custom2 tag is not valid ({custom2}). Is this a new phone?.")
 
     # Remove the newlines from the base64 strings
     author_compressed_base64_debug = author_compressed_base64.replace('\n','\\n')
@@ -727,15 +1985,15 @@ def read_metadata_from_audio_file(audio_file: AudioFile, output_path: str, ffmpe
 
 
     # Print the number of bytes which have been read
-    print(f"\tRead {colored(len(bytearray(author_compressed_base64, 'utf-8')), attrs=['bold'])} bytes of AUTHOR metadata")
-    print(f"\tRead {colored(len(bytearray(custom1_compressed_base64, 'utf-8')), attrs=['bold'])} bytes of CUSTOM1 metadata")
+    log.text("Read {} bytes of AUTHOR metadata", len(bytearray(author_compressed_base64, 'utf-8')), start="\t")
+    log.text("Read {} bytes of CUSTOM1 metadata", len(bytearray(custom1_compressed_base64, 'utf-8')), start="\t")
 
     # Decode the base64 data
     try:
         author_compressed = decode_base64(author_compressed_base64)
         custom1_compressed = decode_base64(custom1_compressed_base64)
     except BinasciiError as e:
-        print_critical_error(f"Failed to decode the base64 data. Is this a valid composition?: {e}", start="\t")
+        raise GlyphModderError(f"Failed to decode the base64 data. Is this a valid composition?: {e}")
     print_debug(f"author_compressed: {author_compressed.hex()}", start="\t")
     print_debug(f"custom1_compressed: {custom1_compressed.hex()}", start="\t")
 
@@ -744,27 +2002,28 @@ def read_metadata_from_audio_file(audio_file: AudioFile, output_path: str, ffmpe
         author_raw = zlib.decompress(author_compressed)
         custom1_raw = zlib.decompress(custom1_compressed)
     except zlib.error as e:
-        print_critical_error(f"Failed to decompress the data. Is this a valid composition?: {e}", start="\t")
+        raise GlyphModderError(f"Failed to decompress the data. Is this a valid composition?: {e}")
 
     # Get author data
     try:
-        author = AuthorData(author_raw.decode('utf-8').splitlines())
-    except (AuthorData.AuthorDataException, UnicodeDecodeError) as e:
-        print_critical_error(f"Failed to parse the AUTHOR data. Is this a valid composition?: {e}", start="\t")
+        author = AuthorData(author_raw)
+    except AuthorData.AuthorDataException as e:
+        raise GlyphModderError(f"Failed to parse the AUTHOR data. Is this a valid composition?: {e}")
     
     # Get custom1 data
     try:
         custom1 = Custom1Data([e for e in custom1_raw.decode('utf-8').split(',') if e])
     except Custom1Data.Custom1DataException as e:
-        print_critical_error(f"Failed to parse the CUSTOM1 data. Is this a valid composition?: {e}", start="\t")
+        raise GlyphModderError(f"Failed to parse the CUSTOM1 data. Is this a valid composition?: {e}")
 
     # Create the nglyph file
     nglyph_data = {
         'VERSION': 1,
-        'PHONE_MODEL': STRING_COLS_TO_PHONE_MODEL[custom2].name,
+        'PHONE_MODEL': CUSTOM2_TO_PHONE_MODEL[custom2].name,
         'AUTHOR': [],
         'CUSTOM1': [f"{'-'.join([str(e) for e in line])}" for line in custom1.data],
     }
+    n_author_rows = len(author.data)
     if watermark is not None:
         # If there is a new line at the end of the file splitlines() will not make an extra empty line => add one if needed
         nglyph_data['WATERMARK'] = watermark.content.splitlines() + ([''] if watermark.content.endswith('\n') else [])
@@ -772,107 +2031,163 @@ def read_metadata_from_audio_file(audio_file: AudioFile, output_path: str, ffmpe
 
         # Encrypt the author data
         author.encrypt(watermark.to_key())
-    nglyph_data['AUTHOR'] = [f"{','.join([str(e) for e in line])}," for line in author.data]
+    nglyph_data['AUTHOR'] = author.to_lines()
 
     # Add legacy option if needed - was made pre 1.4.0 and might desync
     if is_legacy:
         nglyph_data['LEGACY'] = True
 
-    # Get the filenames
-    base_filename = os.path.splitext(os.path.basename(audio_file.audio_path))[0]
-    nglyph_file_path = os.path.join(output_path, base_filename + ".nglyph")
-    
-    # Print info
-    print_info(f"Writing the nglyph file to '{nglyph_file_path}'")
-    
-    # Write the nglyph file
-    with open(nglyph_file_path, 'w', newline='\r\n', encoding='utf-8') as f:
-        json.dump(nglyph_data, f, indent=4)
+    return (nglyph_data, n_author_rows)
 
+def convert_nglyph_file(nglyph_file: NGlyphFile, output_path: str, format_version: int, log: MessageLog) -> str:
+    # Keep encrypted AUTHOR data encrypted
+    author = nglyph_file.encrypted_author if nglyph_file.encrypted_author is not None else nglyph_file.author
 
-def write_metadata_to_audio_file(audio_file: AudioFile, nglyph_file: NGlyphFile, output_path: str, title: str, ffmpeg: FFmpeg, auto_fix_audio: bool) -> None:
+    # All other fields (watermark, salt, legacy, ...) are copied as they are
+    nglyph_data: dict[str, ] = {
+        'VERSION': format_version,
+        'PHONE_MODEL': nglyph_file.phone_model.name,
+        'AUTHOR': [],
+        'CUSTOM1': nglyph_file.data['CUSTOM1'],
+    }
+    nglyph_data.update({key: value for key, value in nglyph_file.data.items() if key not in nglyph_data})
+
+    # Get the filenames
+    base_filename = os.path.splitext(os.path.basename(nglyph_file.file_path))[0]
+    nglyph_file_path = os.path.join(output_path, f"{base_filename}_v{format_version}.nglyph")
+    log.info(f"Writing the nglyph file to '{nglyph_file_path}'")
+
+    if format_version == 1:
+        nglyph_data['AUTHOR'] = author.to_lines()
+        with open(nglyph_file_path, 'w', newline='\r\n', encoding='utf-8') as f:
+            json.dump(nglyph_data, f, indent=4)
+        return nglyph_file_path
+
+    author_array = author.data
+    if nglyph_file.encrypted_author is not None:
+        # Only store the token - the length in front of it does not fit into 16 bits for long compositions
+        token_length = int(author_array[0, 0])
+        author_payload = author_array.reshape(-1)[1:token_length + 1].astype(np.uint8)
+        nglyph_data['AUTHOR'] = { 'ENCODING': 'ENCRYPTED', 'SHAPE': list(author_array.shape), 'TOKEN_LENGTH': token_length }
+    else:
+        if author_array.max() > np.iinfo(np.int16).max or author_array.min() < np.iinfo(np.int16).min:
+            raise NGlyphFile.NGlyphFileException(f"File '{nglyph_file.file_path}' can't be converted - The AUTHOR data contains values that do not fit into 16 bits.")
+        author_payload = author_array.astype('<i2')
+        nglyph_data['AUTHOR'] = { 'ENCODING': 'FRAMES', 'SHAPE': list(author_array.shape) }
+    NGlyphFile.write_v2(nglyph_file_path, nglyph_data, author_payload)
+
+    return nglyph_file_path
+
+# Returns the path of the composed audio file. Raises GlyphModderError if the composition can't be written.
+# The encoded payload from encode_nglyph_payload() is used as long as the AUTHOR data keeps its number of lines. Its AUTHOR data can be None if it should be encoded while writing.
+# Only asks the user on the command line if interactive is set.
+def write_metadata_to_audio_file(audio_file: AudioFile, nglyph_file: NGlyphFile, output_path: str, title: str, ffmpeg: FFmpeg, log: MessageLog, auto_fix_audio: bool, in_place: bool = False, keep_fixed_audio: bool = False, interactive: bool = True, fit_mode: str = 'pad', encoded_payload: tuple[int, str | None, str] | None = None) -> str:
     # Check if the audio file has the right codec and ask the user if we should fix it
+    # The fix is done while writing the composition, a separate fixed file is only created if requested or if we write in place
     audio_file_codec = audio_file.get_audio_codec()
     audio_file_extension = os.path.splitext(audio_file.audio_path)[1]
     audio_file_path_fixed = os.path.splitext(audio_file.audio_path)[0] + "_fixed.ogg"
+    create_fixed_audio_file = keep_fixed_audio or in_place
+    transcode = False
+    # The composed file is named after the original audio file, also if it is written from the cached opus audio
+    composed_name_path = None
     if audio_file_codec != "opus":
         if auto_fix_audio:
-            print_warning(f"The audio file has the wrong codec (got: {audio_file_codec}, expected: opus). Automatically fixing it.", start="\t")
+            log.warning(f"The audio file has the wrong codec (got: {audio_file_codec}, expected: opus). Automatically fixing it.", start="\t")
+        elif not interactive:
+            raise GlyphModderError(f"The audio file has the wrong codec (got: {audio_file_codec}, expected: opus). Pass '--auto-fix-audio' to fix it automatically.")
         else:
             print_warning(f"The audio file has the wrong codec (got: {audio_file_codec}, expected: opus). Do you want to fix it? (Recommended) (Y/n): ", start="\t", end='')
             answer = input().lower()
             if answer == "n":
-                print_critical_error("The audio file has the wrong codec. Please consult the documentation on how to fix it and try again.", start="\t")
-        try:
-            audio_file.fix_audio_codec(ffmpeg, audio_file_path_fixed)
-            audio_file = AudioFile(audio_file.audio_path, ffmpeg) # Reload the audio file to get the new metadata
-        except AudioFile.AudioFileError as e:
-            print_critical_error(e, start="\t")
+                raise GlyphModderError("The audio file has the wrong codec. Please consult the documentation on how to fix it and try again.")
+        if create_fixed_audio_file:
+            try:
+                audio_file.fix_audio_codec(ffmpeg, audio_file_path_fixed, log)
+                audio_file = AudioFile(audio_file.audio_path, ffmpeg, log) # Reload the audio file to get the new metadata
+            except AudioFile.AudioFileError as e:
+                raise GlyphModderError(str(e))
+        elif AudioFile.transcode_cache is not None:
+            # Write the composition from the cached opus audio - it is only converted if it is not cached yet
+            try:
+                cached_audio_file = AudioFile(audio_file.get_cached_opus_audio_path(ffmpeg), ffmpeg, log)
+                composed_name_path = audio_file.audio_path
+                audio_file = cached_audio_file
+            except TranscodeCache.TranscodeCacheException as e:
+                log.warning(f"Converting the audio without the transcode cache: {e}", start="\t")
+                transcode = True
+            except AudioFile.AudioFileError as e:
+                raise GlyphModderError(str(e))
+        else:
+            transcode = True
     # Check if the audio file has the right extension and ask the user if we should fix it
     elif audio_file_extension != '.ogg':
         if auto_fix_audio:
-            print_warning(f"The audio file has the wrong extension (got: {audio_file_extension}, expected: .ogg). Automatically fixing it.", start="\t")
+            log.warning(f"The audio file has the wrong extension (got: {audio_file_extension}, expected: .ogg). Automatically fixing it.", start="\t")
+        elif not interactive:
+            raise GlyphModderError(f"The audio file has the wrong extension (got: {audio_file_extension}, expected: .ogg). Pass '--auto-fix-audio' to fix it automatically.")
         else:
             print_warning(f"The audio file has the wrong extension (got: {audio_file_extension}, expected: .ogg). Do you want to fix it? (Recommended) (Y/n): ", start="\t", end='')
             answer = input().lower()
             if answer == "n":
-                print_critical_error("The audio file has the wrong extension. Please consult the documentation on how to fix it and try again.", start="\t")
+                raise GlyphModderError("The audio file has the wrong extension. Please consult the documentation on how to fix it and try again.")
         
-        # Copy the file to the new path
-        try:
-            audio_file.fix_audio_extension(audio_file_path_fixed)
-        except AudioFile.AudioFileError as e:
-            print_critical_error(e, start="\t")
+        # Copy the file to the new path - otherwise the composed file just gets the right extension
+        if create_fixed_audio_file:
+            try:
+                audio_file.fix_audio_extension(audio_file_path_fixed)
+            except AudioFile.AudioFileError as e:
+                raise GlyphModderError(str(e))
 
-    # Check if the AUTHOR data has enough lines to play the whole song
+    # Fit the AUTHOR data to the length of the audio
     required_n_lines = math.ceil(audio_file.get_audio_duration_ms() / TIME_STEP_MS)
-    if required_n_lines > len(nglyph_file.author.data):
-        # Check if we are off by one line
-        if required_n_lines - 1 == len(nglyph_file.author.data):
-            # Add a new empty line to the author data
-            nglyph_file.author.data.append([0 for _ in range(nglyph_file.author.columns)])
-        else:
+    n_lines = len(nglyph_file.author.data)
+    if fit_mode == 'stretch' and required_n_lines != n_lines and required_n_lines > 0:
+        log.info(f"Stretching the AUTHOR data from {n_lines} to {required_n_lines} lines to fit the audio.", start="\t")
+        nglyph_file.author.resample_rows(required_n_lines)
+    elif required_n_lines > n_lines:
+        # Being off by one line is fine - just add a new empty line to the author data
+        delta = required_n_lines - n_lines
+        if delta > 1:
             # Print the error
-            delta = required_n_lines - len(nglyph_file.author.data)
-            print_warning(f"The AUTHOR data does not have enough lines to play the whole song. Did you really place the 'END' Label at the end of the audio in Audacity? Filling missing data with zeros. (Got: {len(nglyph_file.author.data)}, Expected: {required_n_lines}, Off by: {delta} ({delta * TIME_STEP_MS:.3f}ms))", start="\t")
-            for _ in range(delta):
-                nglyph_file.author.data.append([0 for _ in range(nglyph_file.author.columns)])
-        
-        nglyph_file.author.regenerate_raw_data_from_data()
+            log.warning(f"The AUTHOR data does not have enough lines to play the whole song. Did you really place the 'END' Label at the end of the audio in Audacity? Filling missing data with zeros. (Got: {n_lines}, Expected: {required_n_lines}, Off by: {delta} ({delta * TIME_STEP_MS:.3f}ms))", start="\t")
+        nglyph_file.author.append_empty_rows(delta)
+    elif fit_mode == 'trim' and required_n_lines < n_lines and required_n_lines > 0:
+        log.info(f"Cutting the last {n_lines - required_n_lines} lines of the AUTHOR data because they are after the end of the audio.", start="\t")
+        nglyph_file.author.truncate_rows(required_n_lines)
     assert required_n_lines <= len(nglyph_file.author.data), "[Development Error] The AUTHOR data still does not have enough lines to play the whole song. What happened here?"
 
     # Print the watermark
     if nglyph_file.watermark is not None:
-        print_info("Watermark by creator detected - always give credit to the creator!", start="\t")
-        print('\t' + nglyph_file.watermark.content.replace('\n', '\n\t') + '\n')
+        log.info("Watermark by creator detected - always give credit to the creator!", start="\t")
+        log.text(nglyph_file.watermark.content, start="\t", end="\n\n")
         
 
-    # Compress the data
-    author_compressed = zlib.compress(nglyph_file.author.raw_data, zlib.Z_BEST_COMPRESSION)
-    custom1_compressed = zlib.compress(nglyph_file.custom1.raw_data, zlib.Z_BEST_COMPRESSION)
-
-    # Encode the compressed data as base64
-    author_compressed_base64 = encode_base64(author_compressed)
-    custom1_compressed_base64 = encode_base64(custom1_compressed)
-
-    # Add new lines to the base64 string every 76th character
-    author_compressed_base64 = '\n'.join([author_compressed_base64[i:i+76] for i in range(0, len(author_compressed_base64), 76)]) + '\n'
-    custom1_compressed_base64 = '\n'.join([custom1_compressed_base64[i:i+76] for i in range(0, len(custom1_compressed_base64), 76)]) + '\n'
+    # Compress and encode the data - only if the payload does not fit
+    # Ogg Opus files are written directly and need the whole metadata, ffmpeg gets the AUTHOR data streamed into it
+    write_natively = not transcode and audio_file.ogg_file is not None and audio_file.ogg_file.codec_name == 'opus'
+    custom1_compressed_base64 = encoded_payload[2] if encoded_payload is not None else encode_metadata_value(nglyph_file.custom1.raw_data)
+    author_compressed_base64: str | EncodedMetadataStream
+    if encoded_payload is not None and encoded_payload[1] is not None and encoded_payload[0] == len(nglyph_file.author.data):
+        author_compressed_base64 = encoded_payload[1]
+    elif write_natively:
+        author_compressed_base64 = encode_author_data(nglyph_file.author)
+    else:
+        author_compressed_base64 = EncodedMetadataStream(nglyph_file.author.iter_raw_data())
 
-    # Build the new filename
-    audio_file_ext_split = os.path.splitext(os.path.basename(audio_file.audio_path))
-    new_audio_file_path = os.path.join(output_path, audio_file_ext_split[0] + '_composed' + audio_file_ext_split[1])
+    # Build the new filename - the composed file is always an ogg file
+    audio_file_ext_split = os.path.splitext(os.path.basename(composed_name_path or audio_file.audio_path))
+    new_audio_file_path = audio_file.audio_path if in_place else os.path.join(output_path, audio_file_ext_split[0] + '_composed.ogg')
 
-    # Get the CUSTOM2 tag by reverse lookup STRING_TO_COLS to get the string from the enum
-    custom2 = STRING_TO_COLS.get(nglyph_file.author.columns_mode, None)
-    assert custom2 is not None, "[Development Error] Could not find the custom2 tag."
+    # Get the CUSTOM2 tag from the columns model
+    custom2 = nglyph_file.author.columns_mode.custom2
 
     # Construct the metadata
     metadata = {
         'TITLE': title,
         'ALBUM': f"Glyph Tools v{SCRIPT_VERSION_MAJOR}",
         'AUTHOR': author_compressed_base64,
-        'COMPOSER': f"v1-{DEVICE_CODENAME[nglyph_file.author.columns_mode]} Glyph Composer",
+        'COMPOSER': f"v1-{nglyph_file.author.columns_mode.codename} Glyph Composer",
         'CUSTOM1': custom1_compressed_base64,
         'CUSTOM2': custom2,
     }
@@ -881,17 +2196,450 @@ def write_metadata_to_audio_file(audio_file: AudioFile, nglyph_file: NGlyphFile,
     print_debug(f"metadata: {metadata}", start="\t")
 
     # Print info
-    print_info(f"Writing the composition to '{new_audio_file_path}'", start="\t")
+    log.info(f"Writing the composition to '{new_audio_file_path}'", start="\t")
 
-    # Write the metadata to the audio file
-    try:
-        ffmpeg.write_metadata_to_audio_file(audio_file.audio_path, new_audio_file_path, metadata)
-    except FFmpeg.FFmpegError as e:
-        print_critical_error(e, start="\t")
+    # Write the metadata to the audio file - Ogg Opus files are written directly, ffmpeg is only needed for everything else
+    written = False
+    if write_natively:
+        try:
+            # In place: only rewrite the comment header if the new metadata fits into it, otherwise rewrite the whole file once and reserve space
+            if in_place and audio_file.ogg_file.update_tags_in_place(metadata):
+                print_debug("Updated the metadata in place.", start="\t")
+            else:
+                audio_file.ogg_file.write_tags(new_audio_file_path, metadata, reserve_padding=in_place)
+            written = True
+        except OggFile.OggFileError as e:
+            print_debug(f"Writing the Ogg file failed, falling back to ffmpeg: {e}", start="\t")
+    if not written:
+        try:
+            if in_place:
+                # ffmpeg can't write to its input file
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(new_audio_file_path), suffix=audio_file_ext_split[1])
+                os.close(fd)
+                try:
+                    ffmpeg.write_metadata_to_audio_file(audio_file.audio_path, temp_path, metadata)
+                    # Editing the file in place must not change its permissions
+                    set_replacement_file_mode(temp_path, new_audio_file_path)
+                    os.replace(temp_path, new_audio_file_path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+            else:
+                ffmpeg.write_metadata_to_audio_file(audio_file.audio_path, new_audio_file_path, metadata, transcode)
+        except (FFmpeg.FFmpegError, OSError) as e:
+            raise GlyphModderError(str(e))
 
     # Print the number of bytes which have been written
-    print(f"\tWrote {colored(len(bytearray(author_compressed_base64, 'utf-8')), attrs=['bold'])} bytes of AUTHOR metadata")
-    print(f"\tWrote {colored(len(bytearray(custom1_compressed_base64, 'utf-8')), attrs=['bold'])} bytes of CUSTOM1 metadata")    
+    author_size = author_compressed_base64.size if isinstance(author_compressed_base64, EncodedMetadataStream) else len(bytearray(author_compressed_base64, 'utf-8'))
+    log.text("Wrote {} bytes of AUTHOR metadata", author_size, start="\t")
+    log.text("Wrote {} bytes of CUSTOM1 metadata", len(bytearray(custom1_compressed_base64, 'utf-8')), start="\t")
+
+    return new_audio_file_path
+
+# Run a stage of a write on a worker thread and store its duration in seconds
+async def run_write_stage(timings: dict[str, float], stage_name: str, function, *args):
+    start = time.perf_counter()
+    result = await asyncio.to_thread(function, *args)
+    timings[stage_name] = time.perf_counter() - start
+    return result
+
+# Read the nglyph file and compress and encode its payload - the AUTHOR data is only encoded if it can't be streamed while writing
+async def prepare_nglyph_file(nglyph_path: str, encode_author: bool, timings: dict[str, float]) -> tuple[NGlyphFile, tuple[int, str | None, str]]:
+    nglyph_file = await run_write_stage(timings, 'nglyph', NGlyphFile, nglyph_path)
+    if not encode_author:
+        return (nglyph_file, (len(nglyph_file.author.data), None, await run_write_stage(timings, 'CUSTOM1', encode_metadata_value, nglyph_file.custom1.raw_data)))
+    # zlib releases the GIL, so AUTHOR and CUSTOM1 are compressed at the same time
+    author_base64, custom1_base64 = await asyncio.gather(
+        run_write_stage(timings, 'AUTHOR', encode_author_data, nglyph_file.author),
+        run_write_stage(timings, 'CUSTOM1', encode_metadata_value, nglyph_file.custom1.raw_data)
+    )
+    return (nglyph_file, (len(nglyph_file.author.data), author_base64, custom1_base64))
+
+# Probe the audio file while the nglyph file is read, decrypted and encoded - ffprobe, the key derivation and zlib all release the GIL.
+# The AUTHOR payload is encoded before the length of the audio is known and is only encoded again if it has to be fitted.
+# Audio files that are written with ffmpeg get the AUTHOR payload streamed into it instead.
+# Raises AudioFile.AudioFileError or NGlyphFile.NGlyphFileException.
+async def prepare_write(audio_path: str, nglyph_path: str, ffmpeg: FFmpeg, log: MessageLog, timings: dict[str, float]) -> tuple[AudioFile, NGlyphFile, tuple[int, str | None, str]]:
+    # Wait for both so no stage is left running, then report the errors in the same order as before: the audio file first
+    audio_result, nglyph_result = await asyncio.gather(run_write_stage(timings, 'audio', AudioFile, audio_path, ffmpeg, log), prepare_nglyph_file(nglyph_path, OggFile.is_ogg_opus(audio_path), timings), return_exceptions=True)
+    for result in (audio_result, nglyph_result):
+        if isinstance(result, BaseException):
+            raise result
+    return (audio_result, *nglyph_result)
+
+# Print the durations of the stages of a write
+def print_write_timings(timings: dict[str, float], total_s: float) -> None:
+    stage_names = { 'audio': "Reading the audio file", 'nglyph': "Reading the nglyph file", 'AUTHOR': "Encoding AUTHOR", 'CUSTOM1': "Encoding CUSTOM1", 'write': "Writing the composition" }
+    print_info("Timings:")
+    for stage_name, description in stage_names.items():
+        if stage_name in timings:
+            print(f"\t{description}: {timings[stage_name] * 1000:.1f}ms")
+    print(f"\tTotal: {colored(f'{total_s * 1000:.1f}ms', attrs=['bold'])} ({max(sum(timings.values()) - total_s, 0) * 1000:.1f}ms saved by running stages concurrently)")
+
+# Read the entries of a batch manifest. Returns a list of {'nglyph': path, 'audio': path, 'title': title}.
+def read_batch_manifest(manifest_path: str, default_title: str) -> list[dict[str, str]]:
+    try:
+        with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+            if manifest_path.lower().endswith('.json'):
+                entries = json.load(f)
+            else:
+                entries = list(csv.DictReader(f, skipinitialspace=True))
+    except (OSError, ValueError, csv.Error) as e:
+        raise Exception(f"Error while reading the manifest file: {e}")
+    if not isinstance(entries, list):
+        raise Exception("The manifest file must contain a list of entries.")
+
+    # Relative paths are relative to the manifest file
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    batch_entries: list[dict[str, str]] = []
+    for entry_nr, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict) or not isinstance(entry.get('nglyph', None), str) or not isinstance(entry.get('audio', None), str) or entry['nglyph'].strip() == "" or entry['audio'].strip() == "":
+            raise Exception(f"Entry {entry_nr} of the manifest file needs an 'nglyph' and an 'audio' path.")
+        title = entry.get('title', None)
+        batch_entries.append({
+            'nglyph': os.path.join(manifest_dir, entry['nglyph'].strip()),
+            'audio': os.path.join(manifest_dir, entry['audio'].strip()),
+            'title': title if isinstance(title, str) and title != "" else default_title,
+        })
+    return batch_entries
+
+# Share the CPU cores between the jobs - each job compresses large payloads on multiple threads
+def get_compression_threads(n_jobs: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(n_jobs, 1))
+
+# The nglyph file and its encoded payload of a fan-out write - sent to every worker process only once
+fan_out_nglyph: tuple[NGlyphFile, tuple[int, str, str]] | None = None
+
+def init_fan_out_worker(prepared_nglyph: tuple[NGlyphFile, tuple[int, str, str]] | None) -> None:
+    global fan_out_nglyph
+    fan_out_nglyph = prepared_nglyph
+
+def write_batch_entry_job(entry: dict[str, str], output_path: str, ffmpeg_path: str, ffprobe_path: str, auto_fix_audio: bool, keep_fixed_audio: bool, fit_mode: str, key_cache_dir: str | None, compression_threads: int, in_place: bool = False, transcode_cache_dir: str | None = None) -> tuple[bool, str, str]:
+    # Runs in a worker process - collect the output so the messages of the entries do not get mixed up
+    output = io.StringIO()
+    log = MessageLog(output)
+    try:
+        # Class attributes are not set in spawned worker processes
+        if key_cache_dir is not None and Watermark.key_cache is None:
+            Watermark.key_cache = KeyCache(key_cache_dir)
+        if transcode_cache_dir is not None and AudioFile.transcode_cache is None:
+            AudioFile.transcode_cache = TranscodeCache(transcode_cache_dir)
+        ParallelCompressor.max_threads = compression_threads
+
+        for file_path in (entry['nglyph'], entry['audio']):
+            if not os.path.isfile(file_path):
+                raise Exception(f"The file does not exist: '{file_path}'")
+
+        ffmpeg = FFmpeg(ffmpeg_path, ffprobe_path)
+        audio_file = AudioFile(entry['audio'], ffmpeg, log)
+        encoded_payload = None
+        if fan_out_nglyph is not None:
+            # Fitting the AUTHOR data to the audio only replaces the attributes, so a shallow copy keeps the shared nglyph file unchanged
+            nglyph_file = copy.copy(fan_out_nglyph[0])
+            nglyph_file.author = copy.copy(nglyph_file.author)
+            encoded_payload = fan_out_nglyph[1]
+        else:
+            nglyph_file = NGlyphFile(entry['nglyph'])
+            if nglyph_file.legacy:
+                log.warning("This is an \"old\" composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!")
+        composed_file_path = write_metadata_to_audio_file(audio_file, nglyph_file, output_path, entry['title'], ffmpeg, log, auto_fix_audio, in_place, keep_fixed_audio, interactive=False, fit_mode=fit_mode, encoded_payload=encoded_payload)
+    except Exception as e:
+        # Also catch unexpected errors so one broken entry does not stop the whole batch
+        return (False, output.getvalue(), str(e))
+    return (True, output.getvalue(), composed_file_path)
+
+# Write the metadata of all batch entries in parallel and write the report (if there is a report path). Returns the exit code.
+# With a prepared nglyph file (fan-out) all entries get this nglyph file and its encoded payload.
+def write_batch(entries: list[dict[str, str]], output_path: str, report_path: str | None, n_jobs: int, ffmpeg: FFmpeg, auto_fix_audio: bool, keep_fixed_audio: bool, fit_mode: str, key_cache_dir: str | None, in_place: bool = False, prepared_nglyph: tuple[NGlyphFile, tuple[int, str, str]] | None = None, transcode_cache_dir: str | None = None) -> int:
+    # Entries with the same audio file name would overwrite each others composed file
+    output_names: dict[str, int] = {}
+    errors: dict[int, str] = {}
+    for entry_nr, entry in enumerate(entries if not in_place else []):
+        output_name = os.path.splitext(os.path.basename(entry['audio']))[0].lower()
+        if output_name in output_names:
+            errors[entry_nr] = f"The composed file would overwrite the one of '{entries[output_names[output_name]]['audio']}'. Please rename one of the audio files."
+        else:
+            output_names[output_name] = entry_nr
+
+    # Process the entries in parallel
+    n_jobs = min(n_jobs, len(entries))
+    print_info(f"Processing {len(entries)} entries with {n_jobs} jobs...")
+    results: list[dict[str, ]] = []
+    with ProcessPoolExecutor(max_workers=max(n_jobs, 1), initializer=init_fan_out_worker, initargs=(prepared_nglyph,)) as executor:
+        futures = {entry_nr: executor.submit(write_batch_entry_job, entry, output_path, ffmpeg.ffmpeg_path, ffmpeg.ffprobe_path, auto_fix_audio, keep_fixed_audio, fit_mode, key_cache_dir, get_compression_threads(n_jobs), in_place, transcode_cache_dir) for entry_nr, entry in enumerate(entries) if entry_nr not in errors}
+
+        # Print the results in the order of the manifest
+        for entry_nr, entry in enumerate(entries):
+            print_info(f"Entry {entry_nr + 1}: '{entry['audio']}':", start="\n")
+            composed_file_path = None
+            if entry_nr not in errors:
+                success, output, message = futures[entry_nr].result()
+                print(output, end="", flush=True)
+                if success:
+                    composed_file_path = message
+                else:
+                    errors[entry_nr] = message
+            if entry_nr in errors:
+                print_error(errors[entry_nr])
+            results.append({ **entry, 'success': entry_nr not in errors, 'output': composed_file_path, 'error': errors.get(entry_nr, None) })
+
+    # Write the report - fan-out writes have none
+    if report_path is not None:
+        try:
+            with open(report_path, 'w', newline='\n', encoding='utf-8') as f:
+                json.dump({ 'succeeded': len(entries) - len(errors), 'failed': len(errors), 'entries': results }, f, indent=4)
+        except OSError as e:
+            print_error(f"Could not write the report: {e}")
+            return 1
+
+    # Print the summary
+    print("")
+    print_info(f"Wrote {len(entries) - len(errors)} of {len(entries)} compositions." + (f" Report: '{report_path}'" if report_path is not None else ""))
+    if len(errors) > 0:
+        for entry_nr in sorted(errors.keys()):
+            print_error(f"Entry {entry_nr + 1} ('{entries[entry_nr]['audio']}'): {errors[entry_nr]}")
+        return 1
+
+    cprint("Done!", color="green", attrs=["bold"])
+    return 0
+
+# Get the SHA-256 hash of a file as a hex string
+def get_file_hash(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(HASH_BUFFER_SIZE):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+# Open the catalog and create the table if needed
+def open_catalog(catalog_path: str) -> sqlite3.Connection:
+    catalog = sqlite3.connect(catalog_path)
+    try:
+        schema_version = catalog.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version not in (0, CATALOG_SCHEMA_VERSION):
+            raise sqlite3.DatabaseError(f"The catalog was created by another version of this script (got: {schema_version}, expected: {CATALOG_SCHEMA_VERSION}). Please use a new catalog.")
+        catalog.executescript(f"""
+            CREATE TABLE IF NOT EXISTS audio_files (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                nglyph_path TEXT,
+                phone_model TEXT,
+                custom2 TEXT,
+                duration_ms REAL,
+                author_rows INTEGER,
+                legacy INTEGER,
+                watermark INTEGER,
+                album TEXT,
+                composer TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS audio_files_phone_model ON audio_files (phone_model);
+            CREATE INDEX IF NOT EXISTS audio_files_sha256 ON audio_files (sha256);
+            PRAGMA user_version = {CATALOG_SCHEMA_VERSION};
+        """)
+    except sqlite3.Error:
+        catalog.close()
+        raise
+    return catalog
+
+def scan_audio_file_job(audio_path: str, output_path: str, known_state: tuple[str, int] | None, ffmpeg_path: str, ffprobe_path: str, key_cache_dir: str | None, compression_threads: int) -> tuple[str, dict[str, ]]:
+    # Runs in a worker process - returns the status ('skipped', 'read' or 'failed') and the catalog row
+    row: dict[str, ] = { 'path': audio_path, 'sha256': '', 'size': 0, 'mtime_ns': 0, 'nglyph_path': None, 'phone_model': None, 'custom2': None, 'duration_ms': None, 'author_rows': None, 'legacy': None, 'watermark': None, 'album': None, 'composer': None, 'error': None }
+    try:
+        stat = os.stat(audio_path)
+        row.update(sha256=get_file_hash(audio_path), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    except OSError as e:
+        row['error'] = str(e)
+        return ('failed', row)
+
+    # Nothing changed since the last scan
+    if known_state == (row['sha256'], row['mtime_ns']):
+        return ('skipped', row)
+
+    # The messages of the files are not printed, only the reason why a file failed
+    log = MessageLog()
+    try:
+        # Class attributes are not set in spawned worker processes
+        if key_cache_dir is not None and Watermark.key_cache is None:
+            Watermark.key_cache = KeyCache(key_cache_dir)
+        ParallelCompressor.max_threads = compression_threads
+
+        ffmpeg = FFmpeg(ffmpeg_path, ffprobe_path)
+        audio_file = AudioFile(audio_path, ffmpeg, log)
+        tags = audio_file.get_tags()
+        row.update(duration_ms=audio_file.get_audio_duration_ms(), custom2=tags.get('CUSTOM2', None), album=tags.get('ALBUM', None), composer=tags.get('COMPOSER', None))
+
+        os.makedirs(output_path, exist_ok=True)
+        nglyph_file_path, nglyph_data, n_author_rows = read_metadata_from_audio_file(audio_file, output_path, ffmpeg, log)
+        row.update(nglyph_path=nglyph_file_path, phone_model=nglyph_data['PHONE_MODEL'], author_rows=n_author_rows, legacy=int(nglyph_data.get('LEGACY', False)), watermark=int('WATERMARK' in nglyph_data))
+    except Exception as e:
+        # Also catch unexpected errors so one broken file does not stop the whole scan
+        row['error'] = str(e)
+        return ('failed', row)
+    return ('read', row)
+
+# Read all audio files in a directory in parallel and update the catalog. Returns the exit code.
+def scan_audio_files(scan_path: str, output_path: str, catalog_path: str, n_jobs: int, ffmpeg: FFmpeg, key_cache_dir: str | None) -> int:
+    audio_paths = sorted(os.path.join(dir_path, file_name) for dir_path, _, file_names in os.walk(scan_path) for file_name in file_names if os.path.splitext(file_name)[1].lower() in SCAN_AUDIO_EXTENSIONS)
+
+    try:
+        catalog = open_catalog(catalog_path)
+    except sqlite3.Error as e:
+        print_critical_error(f"Could not open the catalog '{catalog_path}': {e}")
+
+    with catalog:
+        # Files are only read again if their content or modification time changed, if their nglyph file is gone or if they failed last time
+        known_states: dict[str, tuple[str, int]] = {}
+        removed_paths: list[str] = []
+        for path, sha256, mtime_ns, nglyph_path, error in catalog.execute("SELECT path, sha256, mtime_ns, nglyph_path, error FROM audio_files"):
+            if not path.startswith(os.path.join(scan_path, '')):
+                continue
+            if not os.path.isfile(path):
+                removed_paths.append(path)
+            elif error is None and nglyph_path is not None and os.path.isfile(nglyph_path):
+                known_states[path] = (sha256, mtime_ns)
+        catalog.executemany("DELETE FROM audio_files WHERE path = ?", [(path,) for path in removed_paths])
+
+        n_jobs = min(n_jobs, len(audio_paths))
+        print_info(f"Scanning {len(audio_paths)} files with {n_jobs} jobs...")
+        counts = { 'read': 0, 'skipped': 0, 'failed': 0 }
+        with ProcessPoolExecutor(max_workers=max(n_jobs, 1)) as executor:
+            futures = [executor.submit(scan_audio_file_job, audio_path, os.path.join(output_path, os.path.relpath(os.path.dirname(audio_path), scan_path)), known_states.get(audio_path, None), ffmpeg.ffmpeg_path, ffmpeg.ffprobe_path, key_cache_dir, get_compression_threads(n_jobs)) for audio_path in audio_paths]
+
+            # Print the results as they come in - the order does not matter with thousands of files
+            for future in as_completed(futures):
+                status, row = future.result()
+                counts[status] += 1
+                if status == 'skipped':
+                    print_debug(f"Skipped '{row['path']}'")
+                    continue
+                if status == 'failed':
+                    print_error(f"'{row['path']}': {row['error']}")
+                else:
+                    print(f"Read '{row['path']}' ({row['phone_model']}{', legacy' if row['legacy'] else ''}{', watermark' if row['watermark'] else ''})")
+                catalog.execute(f"INSERT OR REPLACE INTO audio_files ({', '.join(row.keys())}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+    catalog.close()
+
+    # Print the summary
+    print("")
+    print_info(f"Read {counts['read']}, skipped {counts['skipped']} unchanged and removed {len(removed_paths)} deleted files. Catalog: '{catalog_path}'")
+    if counts['failed'] > 0:
+        print_warning(f"{counts['failed']} files could not be read. List them with '{SCRIPT_NAME} query --failed \"{catalog_path}\"'.")
+
+    cprint("Done!", color="green", attrs=["bold"])
+    return 0
+
+# Print the audio files in the catalog that match all given filters. Returns the exit code.
+def query_catalog(catalog_path: str, phone_model: str | None, legacy: bool, watermark: bool, failed: bool) -> int:
+    conditions = ["error IS NOT NULL" if failed else "error IS NULL"]
+    parameters: list[str] = []
+    if phone_model is not None:
+        conditions.append("phone_model = ?")
+        parameters.append(phone_model)
+    if legacy:
+        conditions.append("legacy = 1")
+    if watermark:
+        conditions.append("watermark = 1")
+
+    try:
+        # Open read only so a wrong path does not create an empty catalog
+        catalog = sqlite3.connect(f"file:{catalog_path}?mode=ro", uri=True)
+        try:
+            rows = catalog.execute(f"SELECT path, phone_model, duration_ms, author_rows, album, composer, error FROM audio_files WHERE {' AND '.join(conditions)} ORDER BY path", parameters).fetchall()
+        finally:
+            catalog.close()
+    except sqlite3.Error as e:
+        print_critical_error(f"Could not read the catalog '{catalog_path}': {e}")
+
+    for path, row_phone_model, duration_ms, author_rows, album, composer, error in rows:
+        if failed:
+            print(f"{path}\t{error}")
+        else:
+            print(f"{path}\t{row_phone_model}\t{duration_ms / 1000:.3f}s\t{author_rows} rows\t{album}\t{composer}")
+    print_info(f"Found {len(rows)} files.")
+    return 0
+
+
+# +------------------------------------+
+# |                                    |
+# |                API                 |
+# |                                    |
+# +------------------------------------+
+
+# For importing the GlyphModder as a module: these functions never print, ask or exit the process.
+# Errors are raised as GlyphModderError and the messages that the command line prints are returned with the results as (level, text) tuples.
+
+# A composition read from an audio file
+class Composition:
+    def __init__(self, audio_path: str, nglyph_data: dict[str, ], author_rows: int, messages: list[tuple[str, str]]) -> None:
+        self.audio_path: str = audio_path
+        # The content of the nglyph file - the AUTHOR data stays encrypted if there is a watermark
+        self.nglyph_data: dict[str, ] = nglyph_data
+        self.phone_model: str = nglyph_data['PHONE_MODEL']
+        # The number of rows of the decrypted AUTHOR data
+        self.author_rows: int = author_rows
+        self.legacy: bool = nglyph_data.get('LEGACY', False)
+        self.watermark: str | None = '\n'.join(nglyph_data['WATERMARK']) if 'WATERMARK' in nglyph_data else None
+        self.messages: list[tuple[str, str]] = messages
+
+    # Write the composition as a nglyph file
+    def save(self, nglyph_path: str) -> None:
+        try:
+            write_nglyph_data(nglyph_path, self.nglyph_data)
+        except OSError as e:
+            raise GlyphModderError(f"Could not write the nglyph file: {e}")
+
+# The result of writing a composition to an audio file
+class WriteResult:
+    def __init__(self, output_path: str, messages: list[tuple[str, str]]) -> None:
+        self.output_path: str = output_path
+        self.messages: list[tuple[str, str]] = messages
+
+# Run a function with a new message log that is passed to it. Returns its result and the messages, failures are raised as GlyphModderError.
+def run_logged(function: Callable[[MessageLog], any]) -> tuple[any, list[tuple[str, str]]]:
+    log = MessageLog()
+    try:
+        check_device_profiles()
+        result = function(log)
+    except GlyphModderError as e:
+        e.messages = log.messages
+        raise
+    except (DeviceProfile.DeviceProfileException, AudioFile.AudioFileError, NGlyphFile.NGlyphFileException, FFmpeg.FFmpegError, OggFile.OggFileError, OSError) as e:
+        raise GlyphModderError(str(e), log.messages) from e
+    return (result, log.messages)
+
+# Read the composition of an audio file
+def read_composition(audio_path: str, ffprobe_path: str = DEFAULT_ARGS['ffprobe_path']['value'][0]) -> Composition:
+    if not os.path.isfile(audio_path):
+        raise GlyphModderError(f"Audio file does not exist: '{audio_path}'")
+    ffmpeg = FFmpeg(DEFAULT_ARGS['ffmpeg_path']['value'][0], ffprobe_path)
+    (nglyph_data, author_rows), messages = run_logged(lambda log: read_nglyph_data_from_audio_file(AudioFile(audio_path, ffmpeg, log), log))
+    return Composition(audio_path, nglyph_data, author_rows, messages)
+
+# Write a composition to an audio file. The nglyph can be the path to a nglyph file or the nglyph data (e.g. of a Composition).
+# The composed file is written to the output directory, or into the audio file itself if in_place is set.
+def write_composition(nglyph: str | dict[str, ], audio_path: str, output_path: str, title: str = DEFAULT_ARGS['title']['value'][0], fit_mode: str = AUTHOR_FIT_MODES[0], auto_fix_audio: bool = False, in_place: bool = False, keep_fixed_audio: bool = False, ffmpeg_path: str = DEFAULT_ARGS['ffmpeg_path']['value'][0], ffprobe_path: str = DEFAULT_ARGS['ffprobe_path']['value'][0]) -> WriteResult:
+    if isinstance(nglyph, str) and not os.path.isfile(nglyph):
+        raise GlyphModderError(f"Nglyph file does not exist: '{nglyph}'")
+    if not os.path.isfile(audio_path):
+        raise GlyphModderError(f"Audio file does not exist: '{audio_path}'")
+    if not in_place and not os.path.isdir(output_path):
+        raise GlyphModderError(f"The output directory does not exist: '{output_path}'")
+    if fit_mode not in AUTHOR_FIT_MODES:
+        raise GlyphModderError(f"Invalid fit mode: '{fit_mode}' (expected one of: {', '.join(AUTHOR_FIT_MODES)})")
+    ffmpeg = FFmpeg(ffmpeg_path, ffprobe_path)
+    composed_file_path, messages = run_logged(lambda log: write_composition_with_log(nglyph, audio_path, output_path, title, fit_mode, auto_fix_audio, in_place, keep_fixed_audio, ffmpeg, log))
+    return WriteResult(composed_file_path, messages)
+
+# The part of write_composition that reports its messages - run by run_logged
+def write_composition_with_log(nglyph: str | dict[str, ], audio_path: str, output_path: str, title: str, fit_mode: str, auto_fix_audio: bool, in_place: bool, keep_fixed_audio: bool, ffmpeg: FFmpeg, log: MessageLog) -> str:
+    nglyph_file = NGlyphFile(nglyph) if isinstance(nglyph, str) else NGlyphFile("<nglyph data>", nglyph)
+    if nglyph_file.legacy:
+        log.warning("This is an \"old\" composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!")
+    audio_file = AudioFile(audio_path, ffmpeg, log)
+    return write_metadata_to_audio_file(audio_file, nglyph_file, output_path, title, ffmpeg, log, auto_fix_audio, in_place, keep_fixed_audio, interactive=False, fit_mode=fit_mode)
 
 
 # +------------------------------------+
@@ -912,49 +2660,112 @@ def main() -> int:
     args = build_arguments_parser().parse_args()
     print_debug(f"args: {args}")
 
-    # Check if we read or write the metadata
+    # Nothing works without the device profiles
+    try:
+        check_device_profiles()
+    except DeviceProfile.DeviceProfileException as e:
+        print_critical_error(e)
+
+    # Print the messages of reading and writing right away
+    log = MessageLog(sys.stdout)
+
+    # Check if we read or write the metadata or convert a nglyph file
     write: bool = False
+    convert: bool = False
+    batch: bool = False
+    scan: bool = False
     if args.subcommand == "write" or args.subcommand == "w":
         write = True
+    elif args.subcommand == "batch" or args.subcommand == "b":
+        write = True
+        batch = True
     elif args.subcommand == "read" or args.subcommand == "r":
         write = False
+    elif args.subcommand == "scan" or args.subcommand == "s":
+        scan = True
+    elif args.subcommand == "query" or args.subcommand == "q":
+        return query_catalog(os.path.abspath(args.CATALOG_PATH[0]), args.phone_model, args.legacy, args.watermark, args.failed)
+    elif args.subcommand == "convert" or args.subcommand == "c":
+        convert = True
     else:
         print_critical_error(f"[Development Error] Invalid subcommand: '{args.subcommand}'", 2)
-    print_debug(f"write: {write}")
+    print_debug(f"write: {write}, convert: {convert}, batch: {batch}, scan: {scan}")
 
     # Expand the paths
-    args.AUDIO_PATH[0] = os.path.abspath(args.AUDIO_PATH[0])
-    if write:
+    if batch:
+        args.MANIFEST_PATH[0] = os.path.abspath(args.MANIFEST_PATH[0])
+        if args.report_path is not None:
+            args.report_path[0] = os.path.abspath(args.report_path[0])
+    elif scan:
+        args.SCAN_PATH[0] = os.path.abspath(args.SCAN_PATH[0])
+    elif not convert:
+        args.AUDIO_PATH = [os.path.abspath(audio_path) for audio_path in args.AUDIO_PATH]
+    if (write and not batch) or convert:
         args.NGLYPH_PATH[0] = os.path.abspath(args.NGLYPH_PATH[0])
     if args.ffmpeg_path[0] != DEFAULT_ARGS['ffmpeg_path']['value'][0]:
         args.ffmpeg_path[0] = os.path.abspath(args.ffmpeg_path[0])
     if args.ffprobe_path[0] != DEFAULT_ARGS['ffprobe_path']['value'][0]:
         args.ffprobe_path[0] = os.path.abspath(args.ffprobe_path[0])
     args.output_path[0] = os.path.abspath(args.output_path[0])
+    if scan:
+        args.catalog_path = [os.path.abspath(args.catalog_path[0] if args.catalog_path is not None else os.path.join(args.output_path[0], CATALOG_FILE_NAME))]
     print_debug(f"expanded args: {args}")
 
-    # Check the requirements
-    check_requirements(args.ffmpeg_path[0], args.ffprobe_path[0], write, args.disable_ff_v_check)
+    # Check the requirements - converting does not need ffmpeg and the requirements of a batch or scan depend on its files
+    if not convert and not batch and not scan:
+        check_requirements(args.ffmpeg_path[0], args.ffprobe_path[0], write, args.disable_ff_v_check, any(not OggFile.is_ogg(audio_path) for audio_path in args.AUDIO_PATH), any(not OggFile.is_ogg_opus(audio_path) for audio_path in args.AUDIO_PATH))
 
     # Perform all the checks
     try:
-        perform_checks(args.__dict__, write)
+        perform_checks(args.__dict__, write, convert, batch, scan)
+        if batch:
+            batch_entries = read_batch_manifest(args.MANIFEST_PATH[0], args.title[0])
     except Exception as e:
         print_critical_error(e)
     
     print_debug("")
 
+    # Set up the watermark key cache
+    if args.key_cache is not None:
+        try:
+            Watermark.key_cache = KeyCache(os.path.abspath(args.key_cache))
+        except KeyCache.KeyCacheException as e:
+            print_critical_error(e)
+
+    # Set up the transcode cache
+    if args.transcode_cache is not None:
+        try:
+            AudioFile.transcode_cache = TranscodeCache(os.path.abspath(args.transcode_cache))
+        except TranscodeCache.TranscodeCacheException as e:
+            print_critical_error(e)
+
+    # Write all entries of the manifest - the requirements are only checked once for all of them
+    if batch:
+        check_requirements(args.ffmpeg_path[0], args.ffprobe_path[0], write, args.disable_ff_v_check, any(not OggFile.is_ogg(entry['audio']) for entry in batch_entries), any(not OggFile.is_ogg_opus(entry['audio']) for entry in batch_entries))
+        report_path = args.report_path[0] if args.report_path is not None else os.path.join(args.output_path[0], os.path.splitext(os.path.basename(args.MANIFEST_PATH[0]))[0] + "_report.json")
+        return write_batch(batch_entries, args.output_path[0], report_path, args.jobs, FFmpeg(args.ffmpeg_path[0], args.ffprobe_path[0]), args.auto_fix_audio, args.keep_fixed_audio, args.fit_mode, os.path.abspath(args.key_cache) if args.key_cache is not None else None, transcode_cache_dir=os.path.abspath(args.transcode_cache) if args.transcode_cache is not None else None)
+
+    # Read all files in the directory - Ogg files are read directly, so ffprobe is only needed if a file is not one
+    if scan:
+        return scan_audio_files(args.SCAN_PATH[0], args.output_path[0], args.catalog_path[0], args.jobs, FFmpeg(args.ffmpeg_path[0], args.ffprobe_path[0]), os.path.abspath(args.key_cache) if args.key_cache is not None else None)
+
+    # Convert the nglyph file
+    if convert:
+        try:
+            nglyph_file = NGlyphFile(args.NGLYPH_PATH[0])
+            print_info(f"Converting the nglyph file from format version {nglyph_file.format_version} to {args.to_version}...")
+            convert_nglyph_file(nglyph_file, args.output_path[0], args.to_version, log)
+        except NGlyphFile.NGlyphFileException as e:
+            print_critical_error(e)
+
+        cprint("Done!", color="green", attrs=["bold"])
+        return 0
+
     # Create ffmpeg object
     ffmpeg = FFmpeg(args.ffmpeg_path[0], args.ffprobe_path[0])
 
-    # Create the audio file object
-    try:
-        audio_file = AudioFile(args.AUDIO_PATH[0], ffmpeg)
-    except AudioFile.AudioFileError as e:
-        print_critical_error(e)
-
-    if write:
-        # Create a nglyph object
+    # Fan-out: decrypt and encode the nglyph file once and write it to all audio files in parallel
+    if write and len(args.AUDIO_PATH) > 1:
         try:
             nglyph_file = NGlyphFile(args.NGLYPH_PATH[0])
         except NGlyphFile.NGlyphFileException as e:
@@ -964,11 +2775,45 @@ def main() -> int:
         if nglyph_file.legacy:
             print_warning("This is an \"old\" composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!")
 
+        print_info(f"Writing metadata to {len(args.AUDIO_PATH)} audio files...")
+        entries = [{ 'nglyph': args.NGLYPH_PATH[0], 'audio': audio_path, 'title': args.title[0] } for audio_path in args.AUDIO_PATH]
+        return write_batch(entries, args.output_path[0], None, args.jobs, ffmpeg, args.auto_fix_audio, args.keep_fixed_audio, args.fit_mode, os.path.abspath(args.key_cache) if args.key_cache is not None else None, args.in_place, (nglyph_file, encode_nglyph_payload(nglyph_file)), os.path.abspath(args.transcode_cache) if args.transcode_cache is not None else None)
+
+    if write:
+        # Create the audio file and nglyph objects concurrently
+        start = time.perf_counter()
+        timings: dict[str, float] = {}
+        try:
+            audio_file, nglyph_file, encoded_payload = asyncio.run(prepare_write(args.AUDIO_PATH[0], args.NGLYPH_PATH[0], ffmpeg, log, timings))
+        except (AudioFile.AudioFileError, NGlyphFile.NGlyphFileException) as e:
+            print_critical_error(e)
+
+        # Print legacy warning
+        if nglyph_file.legacy:
+            print_warning("This is an \"old\" composition. Depending on the length of it, it might desync when playing it back on device or in the GlyphVisualizer!")
+
+        # Writing stays on the main thread - it might have to ask the user
         print_info("Writing metadata to the audio file...")
-        write_metadata_to_audio_file(audio_file, nglyph_file, args.output_path[0], args.title[0], ffmpeg, args.auto_fix_audio)
+        write_start = time.perf_counter()
+        try:
+            write_metadata_to_audio_file(audio_file, nglyph_file, args.output_path[0], args.title[0], ffmpeg, log, args.auto_fix_audio, args.in_place, args.keep_fixed_audio, fit_mode=args.fit_mode, encoded_payload=encoded_payload)
+        except GlyphModderError as e:
+            print_critical_error(e, start="\t")
+        timings['write'] = time.perf_counter() - write_start
+        if args.timings:
+            print_write_timings(timings, time.perf_counter() - start)
     else:
+        # Create the audio file object
+        try:
+            audio_file = AudioFile(args.AUDIO_PATH[0], ffmpeg, log)
+        except AudioFile.AudioFileError as e:
+            print_critical_error(e)
+
         print_info("Reading metadata from the audio file...")
-        read_metadata_from_audio_file(audio_file, args.output_path[0], ffmpeg)
+        try:
+            read_metadata_from_audio_file(audio_file, args.output_path[0], ffmpeg, log)
+        except GlyphModderError as e:
+            print_critical_error(e, start="\t")
 
 
     cprint("Done!", color="green", attrs=["bold"])
@@ -30,12 +30,22 @@ if sys.version_info < (3, 10):
 import os
 import argparse
 import csv
-import re
 import zlib
 import copy
 import math
 import base64
 import json
+import struct
+import collections
+import functools
+import glob
+import hashlib
+import tempfile
+import time
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from collections.abc import Callable, Iterable, Iterator
+from typing import TextIO
 from enum import Enum
 try:
     from termcolor import cprint, colored
@@ -54,6 +64,11 @@ try:
 except ImportError:
     print("IMPORT ERROR: cryptography is not installed. Please install it with 'pip install -U cryptography' and try again.")
     sys.exit(1)
+try:
+    import numpy as np
+except ImportError:
+    print("IMPORT ERROR: numpy is not installed. Please install it with 'pip install -U numpy' and try again.")
+    sys.exit(1)
 
 
 # +------------------------------------+
@@ -68,275 +83,28 @@ SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 SCRIPT_NAME = os.path.basename(__file__)
 
 # Version of the script
-SCRIPT_VERSION = "2.2.0"
+SCRIPT_VERSION = "2.5.0"
 
 # Default values for the arguments
-DEFAULT_ARGS = { 'output_path': { 'value': ['.'], 'description': 'The current working directory' } }
-
-# Regex patterns for the Label text
-REGEX_PATTERN_LABEL_TEXT_PHONE1 = r'^([1-5])(?:\.((?:(?<![1-24-5]\.)[1-4])|(?:(?<![1-35]\.)[1-8])))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$'
-REGEX_PATTERN_LABEL_TEXT_PHONE2 = r'^([1-9]|1[0-1])(?:\.((?:(?<![0-35-9]\.)[1-9]|1[0-6])|(?:(?<![1-9]\.)[1-8])))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$'
-REGEX_PATTERN_LABEL_TEXT_PHONE2A = r'^([1-3])(?:(?<![23])\.([1-9]|1\d|2[0-4]))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$'
-REGEX_PATTERN_LABEL_TEXT_PHONE3A = r'^([1-3])(?:\.((?:(?<=1\.)(?:[1-9]|1\d|20))|(?:(?<=2\.)(?:[1-9]|1[0-1]))|(?:(?<=3\.)[1-5])))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$'
-REGEX_PATTERN_LABEL_TEXT_PHONE4A = r'^([1-7])()?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$'
-
-# Enums
-class Cols(Enum):
-    FIVE_ZONE = 0
-    FIFTEEN_ZONE = 1
-    ELEVEN_ZONE = 2
-    THIRTY_THREE_ZONE = 3
-    THREE_ZONE_2A = 4
-    TWENTY_SIX_ZONE = 5
-    THREE_ZONE_3A = 6
-    THIRTY_SIX_ZONE = 7
-    SIX_ZONE = 8
-    SEVEN_ZONE = 9
-class PhoneModel(Enum):
-    PHONE1 = 0
-    PHONE2 = 1
-    PHONE2A = 2
-    PHONE3A = 3
-    PHONE4A = 5
-
-# -- Lookup tables to convert our numbering system to the array indexes --
-PHONE1_5COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL: list[list[int]] = [
-    [0], # 1 to CAMERA_GLYPH
-    [1], # 2 to DIAGONAL_GLYPH
-    [2], # 3 to BATTERY_GLYPH
-    [3], # 4 to USB_LINE_GLYPH
-    [4], # 5 to USB_DOT_GLYPH
-]
-PHONE1_5COL_GLYPH_INDEX_TO_ARRAY_INDEXES_15COL: list[list[int]] = [
-    [0], # 1 to CAMERA_GLYPH
-    [1], # 2 to DIAGONAL_GLYPH
-    range(2, 6), # 3 to BATTERY_GLYPH
-    range(7, 15), # 4 to USB_LINE_GLYPH
-    [6], # 5 to USB_DOT_GLYPH
-]
-# We need this because our numbering is different than the array indexes in the AUTHOR data for the 15Col mode
-PHONE1_15COL_GLYPH_ZONE_INDEX_TO_ARRAY_INDEXES_15COL: list[list[int]] = [
-    [0], # 1 to CAMERA_GLYPH
-    [1], # 2 to DIAGONAL_GLYPH
-    [4], # 3 to BATTERY_TOP_RIGHT_ZONE
-    [5], # 4 to BATTERY_TOP_LEFT_ZONE
-    [2], # 5 to BATTERY_BOTTOM_LEFT_ZONE
-    [3], # 6 to BATTERY_BOTTOM_RIGHT_ZONE
-    [14], # 7 to USB_LINE_ZONE8 (top of the line)
-    [13], # 8 to USB_LINE_ZONE7
-    [12], # 9 to USB_LINE_ZONE6
-    [11], # 10 to USB_LINE_ZONE5
-    [10], # 11 to USB_LINE_ZONE4
-    [9], # 12 to USB_LINE_ZONE3
-    [8], # 13 to USB_LINE_ZONE2
-    [7], # 14 to USB_LINE_ZONE1
-    [6], # 15 to USB_DOT_GLYPH
-]
-
-# Used for creating the CUSTOM1 data
-PHONE2_11COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL: list[list[int]] = [
-    [0], # 1 from CAMERA_TOP_GLYPH to CAMERA_GLYPH
-    [0], # 2 from CAMERA_BOTTOM_GLYPH to CAMERA_GLYPH
-    [1], # 3 from DIAGONAL_GLYPH to DIAGONAL_GLYPH
-    [2], # 4 from BATTERY_TOP_RIGHT_GLYPH to BATTERY_GLYPH
-    [2], # 5 from BATTERY_TOP_LEFT_GLYPH to BATTERY_GLYPH
-    [2], # 6 from BATTERY_TOP_VERTICAL_GLYPH to BATTERY_GLYPH
-    [2], # 7 from BATTERY_BOTTOM_LEFT_GLYPH to BATTERY_GLYPH
-    [2], # 8 from BATTERY_BOTTOM_RIGHT_GLYPH to BATTERY_GLYPH
-    [2], # 9 from BATTERY_BOTTOM_VERTICAL_GLYPH to BATTERY_GLYPH
-    [3], # 10 from USB_LINE_GLYPH to USB_LINE_GLYPH
-    [4], # 11 from USB_DOT_GLYPH to USB_DOT_GLYPH
-]
-
-PHONE2_5COL_GLYPH_INDEX_TO_ARRAY_INDEXES_11COL: list[list[int]] = [
-    range(0, 2), # 1 to CAMERA_GLYPH
-    [2], # 2 to DIAGONAL_GLYPH
-    range(3, 9), # 3 to BATTERY_GLYPH
-    [9], # 4 to USB_LINE_GLYPH
-    [10], # 5 to USB_DOT_GLYPH
-]
-PHONE2_11COL_GLYPH_INDEX_TO_ARRAY_INDEXES_33COL: list[list[int]] = [
-    [0], # 1 to CAMERA_TOP_GLYPH
-    [1], # 2 to CAMERA_BOTTOM_GLYPH
-    [2], # 3 to DIAGONAL_GLYPH
-    range(3, 19), # 4 to BATTERY_TOP_RIGHT_GLYPH
-    [19], # 5 to BATTERY_TOP_LEFT_GLYPH
-    [20], # 6 to BATTERY_TOP_VERTICAL_GLYPH
-    [21], # 7 to BATTERY_BOTTOM_LEFT_GLYPH
-    [22], # 8 to BATTERY_BOTTOM_RIGHT_GLYPH
-    [23], # 9 to BATTERY_BOTTOM_VERTICAL_GLYPH
-    range(25, 33), # 10 to USB_LINE_GLYPH
-    [24], # 11 to USB_DOT_GLYPH
-]
-# We need this because our numbering is different than the array indexes in the AUTHOR data for the 33Col mode
-PHONE2_33_COL_GLYPH_ZONE_INDEX_TO_ARRAY_INDEXES_33COL: list[list[int]] = [
-    [0], # 1 to CAMERA_TOP_GLYPH
-    [1], # 2 to CAMERA_BOTTOM_GLYPH
-    [2], # 3 to DIAGONAL_GLYPH
-    [3], # 4 to BATTERY_TOP_RIGHT_ZONE1 (right side)
-    [4], # 5 to BATTERY_TOP_RIGHT_ZONE2
-    [5], # 6 to BATTERY_TOP_RIGHT_ZONE3
-    [6], # 7 to BATTERY_TOP_RIGHT_ZONE4
-    [7], # 8 to BATTERY_TOP_RIGHT_ZONE5
-    [8], # 9 to BATTERY_TOP_RIGHT_ZONE6
-    [9], # 10 to BATTERY_TOP_RIGHT_ZONE7
-    [10], # 11 to BATTERY_TOP_RIGHT_ZONE8
-    [11], # 12 to BATTERY_TOP_RIGHT_ZONE9
-    [12], # 13 to BATTERY_TOP_RIGHT_ZONE10
-    [13], # 14 to BATTERY_TOP_RIGHT_ZONE11
-    [14], # 15 to BATTERY_TOP_RIGHT_ZONE12
-    [15], # 16 to BATTERY_TOP_RIGHT_ZONE13
-    [16], # 17 to BATTERY_TOP_RIGHT_ZONE14
-    [17], # 18 to BATTERY_TOP_RIGHT_ZONE15
-    [18], # 19 to BATTERY_TOP_RIGHT_ZONE16
-    [19], # 20 to BATTERY_TOP_LEFT_GLYPH
-    [20], # 21 to BATTERY_TOP_VERTICAL_GLYPH
-    [21], # 22 to BATTERY_BOTTOM_LEFT_GLYPH
-    [22], # 23 to BATTERY_BOTTOM_RIGHT_GLYPH
-    [23], # 24 to BATTERY_BOTTOM_VERTICAL_GLYPH
-    [32], # 25 to USB_LINE_ZONE8 (top of the line)
-    [31], # 26 to USB_LINE_ZONE7
-    [30], # 27 to USB_LINE_ZONE6
-    [29], # 28 to USB_LINE_ZONE5
-    [28], # 29 to USB_LINE_ZONE4
-    [27], # 30 to USB_LINE_ZONE3
-    [26], # 31 to USB_LINE_ZONE2
-    [25], # 32 to USB_LINE_ZONE1
-    [24], # 33 to USB_DOT_GLYPH
-]
-
-# Used for creating the CUSTOM1 data - custom mapping by SebiAi (not official)
-PHONE2A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL: list[list[int]] = [
-    [0],
-    [1],
-    [2],
-]
-PHONE2A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_26COL: list[list[int]] = [
-    range(0, 24), # 1 to TOP_LEFT_GLYPH
-    [24], # 2 to MIDDLE_RIGHT_GLYPH
-    [25], # 3 to BOTTOM_LEFT_GLYPH
-]
-# We need this because our numbering is different than the array indexes in the AUTHOR data for the 26Col mode
-PHONE2A_26COL_GLYPH_INDEX_TO_ARRAY_INDEXES_26COL: list[list[int]] = [
-    [23], # 1 to TOP_LEFT_ZONE24 (right top side)
-    [22], # 2 to TOP_LEFT_ZONE23
-    [21], # 3 to TOP_LEFT_ZONE22
-    [20], # 4 to TOP_LEFT_ZONE21
-    [19], # 5 to TOP_LEFT_ZONE20
-    [18], # 6 to TOP_LEFT_ZONE19
-    [17], # 7 to TOP_LEFT_ZONE18
-    [16], # 8 to TOP_LEFT_ZONE17
-    [15], # 9 to TOP_LEFT_ZONE16
-    [14], # 10 to TOP_LEFT_ZONE15
-    [13], # 11 to TOP_LEFT_ZONE14
-    [12], # 12 to TOP_LEFT_ZONE13
-    [11], # 13 to TOP_LEFT_ZONE12
-    [10], # 14 to TOP_LEFT_ZONE11
-    [9], # 15 to TOP_LEFT_ZONE10
-    [8], # 16 to TOP_LEFT_ZONE9
-    [7], # 17 to TOP_LEFT_ZONE8
-    [6], # 18 to TOP_LEFT_ZONE7
-    [5], # 19 to TOP_LEFT_ZONE6
-    [4], # 20 to TOP_LEFT_ZONE5
-    [3], # 21 to TOP_LEFT_ZONE4
-    [2], # 22 to TOP_LEFT_ZONE3
-    [1], # 23 to TOP_LEFT_ZONE2
-    [0], # 24 to TOP_LEFT_ZONE1
-    [24], # 25 to MIDDLE_RIGHT_GLYPH
-    [25], # 26 to BOTTOM_LEFT_GLYPH
-]
-
-# Used for creating the CUSTOM1 data - custom mapping by SebiAi (not official)
-PHONE3A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL: list[list[int]] = [
-    [0],
-    [1],
-    [2],
-]
-PHONE3A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_36COL: list[list[int]] = [
-    range(0, 20), # 1 to TOP_LEFT_GLYPH
-    range(20, 31), # 2 to MIDDLE_RIGHT_GLYPH
-    range(31, 36), # 3 to BOTTOM_LEFT_GLYPH
-]
-# We need this because our numbering is different than the array indexes in the AUTHOR data for the 36Col mode
-PHONE3A_36COL_GLYPH_INDEX_TO_ARRAY_INDEXES_36COL: list[list[int]] = [
-    [0], # 1 to TOP_LEFT_ZONE1 (left bottom side)
-    [1], # 2 to TOP_LEFT_ZONE2
-    [2], # 3 to TOP_LEFT_ZONE3
-    [3], # 4 to TOP_LEFT_ZONE4
-    [4], # 5 to TOP_LEFT_ZONE5
-    [5], # 6 to TOP_LEFT_ZONE6
-    [6], # 7 to TOP_LEFT_ZONE7
-    [7], # 8 to TOP_LEFT_ZONE8
-    [8], # 9 to TOP_LEFT_ZONE9
-    [9], # 10 to TOP_LEFT_ZONE10
-    [10], # 11 to TOP_LEFT_ZONE11
-    [11], # 12 to TOP_LEFT_ZONE12
-    [12], # 13 to TOP_LEFT_ZONE13
-    [13], # 14 to TOP_LEFT_ZONE14
-    [14], # 15 to TOP_LEFT_ZONE15
-    [15], # 16 to TOP_LEFT_ZON16
-    [16], # 17 to TOP_LEFT_ZONE17
-    [17], # 18 to TOP_LEFT_ZONE18
-    [18], # 19 to TOP_LEFT_ZONE19
-    [19], # 20 to TOP_LEFT_ZONE20
-    [20], # 21 to MIDDLE_RIGHT_ZONE1 (top side)
-    [21], # 22 to MIDDLE_RIGHT_ZONE2
-    [22], # 23 to MIDDLE_RIGHT_ZONE3
-    [23], # 24 to MIDDLE_RIGHT_ZONE4
-    [24], # 25 to MIDDLE_RIGHT_ZONE5
-    [25], # 26 to MIDDLE_RIGHT_ZONE6
-    [26], # 27 to MIDDLE_RIGHT_ZONE7
-    [27], # 28 to MIDDLE_RIGHT_ZONE8
-    [28], # 29 to MIDDLE_RIGHT_ZONE9
-    [29], # 30 to MIDDLE_RIGHT_ZONE10
-    [30], # 31 to MIDDLE_RIGHT_ZONE11
-    [31], # 32 to BOTTOM_LEFT_GLYPH (right bottom side)
-    [32], # 33 to BOTTOM_LEFT_GLYPH
-    [33], # 34 to BOTTOM_LEFT_GLYPH
-    [34], # 35 to BOTTOM_LEFT_GLYPH
-    [35], # 36 to BOTTOM_LEFT_GLYPH
-]
-
-# Used for creating the CUSTOM1 data - custom mapping by SebiAi (not official)
-PHONE4A_6COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL: list[list[int]] = [
-    [0],
-    [1],
-    [2],
-    [3],
-    [4],
-    [4],
-]
-# Used for creating the CUSTOM1 data - custom mapping by SebiAi (not official)
-PHONE4A_7COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL: list[list[int]] = [
-    [0],
-    [1],
-    [2],
-    [3],
-    [4],
-    [4],
-    [4],
-]
-# We need this because our numbering is different than the array indexes in the AUTHOR data for the 6Col mode
-# In this case it is not actually different => pass through
-PHONE4A_6COL_GLYPH_INDEX_TO_ARRAY_INDEXES_6COL: list[list[int]] = [
-    [0], # 1 to ZONE1
-    [1], # 2 to ZONE2
-    [2], # 3 to ZONE3
-    [3], # 4 to ZONE4
-    [4], # 5 to ZONE5
-    [5], # 6 to ZONE6
-]
-# We need this because our numbering is different than the array indexes in the AUTHOR data for the 6Col mode
-# In this case it is not actually different => pass through
-PHONE4A_7COL_GLYPH_INDEX_TO_ARRAY_INDEXES_7COL: list[list[int]] = [
-    [0], # 1 to ZONE1
-    [1], # 2 to ZONE2
-    [2], # 3 to ZONE3
-    [3], # 4 to ZONE4
-    [4], # 5 to ZONE5
-    [5], # 6 to ZONE6
-    [6], # 7 to ZONE7
-]
+DEFAULT_ARGS = { 'output_path': { 'value': ['.'], 'description': 'The current working directory' }, 'jobs': { 'value': os.cpu_count() or 1, 'description': 'The number of CPU cores' } }
+
+# Device profiles - describe the Glyphs of each phone model. Adding a phone only needs a new entry in this file.
+DEVICE_PROFILES_FILE = os.path.join(SCRIPT_DIR, 'DeviceProfiles.json')
+
+# How many light level ramps are kept in memory - the same fades repeat a lot in most compositions
+LIGHT_LEVEL_RAMP_CACHE_SIZE = 256
+
+# Watermark key cache - deriving a key takes about half a second, so the keys can optionally be stored on disk
+KEY_CACHE_DIR = os.path.join(os.environ.get('LOCALAPPDATA', '') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME', '') or os.path.join(os.path.expanduser('~'), '.cache'), 'custom-nothing-glyph-tools', 'watermark-keys')
+KEY_CACHE_MAX_ENTRIES = 1000
+KEY_CACHE_MAX_AGE_S = 30 * 24 * 60 * 60
+
+# Payloads from this size on are compressed on multiple threads in blocks of this size (the same block size as pigz)
+PARALLEL_DEFLATE_MIN_SIZE = 1024 * 1024
+PARALLEL_DEFLATE_BLOCK_SIZE = 128 * 1024
+
+# How often the Label file is checked for changes in watch mode
+WATCH_INTERVAL_S = 0.2
 
 # +------------------------------------+
 # |                                    |
@@ -351,9 +119,14 @@ def build_arguments_parser() -> argparse.ArgumentParser:
     
     # Add the arguments
     parser.add_argument('-h', '--help', action='help', help='Show this help message and exit.') # help
-    parser.add_argument('FILE', help="An absolute or relative path to the Label file.", type=str, nargs=1) # FILE
+    parser.add_argument('FILE', help="One or more absolute or relative paths to Label files or directories with Label files. Glob patterns (e.g. 'Labels/*.txt') are expanded.", type=str, nargs='*') # FILE
+    parser.add_argument('--manifest', help="An absolute or relative path to a manifest file. It lists one Label file per line, relative paths are relative to the manifest file. Empty lines and lines starting with '#' are ignored.", type=str, nargs=1) # manifest
     parser.add_argument('--watermark', help="An absolute or relative path to the watermark file. It will be embeded into the nglyph file.", type=str, nargs=1) # watermark
+    parser.add_argument('--watch', help="Keep running and update the nglyph file every time the Label file changes. Only the parts of the composition that changed are processed again. Only works with a single Label file.", action='store_true', dest='watch') # watch
+    parser.add_argument('--reuse-salt', help="Use the same watermark salt for all Label files, so the watermark key is only derived once. Together with --key-cache the salt is also kept for later runs. All nglyph files with the same watermark will share the same key.", action='store_true', dest='reuse_salt') # reuse_salt
+    parser.add_argument('--key-cache', help=f"Cache the derived watermark keys on disk. Only the current user can read the cache. Optionally takes the cache directory. - default: '{KEY_CACHE_DIR}'", type=str, nargs='?', const=KEY_CACHE_DIR, metavar='DIR', dest='key_cache') # key_cache
     parser.add_argument('-o', '--output-path', help=f"The path where the processed files will be dropped. Can be an absolute or relative path. - default: '{DEFAULT_ARGS['output_path']['value'][0]}' -> {DEFAULT_ARGS['output_path']['description']}", type=str, nargs=1, default=copy.deepcopy(DEFAULT_ARGS['output_path']['value']), dest='output_path') # output_path
+    parser.add_argument('-j', '--jobs', help=f"The number of Label files that are processed in parallel when more than one Label file is given. - default: {DEFAULT_ARGS['jobs']['value']} -> {DEFAULT_ARGS['jobs']['description']}", type=int, default=DEFAULT_ARGS['jobs']['value'], dest='jobs') # jobs
     parser.add_argument('--version', action='version', help='Show the version number and exit.', version=SCRIPT_VERSION) # version
     
     return parser
@@ -364,12 +137,17 @@ def check_requirements():
 
 # Perform argument checks
 def perform_checks(args: dict):
-    # Check if the file exists
-    if not os.path.isfile(args['FILE'][0]):
-        raise Exception(f"Label file does not exist: '{args['FILE'][0]}'")
-    # Check if the file has the right extension
-    if not args['FILE'][0].endswith(".txt"):
-        raise Exception(f"File '{os.path.basename(args['FILE'][0])}' is not a Label file.")
+    # Check if there is anything to do
+    if len(args['FILE']) == 0 and args.get('manifest', None) is None:
+        raise Exception("No Label files given! Please provide at least one Label file or a manifest file.")
+
+    # Check if the manifest file exists
+    if args.get('manifest', None) is not None and not os.path.isfile(args['manifest'][0]):
+        raise Exception(f"Manifest file does not exist: '{args['manifest'][0]}'")
+
+    # Check the number of jobs
+    if args['jobs'] < 1:
+        raise Exception(f"The number of jobs must be at least 1, got {args['jobs']}.")
     
     # Check if the watermark file exists and has the right extension
     if args.get('watermark', None) is not None:
@@ -411,16 +189,108 @@ def print_debug(message, start: str = "", **args):
 # |                                    |
 # +------------------------------------+
 
+# Collects the messages of translating Labels as (level, text) with the level 'INFO', 'WARNING' or '' for plain output.
+# The command line also prints them to an output (e.g. sys.stdout) as they come in, the API only returns them.
+class MessageLog:
+    def __init__(self, output: TextIO | None = None) -> None:
+        self.output: TextIO | None = output
+        self.messages: list[tuple[str, str]] = []
+
+    def info(self, message: str, start: str = "") -> None:
+        self.messages.append(('INFO', message))
+        if self.output is not None:
+            print_info(message, start, file=self.output)
+
+    def warning(self, message: str, start: str = "") -> None:
+        self.messages.append(('WARNING', message))
+        if self.output is not None:
+            print_warning(message, start, file=self.output)
+
+class DeviceProfile:
+    # Exception for the DeviceProfile class
+    class DeviceProfileException(Exception):
+        pass
+
+    def __init__(self, phone_model: str, data: dict[str, ]) -> None:
+        self.phone_model: str = phone_model
+        self.codename: str = str(data['codename'])
+        self.columns_models: list[DeviceProfile.ColumnsModel] = [DeviceProfile.ColumnsModel(columns_model, self.codename) for columns_model in data['columns_models']]
+        # All valid 'glyphId[.zone]' strings in the Labels mapped to the glyph and zone index
+        self.label_glyph_table: dict[str, tuple[int, int]] = {}
+
+        # Compile the Label lookup table from all columns models that can be used with Labels
+        for columns_model in self.columns_models:
+            for glyph_index, glyph_zones in enumerate(columns_model.glyph_array_indexes[1:], 1):
+                self.label_glyph_table[str(glyph_index)] = (glyph_index, 0)
+                for zone_index in range(1, len(glyph_zones)):
+                    self.label_glyph_table[f"{glyph_index}.{zone_index}"] = (glyph_index, zone_index)
+
+    # Get the first columns model that can address all the glyphs and zones
+    def get_columns_model(self, glyph_zone_indexes: set[tuple[int, int]]) -> 'DeviceProfile.ColumnsModel':
+        for columns_model in self.columns_models:
+            if all(columns_model.supports(glyph_index, zone_index) for glyph_index, zone_index in glyph_zone_indexes):
+                return columns_model
+        raise DeviceProfile.DeviceProfileException(f"The phone model '{self.phone_model}' has no columns model that can address all the used glyphs and zones.")
+
+    @staticmethod
+    def load(file_path: str) -> dict[str, 'DeviceProfile']:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data: dict[str, dict] = json.load(f)
+            return {phone_model: DeviceProfile(phone_model, profile) for phone_model, profile in data.items()}
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise DeviceProfile.DeviceProfileException(f"Could not load the device profiles from '{file_path}': {e}")
+
+    class ColumnsModel:
+        def __init__(self, data: dict[str, ], codename: str) -> None:
+            self.name: str = str(data['name'])
+            self.columns: int = int(data['columns'])
+            self.custom2: str = str(data['custom2'])
+            self.codename: str = codename
+            # Dense lookup tables indexed by [glyph_index][zone_index] - glyphs start at 1 and zone 0 addresses the whole glyph
+            self.glyph_array_indexes: list[list[np.ndarray]] = [[]]
+            self.glyph_custom1: list[int] = [0]
+
+            for glyph in data.get('glyphs', []):
+                # The array indexes of the glyph are listed in the order of the zones
+                zones = [int(array_index) for array_index in glyph['array_indexes']]
+                if not zones or any(not (0 <= array_index < self.columns) for array_index in zones):
+                    raise ValueError(f"Invalid array indexes for glyph '{glyph.get('name', '')}' in columns model '{self.name}'")
+                # Only glyphs with more than one array index can be addressed by zone
+                self.glyph_array_indexes.append([np.array(zones, dtype=np.intp)] + ([np.array([array_index], dtype=np.intp) for array_index in zones] if len(zones) > 1 else []))
+                self.glyph_custom1.append(int(glyph['custom1']))
+
+        def supports(self, glyph_index: int, zone_index: int) -> bool:
+            return 0 < glyph_index < len(self.glyph_array_indexes) and 0 <= zone_index < len(self.glyph_array_indexes[glyph_index])
+
+# Load the device profiles once - a broken profiles file must not exit a process that imports this module, so the error is kept until the profiles are used
+DEVICE_PROFILES_ERROR: str | None = None
+try:
+    DEVICE_PROFILES: dict[str, DeviceProfile] = DeviceProfile.load(DEVICE_PROFILES_FILE)
+except DeviceProfile.DeviceProfileException as e:
+    DEVICE_PROFILES = {}
+    DEVICE_PROFILES_ERROR = str(e)
+PhoneModel = Enum('PhoneModel', [(phone_model, n) for n, phone_model in enumerate(DEVICE_PROFILES.keys())])
+
+# Raise the error of loading the device profiles - main turns it into a critical error, the API into a GlyphTranslatorError
+def check_device_profiles() -> None:
+    if DEVICE_PROFILES_ERROR is not None:
+        raise DeviceProfile.DeviceProfileException(DEVICE_PROFILES_ERROR)
+
 class LabelFile:
     # Constants
     _TIME_STEP_MS = 16.666
     _MAX_LIGHT_LEVEL = 4095
     _SUPPORTED_LABEL_VERSIONS = [1]
-    _SUPPORTED_PHONE_MODELS = list(map(lambda x: x.name, PhoneModel))
+    # Only phone models with glyphs can be used with Labels
+    _SUPPORTED_PHONE_MODELS = [phone_model for phone_model, device_profile in DEVICE_PROFILES.items() if device_profile.label_glyph_table]
 
     # Exception for the LabelFile class
     class LabelFileException(Exception):
-        pass
+        def __init__(self, message: str, label_errors: list[str] | None = None) -> None:
+            super().__init__(message)
+            # The errors of the single Labels
+            self.label_errors: list[str] = label_errors if label_errors is not None else []
 
     def __iter__(self):
         return iter(self.labels)
@@ -433,76 +303,54 @@ class LabelFile:
     def __repr__(self) -> str:
         return self.__str__()
     
-    # Constructor
-    def __init__(self, file_path: str) -> None:
+    # Constructor - if the content is given the file is not read, the file path is then only used as the name
+    def __init__(self, file_path: str, log: MessageLog, content: str | None = None) -> None:
         self.file: str = file_path
         self.labels: list[LabelFile.Label] = []
         self.contains_zone_labels: bool = False
-        self.columns_model: Cols = Cols.FIVE_ZONE
+        self.columns_model: DeviceProfile.ColumnsModel | None = None
         self.label_version: int = 0
-        self.phone_model: PhoneModel = self._determine_phone_model(file_path) # This is before the version check. This whole script is kind of a cluster f*ck.
-
-        # Get the regex for the phone model
-        match self.phone_model:
-            case PhoneModel.PHONE1:
-                regex = re.compile(REGEX_PATTERN_LABEL_TEXT_PHONE1)
-            case PhoneModel.PHONE2:
-                regex = re.compile(REGEX_PATTERN_LABEL_TEXT_PHONE2)
-            case PhoneModel.PHONE2A:
-                regex = re.compile(REGEX_PATTERN_LABEL_TEXT_PHONE2A)
-            case PhoneModel.PHONE3A:
-                regex = re.compile(REGEX_PATTERN_LABEL_TEXT_PHONE3A)
-            case PhoneModel.PHONE4A:
-                regex = re.compile(REGEX_PATTERN_LABEL_TEXT_PHONE4A)
-            case _:
-                raise ValueError(f"[Programming Error] Missing phone model in switch case: '{self.phone_model}'. Please report this error to the developer.")
-
-        # Open the file and read the content
-        found_end_label: bool = False
-        encountered_error: bool = False
-        with open(file_path, newline='', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter='\t', strict=True, skipinitialspace=True) # TODO: Catch the csv.Error and print a better error message
-            for row in reader:
-                # Skip empty lines
-                if len(row) == 0 or row[0].strip() == "":
-                    continue
+        self.phone_model: PhoneModel = PhoneModel.PHONE1
 
-                # Check if the row has the right amount of columns
-                if len(row) != 3:
-                    raise LabelFile.LabelFileException(f"Invalid Label file format in line {reader.line_num}. The file should contain 3 columns: 'Time Start', 'Time End' and 'Label Text'.")
-                
-                # Add the Label to the list
-                try:
-                    self.labels.append(LabelFile.Label.from_list(row, reader.line_num))
-                except:
-                    raise LabelFile.LabelFileException(f"Parsing type error in line {reader.line_num}. Please check the Label file for errors.")
+        # Read the whole file once and split it into Labels
+        if content is None:
+            try:
+                with open(file_path, 'rb') as f:
+                    content = f.read().decode('utf-8')
+            except UnicodeDecodeError as e:
+                raise LabelFile.LabelFileException(f"The Label file is not a valid UTF-8 text file: {e}")
+        self.labels = LabelFile._tokenize(content)
 
-                # Check if the last Label is the END Label
-                if self.labels[-1].is_end_label:
-                    found_end_label = True
-                else:
-                    # Do not parse version or phone model labels
-                    if not self.labels[-1].is_version_label and not self.labels[-1].is_phone_model_label:
-                        # Parse the text of the label
-                        try:
-                            self.labels[-1].extract_text_values(regex)
-                        except LabelFile.LabelFileException as e:
-                            encountered_error = True
-                            print_error(e)
+        # Get the phone model - we need it before we can parse the Label text values
+        self.phone_model = self._get_phone_model()
+        glyph_table = DEVICE_PROFILES[self.phone_model.name].label_glyph_table
+
+        # Parse the text of the Labels
+        found_end_label: bool = False
+        label_errors: list[str] = []
+        for label in self.labels:
+            # Check if the Label is the END Label
+            if label.is_end_label:
+                found_end_label = True
+            # Do not parse version or phone model labels
+            elif not label.is_version_label and not label.is_phone_model_label:
+                try:
+                    label.extract_text_values(glyph_table)
+                except LabelFile.LabelFileException as e:
+                    label_errors.append(str(e))
         
         # Check if the end Label is present
         if not found_end_label:
-            encountered_error = True
-            print_error("No 'END' Label found. Please set a Label at the end of the audio file with the name 'END'.")
+            label_errors.append("No 'END' Label found. Please set a Label at the end of the audio file with the name 'END'.")
         
         # Check if we encountered an error while parsing the text values
-        if encountered_error:
-            raise LabelFile.LabelFileException("Encountered errors while parsing the Label text values. Please resolve the errors above. Make sure that you used the right phone model.")
+        if len(label_errors) > 0:
+            raise LabelFile.LabelFileException("Encountered errors while parsing the Label text values. Please resolve the errors above. Make sure that you used the right phone model.", label_errors)
         
         # Check if the Labels are sorted by time
         if not all(self.labels[i].time_from_ms <= self.labels[i+1].time_from_ms for i in range(len(self.labels)-1)):
             # Inform the user
-            print_info("The Labels are not sorted by time. Sorting them now...")
+            log.info("The Labels are not sorted by time. Sorting them now...")
             # Sort the Labels by time
             self.labels.sort(key=lambda x: x.time_from_ms)
 
@@ -521,45 +369,53 @@ class LabelFile:
 
         # Find the columns model
         self.contains_zone_labels = any(label.is_zone_label for label in self.labels)
-        match self.phone_model:
-            case PhoneModel.PHONE1:
-                self.columns_model = Cols.FIFTEEN_ZONE if self.contains_zone_labels else Cols.FIVE_ZONE
-            case PhoneModel.PHONE2:
-                self.columns_model = Cols.THIRTY_THREE_ZONE if self.contains_zone_labels else Cols.ELEVEN_ZONE
-            case PhoneModel.PHONE2A:
-                self.columns_model = Cols.TWENTY_SIX_ZONE if self.contains_zone_labels else Cols.THREE_ZONE_2A
-            case PhoneModel.PHONE3A:
-                self.columns_model = Cols.THIRTY_SIX_ZONE if self.contains_zone_labels else Cols.THREE_ZONE_3A
-            case PhoneModel.PHONE4A:
-                assert not self.contains_zone_labels, "[Developer Error] Zone labels are not supported for PHONE4A. Please report this error to the developer."
-                max_glyph_index = max([label.glyph_index for label in self.labels])
-                self.columns_model = Cols.SEVEN_ZONE if max_glyph_index >= 7 else Cols.SIX_ZONE
-            case _:
-                raise ValueError(f"[Programming Error] Missing phone model in switch case: '{self.phone_model}'. Please report this error to the developer.")
-
-    def _determine_phone_model(self, file_path: str) -> PhoneModel:
-        phone_model: PhoneModel | None = None
-
-        # Open the file and read the content
-        with open(file_path, newline='', encoding='utf-8') as f:
-            for line in f:
-                m = re.search(r'PHONE_MODEL=(\w+)', line) #  There is another re in the Label class
-                if m is not None:
-                    # Check if we already found a phone model label
-                    if phone_model is not None:
-                        raise LabelFile.LabelFileException("More than one 'PHONE_MODEL' Label found. Please set only one Label with the name 'PHONE_MODEL=<model>'.")
-                    # We found a phone model label => Use it
-                    phone_model_string: str = m.group(1)
-                    if phone_model_string not in LabelFile._SUPPORTED_PHONE_MODELS:
-                        raise LabelFile.LabelFileException(f"This phone model '{phone_model_string}' is not supported in this version of this script (Supported phone models: {', '.join(self._SUPPORTED_PHONE_MODELS)}). Please update the script or use a different file.")
-                    phone_model = PhoneModel[phone_model_string]
-        
-        # Return the phone model if found
-        if phone_model is not None:
-            return phone_model
-        
-        # No phone model label found
-        raise LabelFile.LabelFileException(f"No 'PHONE_MODEL' Label found. Please set a Label with the name 'PHONE_MODEL=<model>', where '<model>' must be replaced with the appropriate phone model (Supported phone models: {', '.join(self._SUPPORTED_PHONE_MODELS)}). Refer to the documentation for more information.")
+        self.columns_model = DEVICE_PROFILES[self.phone_model.name].get_columns_model({(label.glyph_index, label.zone_index) for label in self.labels if not (label.is_end_label or label.is_version_label or label.is_phone_model_label)})
+
+    @staticmethod
+    def _tokenize(content: str) -> list['LabelFile.Label']:
+        labels: list[LabelFile.Label] = []
+
+        # Audacity uses the platform line endings
+        for line_num, line in enumerate(content.replace('\r\n', '\n').replace('\r', '\n').split('\n'), 1):
+            # Split the columns - only fall back to the csv module if there are quotes we need to take care of
+            if '"' in line:
+                try:
+                    row = next(csv.reader([line], delimiter='\t', strict=True, skipinitialspace=True), [])
+                except csv.Error as e:
+                    raise LabelFile.LabelFileException(f"Invalid Label file format in line {line_num}: {e}")
+            else:
+                row = line.split('\t')
+
+            # Skip empty lines
+            if len(row) == 0 or row[0].strip() == "":
+                continue
+
+            # Check if the row has the right amount of columns
+            if len(row) != 3:
+                raise LabelFile.LabelFileException(f"Invalid Label file format in line {line_num}. The file should contain 3 columns: 'Time Start', 'Time End' and 'Label Text'.")
+
+            # Add the Label to the list
+            try:
+                labels.append(LabelFile.Label.from_list(row, line_num))
+            except:
+                raise LabelFile.LabelFileException(f"Parsing type error in line {line_num}. Please check the Label file for errors.")
+
+        return labels
+
+    def _get_phone_model(self) -> PhoneModel:
+        # Check if there are more than one PHONE_MODEL Label
+        phone_model_labels = [label for label in self.labels if label.is_phone_model_label]
+        if len(phone_model_labels) > 1:
+            raise LabelFile.LabelFileException("More than one 'PHONE_MODEL' Label found. Please set only one Label with the name 'PHONE_MODEL=<model>'.")
+        if len(phone_model_labels) == 0:
+            raise LabelFile.LabelFileException(f"No 'PHONE_MODEL' Label found. Please set a Label with the name 'PHONE_MODEL=<model>', where '<model>' must be replaced with the appropriate phone model (Supported phone models: {', '.join(self._SUPPORTED_PHONE_MODELS)}). Refer to the documentation for more information.")
+
+        # Check if the phone model is supported
+        phone_model_string: str = phone_model_labels[0].text.removeprefix(LabelFile.Label._PHONE_MODEL_LABEL_PREFIX)
+        if phone_model_string not in LabelFile._SUPPORTED_PHONE_MODELS:
+            raise LabelFile.LabelFileException(f"This phone model '{phone_model_string}' is not supported in this version of this script (Supported phone models: {', '.join(self._SUPPORTED_PHONE_MODELS)}). Please update the script or use a different file.")
+
+        return PhoneModel[phone_model_string]
 
     def _get_label_version(self) -> int:        
         # Check if there are more than one VERSION Label
@@ -570,8 +426,7 @@ class LabelFile:
             raise LabelFile.LabelFileException(f"No 'LABEL_VERSION' Label found. Please set a Label with the name 'LABEL_VERSION=<version>', where '<version>' must be replaced with the appropriate version number (Supported versions: {', '.join(map(str, self._SUPPORTED_LABEL_VERSIONS))}). Refer to the documentation for more information.")
 
         # Get the version number and check if it is supported
-        label_version_match = re.match(LabelFile.Label._REGEX_PATTERN_LABEL_VERSION, version_labels[0].text)
-        label_version = int(label_version_match.group(1))
+        label_version = int(version_labels[0].text.removeprefix(LabelFile.Label._LABEL_VERSION_LABEL_PREFIX))
         if label_version not in LabelFile._SUPPORTED_LABEL_VERSIONS:
             max_version = max(LabelFile._SUPPORTED_LABEL_VERSIONS)
             if label_version > max_version:
@@ -581,57 +436,46 @@ class LabelFile:
         
         return label_version
 
-    def get_nglyph_data(self) -> tuple[list[str], list[str]]:
-        # Get the END Label
+    def get_author_lines(self) -> int:
+        # The END Label decides how long the composition is
         end_label: LabelFile.Label = next(label for label in self.labels if label.is_end_label)
+        return math.ceil(end_label.time_to_ms / LabelFile._TIME_STEP_MS)
 
-        # Calculate the number of lines for the AUTHOR data
-        author_lines = math.ceil(end_label.time_to_ms / LabelFile._TIME_STEP_MS)
-
-        # Prepare the AUTHOR and CUSTOM1 data so we can index into it
-        author_data: list[list[int]] = [[0 for x in range(get_numer_of_columns_from_columns_model(self.columns_model))] for y in range(author_lines)]
-        custom1_data: list[str] = []
-
+    def get_parsed_labels(self, parsed_label_cache: dict[tuple[float, float, str], 'LabelFile.ParsedLabel'] | None = None) -> list[tuple['LabelFile.Label', 'LabelFile.ParsedLabel']]:
+        # The cache can be passed in when the same Labels get parsed over and over again (e.g. in watch mode)
+        author_lines = self.get_author_lines()
+        parsed_labels: list[tuple[LabelFile.Label, LabelFile.ParsedLabel]] = []
         for label in self.labels:
             # Check if the label is the END, LABEL_VERSION or PHONE_MODEL label
             if label.is_end_label or label.is_version_label or label.is_phone_model_label:
                 continue
 
             # Get the parsed label
-            parsed_label = label.to_parsed_label(self.columns_model)
-
-            # Set the AUTHOR data
-            overwrites: int = 0
-            steps = list(range(round(parsed_label.rastered_time_from_ms/LabelFile._TIME_STEP_MS), round(parsed_label.rastered_time_to_ms/LabelFile._TIME_STEP_MS)))
-            for i, row in enumerate(steps, 1 if parsed_label.absolute_light_level_from <= parsed_label.absolute_light_level_to else 0):
-                # Calculate the light level depending on the light mode
-                match parsed_label.light_mode:
-                    case "LIN":
-                        light_level = round(parsed_label.absolute_light_level_from + ((parsed_label.absolute_light_level_to - parsed_label.absolute_light_level_from) / len(steps)) * i)
-                    case "EXP":
-                        light_level = round(max(parsed_label.absolute_light_level_from, 1) * ((max(parsed_label.absolute_light_level_to, 1) / max(parsed_label.absolute_light_level_from, 1)) ** (i / len(steps))))
-                    case "LOG":
-                        light_level = round(-max(parsed_label.absolute_light_level_to, 1) * (max(parsed_label.absolute_light_level_to, 1)/max(parsed_label.absolute_light_level_from, 1))**(-i/len(steps)) + parsed_label.absolute_light_level_from + parsed_label.absolute_light_level_to)
-                    case _:
-                        raise ValueError(f"[Programming Error] Missing light mode in switch case: '{parsed_label.light_mode}'. Please report this error to the developer.")
-                
-                
-                for index in parsed_label.array_indexes:
-                    # Check if there is already a value present
-                    if author_data[row][index] != 0:
-                        overwrites += 1
-                    # Write the light level to the AUTHOR data
-                    author_data[row][index] = light_level
-            
-            # Inform the user if there were any overwrites
-            if overwrites > 0:
-                print_warning(f"Overwrote {overwrites} values in the AUTHOR data for label '{label.text}' in line {label.line_num}.")
+            if parsed_label_cache is None:
+                parsed_label = label.to_parsed_label(self.columns_model)
+            else:
+                parsed_label = parsed_label_cache.get(label.key)
+                if parsed_label is None:
+                    parsed_label = parsed_label_cache[label.key] = label.to_parsed_label(self.columns_model)
 
-            # Set the CUSTOM1 data
-            custom1_data.append(f"{round(label.time_from_ms)}-{parsed_label.custom_5col_id}")
+            # Check if the Label fits into the AUTHOR data
+            if parsed_label.row_to > author_lines:
+                raise LabelFile.LabelFileException(f"The Label '{label.text}' in line {label.line_num} reaches beyond the 'END' Label. Please move the 'END' Label further back.")
+            parsed_labels.append((label, parsed_label))
 
+        return parsed_labels
 
-        return ([f"{','.join([str(e) for e in line])}," for line in author_data], custom1_data)
+    def get_nglyph_data(self, log: MessageLog) -> tuple[Iterator[str], list[str]]:
+        # Prepare the AUTHOR data so we can index into it
+        # Signed because a LOG fade from 0 to 0 results in -1 - we keep that to stay compatible with existing compositions
+        author_data: np.ndarray = np.zeros((self.get_author_lines(), self.columns_model.columns), dtype=np.int16)
+
+        # Draw the Labels in order - later Labels overwrite earlier ones
+        parsed_labels = self.get_parsed_labels()
+        for label, parsed_label in parsed_labels:
+            draw_label(author_data, label, parsed_label, log)
+
+        return (author_data_to_rows(author_data), get_custom1_data(parsed_labels))
     
     # Class for the Label
     class Label:
@@ -639,8 +483,11 @@ class LabelFile:
         _TIME_FROM = 0
         _TIME_TO = 1
         _TEXT_CONTENT = 2
-        _REGEX_PATTERN_LABEL_VERSION = r'^LABEL_VERSION=(\d+)$'
-        _REGEX_PATTERN_LABEL_PHONE_MODEL = re.compile(r'^PHONE_MODEL=(\w+)$') # There is another re in _determine_phone_model()
+        _LABEL_VERSION_LABEL_PREFIX = "LABEL_VERSION="
+        _PHONE_MODEL_LABEL_PREFIX = "PHONE_MODEL="
+        _LIGHT_MODES = ("EXP", "LIN", "LOG")
+        # Light levels have one or two digits (e.g. '5' or '05') or are exactly '100'
+        _LIGHT_LEVELS: dict[str, int] = {**{str(n): n for n in range(100)}, **{f"{n:02d}": n for n in range(100)}, "100": 100}
 
         # String representation
         def __str__(self) -> str:
@@ -655,9 +502,11 @@ class LabelFile:
             self.time_delta_ms: float = round(self.time_to_ms - self.time_from_ms, 3)
             self.text: str = text.strip()
             self.is_end_label: bool = self.text == "END"
-            self.is_version_label: bool = re.match(LabelFile.Label._REGEX_PATTERN_LABEL_VERSION, self.text) is not None
-            self.is_phone_model_label: bool = re.match(LabelFile.Label._REGEX_PATTERN_LABEL_PHONE_MODEL, self.text) is not None
+            self.is_version_label: bool = self.text.startswith(LabelFile.Label._LABEL_VERSION_LABEL_PREFIX) and LabelFile.Label._is_number(self.text.removeprefix(LabelFile.Label._LABEL_VERSION_LABEL_PREFIX))
+            self.is_phone_model_label: bool = self.text.startswith(LabelFile.Label._PHONE_MODEL_LABEL_PREFIX) and self.text.removeprefix(LabelFile.Label._PHONE_MODEL_LABEL_PREFIX).replace('_', 'a').isalnum()
             self.line_num: int = line_num
+            # Labels with the same key always result in the same light levels
+            self.key: tuple[float, float, str] = (self.time_from_ms, self.time_to_ms, self.text)
 
             # Values that get populated after extracting the text values
             self.glyph_index: int = 0
@@ -679,33 +528,36 @@ class LabelFile:
 
             return LabelFile.Label(time_from, time_to, text, line_num)
         
-        def extract_text_values(self, regex: re.Pattern[str]) -> None:
-            # Check if the text matches the regex
-            result = regex.match(self.text)
-            if result is None:
+        @staticmethod
+        def _is_number(text: str) -> bool:
+            return text.isascii() and text.isdigit()
+
+        def extract_text_values(self, glyph_table: dict[str, tuple[int, int]]) -> None:
+            # The text looks like this: 'glyphId[.zone]-lightLevelFrom[-lightLevelTo[-interpolationMode]]'
+            # glyph_table maps all valid 'glyphId[.zone]' strings of the phone model to the glyph and zone index
+            parts = self.text.split('-')
+            # The light level to can be left out in front of the interpolation mode ('glyphId-lightLevelFrom-interpolationMode')
+            if len(parts) == 3 and parts[2] in LabelFile.Label._LIGHT_MODES:
+                parts.insert(2, parts[1])
+            glyph_zone_index = glyph_table.get(parts[0], None)
+            relative_light_level_from = LabelFile.Label._LIGHT_LEVELS.get(parts[1], None) if len(parts) > 1 else None
+            relative_light_level_to = LabelFile.Label._LIGHT_LEVELS.get(parts[2], None) if len(parts) > 2 else relative_light_level_from
+            light_mode = parts[3] if len(parts) > 3 else "LIN"
+
+            # Check if the text is valid
+            if len(parts) > 4 or glyph_zone_index is None or relative_light_level_from is None or relative_light_level_to is None or light_mode not in LabelFile.Label._LIGHT_MODES:
                 if '#' in self.text:
                     raise LabelFile.LabelFileException(f"Invalid Label text '{self.text}' in line {self.line_num}. It seems like you are using the outdated Label syntax. Please refere to the documentation on how to migrate your Label file to the new syntax.")
                 else:
                     raise LabelFile.LabelFileException(f"Invalid Label text '{self.text}' in line {self.line_num}. Please refer to the documentation on how to name the Labels.")
-
-            # Get the values from the match
-            try:
-                glyph_index = int(result.group(1))
-                zone_index = int(result.group(2)) if (result.group(2) is not None and result.group(2) != "") else 0
-                relative_light_level_from = int(result.group(3))
-                relative_light_level_to = int(result.group(4)) if result.group(4) is not None else relative_light_level_from
-                light_mode = result.group(5) if result.group(5) is not None else "LIN"
-            except:
-                raise LabelFile.LabelFileException(f"Parsing type error in Label text '{self.text}' in line {self.line_num}. Please check the Label file for errors.")
             
-            self.glyph_index = glyph_index
-            self.zone_index = zone_index
+            self.glyph_index, self.zone_index = glyph_zone_index
             self.relative_light_level_from = relative_light_level_from
             self.relative_light_level_to = relative_light_level_to
             self.light_mode = light_mode
-            self.is_zone_label = zone_index != 0
+            self.is_zone_label = self.zone_index != 0
 
-        def to_parsed_label(self, columns_model: Cols) -> 'LabelFile.ParsedLabel':
+        def to_parsed_label(self, columns_model: DeviceProfile.ColumnsModel) -> 'LabelFile.ParsedLabel':
             parsed_label = LabelFile.ParsedLabel()
             # Round the time values to the nearest multiple of the time step
             parsed_label.rastered_time_from_ms = get_nearest_divisable_by(self.time_from_ms, LabelFile._TIME_STEP_MS)
@@ -717,9 +569,13 @@ class LabelFile:
                 parsed_label.rastered_time_to_ms += LabelFile._TIME_STEP_MS
                 parsed_label.rastered_time_delta_ms = LabelFile._TIME_STEP_MS
 
+            # Get the rows of the AUTHOR data the Label covers
+            parsed_label.row_from = round(parsed_label.rastered_time_from_ms/LabelFile._TIME_STEP_MS)
+            parsed_label.row_to = round(parsed_label.rastered_time_to_ms/LabelFile._TIME_STEP_MS)
+
             # Get the array indexes for the glyph/zone
-            parsed_label.array_indexes = get_glyph_array_indexes(self.glyph_index, self.zone_index, columns_model)
-            parsed_label.custom_5col_id = get_custom_5col_id(self.glyph_index, columns_model)
+            parsed_label.array_indexes = columns_model.glyph_array_indexes[self.glyph_index][self.zone_index]
+            parsed_label.custom_5col_id = columns_model.glyph_custom1[self.glyph_index]
 
             # Calculate the absolute light levels
             parsed_label.absolute_light_level_from = round(self.relative_light_level_from * LabelFile._MAX_LIGHT_LEVEL / 100.0)
@@ -737,24 +593,308 @@ class LabelFile:
             self.rastered_time_from_ms: float = 0
             self.rastered_time_to_ms: float = 0
             self.rastered_time_delta_ms: float = 0
-            self.array_indexes: list[int] = []
+            self.row_from: int = 0
+            self.row_to: int = 0
+            self.array_indexes: np.ndarray = np.array([], dtype=np.intp)
             self.custom_5col_id: int = 0
             self.absolute_light_level_from: int = 0
             self.absolute_light_level_to: int = 0
             self.light_mode: str = "LIN"
             self.is_zone_label: bool = False
 
+class AuthorRaster:
+    # Keeps the AUTHOR data of a Label file in memory, so a new version of the Label file only needs to redraw the rows touched by added or removed Labels
+    def __init__(self, label_file: LabelFile, log: MessageLog) -> None:
+        self.label_file: LabelFile = label_file
+        self.log: MessageLog = log
+        self._parsed_label_cache: dict[tuple[float, float, str], LabelFile.ParsedLabel] = {}
+        self._parsed_labels: list[tuple[LabelFile.Label, LabelFile.ParsedLabel]] = label_file.get_parsed_labels(self._parsed_label_cache)
+        self._keys: list[tuple[float, float, str]] = [label.key for label, _ in self._parsed_labels]
+
+        # Draw all Labels
+        self.author_data: np.ndarray = np.zeros((label_file.get_author_lines(), label_file.columns_model.columns), dtype=np.int16)
+        for label, parsed_label in self._parsed_labels:
+            draw_label(self.author_data, label, parsed_label, log)
+        self.author_rows: list[str] = list(author_data_to_rows(self.author_data))
+        self.custom1_data: list[str] = get_custom1_data(self._parsed_labels)
+
+    def update(self, label_file: LabelFile) -> int:
+        # Everything changes if the phone model, the columns model or the length changes
+        if label_file.phone_model != self.label_file.phone_model or label_file.columns_model is not self.label_file.columns_model or label_file.get_author_lines() != len(self.author_data):
+            self.__init__(label_file, self.log)
+            return len(self.author_data)
+
+        parsed_labels = label_file.get_parsed_labels(self._parsed_label_cache)
+        keys = [label.key for label, _ in parsed_labels]
+
+        # Diff the Labels - keys can be duplicated, so count them
+        old_key_counts = collections.Counter(self._keys)
+        new_key_counts = collections.Counter(keys)
+        removed_keys = old_key_counts - new_key_counts
+        added_keys = new_key_counts - old_key_counts
+
+        # Overlapping Labels are drawn in order => if the order of the remaining Labels changed we have to redraw everything
+        if AuthorRaster._without(self._keys, removed_keys) != AuthorRaster._without(keys, added_keys):
+            self.__init__(label_file, self.log)
+            return len(self.author_data)
+
+        # Mark the rows of all added and removed Labels
+        row_mask = np.zeros(len(self.author_data), dtype=bool)
+        for key in removed_keys | added_keys:
+            parsed_label = self._parsed_label_cache[key]
+            row_mask[parsed_label.row_from:parsed_label.row_to] = True
+
+        # Clear the rows and redraw all Labels touching them - the cumulative sum tells us how many marked rows are in front of a row
+        self.author_data[row_mask] = 0
+        marked_rows_before = np.concatenate(([0], np.cumsum(row_mask)))
+        for label, parsed_label in parsed_labels:
+            if marked_rows_before[parsed_label.row_to] != marked_rows_before[parsed_label.row_from]:
+                draw_label(self.author_data, label, parsed_label, self.log, row_mask)
+
+        # Only convert the redrawn rows
+        redrawn_rows = np.flatnonzero(row_mask)
+        for row, author_row in zip(redrawn_rows.tolist(), author_data_to_rows(self.author_data[redrawn_rows])):
+            self.author_rows[row] = author_row
+
+        self.label_file = label_file
+        self._parsed_labels = parsed_labels
+        self._keys = keys
+        self.custom1_data = get_custom1_data(parsed_labels)
+        # Forget parsed Labels that are gone so the cache does not grow forever
+        for key in removed_keys:
+            if key not in new_key_counts:
+                del self._parsed_label_cache[key]
+
+        return len(redrawn_rows)
+
+    @staticmethod
+    def _without(keys: list[tuple[float, float, str]], keys_to_remove: collections.Counter) -> list[tuple[float, float, str]]:
+        # Nothing to remove is the common case
+        if not keys_to_remove:
+            return keys
+        keys_to_remove = keys_to_remove.copy()
+        result: list[tuple[float, float, str]] = []
+        for key in keys:
+            if keys_to_remove[key] > 0:
+                keys_to_remove[key] -= 1
+            else:
+                result.append(key)
+        return result
+
+class KeyCache:
+    # Exception for the KeyCache class
+    class KeyCacheException(Exception):
+        pass
+
+    def __init__(self, directory: str, max_entries: int = KEY_CACHE_MAX_ENTRIES, max_age_s: float = KEY_CACHE_MAX_AGE_S) -> None:
+        self.directory: str = directory
+        self.max_entries: int = max_entries
+        self.max_age_s: float = max_age_s
+
+        # The cached keys decrypt the AUTHOR data => only the current user may access them
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if os.name == 'posix':
+                os.chmod(self.directory, 0o700)
+        except OSError as e:
+            raise KeyCache.KeyCacheException(f"Can't create the key cache directory '{self.directory}': {e}")
+
+    # The cache is only an optimization - problems with it are reported as warnings
+    def get_key(self, content: str, salt: bytes, log: MessageLog) -> bytes | None:
+        return self._read_entry(KeyCache._get_entry_name(content, salt) + '.key', log)
+
+    def put_key(self, content: str, salt: bytes, key: bytes, log: MessageLog) -> None:
+        self._write_entry(KeyCache._get_entry_name(content, salt) + '.key', key, log)
+
+    def get_salt(self, content: str, log: MessageLog) -> bytes | None:
+        return self._read_entry(KeyCache._get_entry_name(content, b'') + '.salt', log)
+
+    def put_salt(self, content: str, salt: bytes, log: MessageLog) -> None:
+        self._write_entry(KeyCache._get_entry_name(content, b'') + '.salt', salt, log)
+
+    @staticmethod
+    def _get_entry_name(content: str, salt: bytes) -> str:
+        return hashlib.sha256(salt + content.encode('utf-8')).hexdigest()
+
+    def _read_entry(self, name: str, log: MessageLog) -> bytes | None:
+        path = os.path.join(self.directory, name)
+        try:
+            # Expired entries are treated as missing
+            if time.time() - os.path.getmtime(path) > self.max_age_s:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log.warning(f"Can't read the key cache entry '{path}': {e}")
+            return None
+        return data
+
+    def _write_entry(self, name: str, data: bytes, log: MessageLog) -> None:
+        # mkstemp creates the file with 0600 permissions, os.replace makes the entry appear atomically
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, os.path.join(self.directory, name))
+            except OSError:
+                os.remove(temp_path)
+                raise
+            self._evict()
+        except OSError as e:
+            log.warning(f"Can't write the key cache entry '{name}': {e}")
+
+    def _evict(self) -> None:
+        # Remove expired entries and then the least recently used ones until we are within the limit
+        entries: list[tuple[float, str]] = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not (name.endswith('.key') or name.endswith('.salt')):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+                if now - mtime > self.max_age_s:
+                    os.remove(path)
+                else:
+                    entries.append((mtime, path))
+            except FileNotFoundError:
+                # Another process removed it already
+                continue
+        entries.sort()
+        for _, path in entries[:max(len(entries) - self.max_entries, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+# Compresses data like zlib.compressobj() but deflates blocks of it on multiple threads, like pigz does.
+# Every block is deflated with the 32 KiB in front of it as the dictionary and ends with a sync flush, so the joined blocks form one deflate stream.
+# Together with the zlib header and the combined Adler-32 checksums of the blocks the output is a normal zlib stream.
+# Payloads smaller than min_size are compressed with zlib directly, larger ones with only one thread are streamed through zlib.compressobj().
+class ParallelCompressor:
+
+    # Number of threads of new compressors - lowered in worker processes so parallel jobs do not oversubscribe the CPU
+    max_threads: int = os.cpu_count() or 1
+
+    DICTIONARY_SIZE = 32 * 1024
+    _ADLER_BASE = 65521
+
+    def __init__(self, level: int = zlib.Z_BEST_COMPRESSION, block_size: int = PARALLEL_DEFLATE_BLOCK_SIZE, min_size: int = PARALLEL_DEFLATE_MIN_SIZE, n_threads: int | None = None) -> None:
+        self.level: int = level
+        self.block_size: int = block_size
+        self.min_size: int = min_size
+        self.n_threads: int = n_threads if n_threads is not None else ParallelCompressor.max_threads
+        self._buffer: bytearray = bytearray()
+        self._executor: ThreadPoolExecutor | None = None
+        self._serial_compressor = None
+        self._pending: collections.deque[Future] = collections.deque()
+        self._dictionary: bytes = b''
+        self._adler: int = 1
+
+    def compress(self, data: bytes) -> bytes:
+        if self._serial_compressor is not None:
+            return self._serial_compressor.compress(data)
+        self._buffer += data
+        output: list[bytes] = []
+        # Stay serial until there is enough data - with only one thread the data is not buffered any longer then
+        if self._executor is None:
+            if len(self._buffer) < self.min_size:
+                return b''
+            if self.n_threads < 2:
+                self._serial_compressor = zlib.compressobj(self.level)
+                data = self._serial_compressor.compress(self._buffer)
+                self._buffer = bytearray()
+                return data
+            self._executor = ThreadPoolExecutor(max_workers=self.n_threads)
+            output.append(self._get_zlib_header())
+
+        # Deflate all full blocks - the remaining data is kept for the next call or the last block
+        offset = 0
+        with memoryview(self._buffer) as buffer:
+            while len(buffer) - offset >= self.block_size:
+                block = bytes(buffer[offset:offset + self.block_size])
+                offset += self.block_size
+                self._pending.append(self._executor.submit(ParallelCompressor._deflate_block, block, self._dictionary, self.level, False))
+                self._dictionary = block[-ParallelCompressor.DICTIONARY_SIZE:]
+                # Limit the number of blocks in memory
+                output += self._collect(2 * self.n_threads)
+        del self._buffer[:offset]
+        return b''.join(output + self._collect(2 * self.n_threads))
+
+    def flush(self) -> bytes:
+        if self._serial_compressor is not None:
+            data = self._serial_compressor.flush()
+            self._serial_compressor = None
+            return data
+        if self._executor is None:
+            data = zlib.compress(bytes(self._buffer), self.level)
+            self._buffer = bytearray()
+            return data
+
+        # The last block ends the deflate stream, the zlib stream ends with the Adler-32 checksum of the uncompressed data
+        self._pending.append(self._executor.submit(ParallelCompressor._deflate_block, bytes(self._buffer), self._dictionary, self.level, True))
+        self._buffer = bytearray()
+        output = self._collect(0)
+        self._executor.shutdown()
+        self._executor = None
+        return b''.join(output) + struct.pack('>I', self._adler)
+
+    # Get the deflated blocks that are done in order. Waits until at most max_pending blocks are left.
+    def _collect(self, max_pending: int) -> list[bytes]:
+        output: list[bytes] = []
+        while len(self._pending) > 0 and (self._pending[0].done() or len(self._pending) > max_pending):
+            compressed, adler, length = self._pending.popleft().result()
+            self._adler = ParallelCompressor._combine_adler32(self._adler, adler, length)
+            output.append(compressed)
+        return output
+
+    def _get_zlib_header(self) -> bytes:
+        # Deflate with a 32 KiB window, the level flags are only informative - the same values zlib uses
+        level_flags = 0 if self.level < 2 else 1 if self.level < 6 else 2 if self.level == 6 else 3
+        header = (0x78 << 8) | (level_flags << 6)
+        return struct.pack('>H', header + 31 - header % 31)
+
+    @staticmethod
+    def _deflate_block(block: bytes, dictionary: bytes, level: int, last: bool) -> tuple[bytes, int, int]:
+        # Raw deflate without a header - zlib releases the GIL while compressing, so this runs in parallel
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary) if dictionary else zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        compressed = compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        return (compressed, zlib.adler32(block), len(block))
+
+    @staticmethod
+    def _combine_adler32(adler1: int, adler2: int, length2: int) -> int:
+        # The Adler-32 checksum of the concatenated data from the checksums of both parts (adler32_combine of zlib)
+        base = ParallelCompressor._ADLER_BASE
+        remainder = length2 % base
+        sum1 = ((adler1 & 0xFFFF) + (adler2 & 0xFFFF) + base - 1) % base
+        sum2 = (remainder * (adler1 & 0xFFFF) + ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + base - remainder) % base
+        return sum1 | (sum2 << 16)
+
 class WatermarkFile:
     # Exception for the WatermarkFile class
     class WatermarkFileException(Exception):
         pass
 
-    def __init__(self, file: str) -> None:
+    # If the content is given the file is not read
+    def __init__(self, file: str, key_cache: KeyCache | None = None, content: str | None = None) -> None:
         self.file: str = file
         self.content: str = ""
+        self.key_cache: KeyCache | None = key_cache
         self._salt: bytes = os.urandom(16)
+        self._key: bytes | None = None
         print_debug(f"[Watermark] salt: {self._salt.hex()}")
 
+        # Use the same new lines as reading the file
+        if content is not None:
+            self.content = content.replace('\r\n', '\n').replace('\r', '\n')
+            return
+
         # Open the file and read the content - make sure we get '\n' as newline by setting newline=None
         try:
             with open(file, newline=None, encoding='utf-8') as f:
@@ -762,7 +902,15 @@ class WatermarkFile:
         except Exception as e:
             raise WatermarkFile.WatermarkFileException(f"Error while reading the watermark file: {e}")
 
-    def to_key(self) -> bytes:
+    def to_key(self, log: MessageLog) -> bytes:
+        # The key only depends on the content and the salt
+        if self._key is not None:
+            return self._key
+        if self.key_cache is not None:
+            self._key = self.key_cache.get_key(self.content, self._salt, log)
+            if self._key is not None:
+                return self._key
+
         # Get the key for the watermark
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
@@ -770,8 +918,28 @@ class WatermarkFile:
             salt=self._salt,
             iterations=480000,
         )
-        key = base64.urlsafe_b64encode(kdf.derive(self.content.encode('utf-8')))
-        return key
+        self._key = base64.urlsafe_b64encode(kdf.derive(self.content.encode('utf-8')))
+
+        if self.key_cache is not None:
+            self.key_cache.put_key(self.content, self._salt, self._key, log)
+        return self._key
+
+    def use_fixed_salt(self, log: MessageLog) -> None:
+        # Reuse the salt of earlier runs if there is one
+        if self.key_cache is not None:
+            salt = self.key_cache.get_salt(self.content, log)
+            if salt is not None and len(salt) == 16:
+                self._salt = salt
+                self._key = None
+            else:
+                self.key_cache.put_salt(self.content, self._salt, log)
+        print_debug(f"[Watermark] fixed salt: {self._salt.hex()}")
+
+    def with_new_salt(self) -> 'WatermarkFile':
+        watermark_file = copy.copy(self)
+        watermark_file._salt = os.urandom(16)
+        watermark_file._key = None
+        return watermark_file
     
     
         
@@ -781,148 +949,77 @@ class WatermarkFile:
 # |                                    |
 # +------------------------------------+
 
-def get_numer_of_columns_from_columns_model(columns_model: Cols) -> int:
-    match columns_model:
-        case Cols.FIVE_ZONE:
-            return 5
-        case Cols.FIFTEEN_ZONE:
-            return 15
-        case Cols.ELEVEN_ZONE | Cols.THIRTY_THREE_ZONE:
-            # There only exists 33 columns mode for the AUTHOR data,
-            # the 11 columns mode is a convenience mode for the 33 columns mode
-            return 33
-        case Cols.THREE_ZONE_2A | Cols.TWENTY_SIX_ZONE:
-            # There only exists 26 columns mode for the AUTHOR data,
-            # the 3 columns mode is a convenience mode for the 26 columns mode
-            return 26
-        case Cols.THREE_ZONE_3A | Cols.THIRTY_SIX_ZONE:
-            # There only exists 36 columns mode for the AUTHOR data,
-            # the 3 columns mode is a convenience mode for the 36 columns mode
-            return 36
-        case Cols.SIX_ZONE | Cols.SEVEN_ZONE:
-            # There only exists 6 and 7 columns modes for the AUTHOR data for PHONE4A,
-            # the 6 and 7 columns modes are determined by the maximum glyph index used in the Labels file
-            return 7 if columns_model == Cols.SEVEN_ZONE else 6
+# The ramps are shared between all Labels and Label files of this process. Use get_light_level_ramp.cache_info() to get the hits and misses.
+@functools.lru_cache(maxsize=LIGHT_LEVEL_RAMP_CACHE_SIZE)
+def get_light_level_ramp(light_level_from: int, light_level_to: int, n_steps: int, light_mode: str) -> np.ndarray:
+    # Fading up starts one step in so the last row reaches the target light level, fading down starts at the first row
+    i = np.arange(n_steps, dtype=np.float64) + (1 if light_level_from <= light_level_to else 0)
+
+    # Calculate the light levels depending on the light mode - keep the operation order of the scalar formulas so the rounding is identical
+    match light_mode:
+        case "LIN":
+            light_levels = light_level_from + ((light_level_to - light_level_from) / n_steps) * i
+        case "EXP":
+            light_levels = max(light_level_from, 1) * np.power(max(light_level_to, 1) / max(light_level_from, 1), i / n_steps)
+        case "LOG":
+            light_levels = -max(light_level_to, 1) * np.power(max(light_level_to, 1) / max(light_level_from, 1), -i / n_steps) + light_level_from + light_level_to
         case _:
-            raise ValueError(f"[Programming Error] Missing columns model in switch case: '{columns_model}'. Please report this error to the developer.")
-
-def get_glyph_array_indexes(glyph_index: int, zone_index: int, columns_model: Cols) -> list[int]:
-    # Offset the glyph_index and zone_index
-    glyph_index -= 1
-    zone_index -= 1
-
-    # Offset is needed because we use the dot index system
-    # E.g.: Phone1 has in 15Col mode 4 zones in the BATTERY_GLYPH (glyph_index of 3).
-    #       So we need to offset the array index by 4 to get the right zone if the glyph_index is greater than 3.
-    offset: int = 0
-
-    match columns_model:
-        case Cols.FIVE_ZONE:
-            # No zone_index in 5Col mode therefore we use the 5col mode to keep upwards compatibility
-            return PHONE1_5COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index]
-        case Cols.FIFTEEN_ZONE:
-            # Offset the array index if the glyph_index is greater than (3 - 1) (BATTERY_GLYPH has 4 zones in 15Col mode => 3 + 1)
-            offset += 3 if glyph_index > 2 else 0
-            # Offset the array index if the glyph_index is greater than (4 - 1) (USB_LINE_GLYPH has 8 zones in 15Col mode => 7 + 1)
-            offset += 7 if glyph_index > 3 else 0
-
-            if zone_index == -1:
-                # No zone_index provided => we need to address the whole glyph
-                return PHONE1_5COL_GLYPH_INDEX_TO_ARRAY_INDEXES_15COL[glyph_index]
-            else:
-                # Only address the zone
-                return PHONE1_15COL_GLYPH_ZONE_INDEX_TO_ARRAY_INDEXES_15COL[glyph_index + zone_index + offset]
-        case Cols.ELEVEN_ZONE:
-            # No zone_index in 11Col mode
-            return PHONE2_11COL_GLYPH_INDEX_TO_ARRAY_INDEXES_33COL[glyph_index]
-        case Cols.THIRTY_THREE_ZONE:
-            # Offset the array index if the glyph_index is greater than (4 - 1) (BATTERY_TOP_RIGHT_GLYPH has 16 zones in 33Col mode => 15 + 1)
-            offset += 15 if glyph_index > 3 else 0
-            # Offset the array index if the glyph_index is greater than (10 - 1) (USB_LINE_GLYPH has 8 zones in 33Col mode => 7 + 1)
-            offset += 7 if glyph_index > 9 else 0
-
-            if zone_index == -1:
-                # No zone_index provided => we need to address the whole glyph
-                return PHONE2_11COL_GLYPH_INDEX_TO_ARRAY_INDEXES_33COL[glyph_index]
-            else:
-                # Only address the zone
-                return PHONE2_33_COL_GLYPH_ZONE_INDEX_TO_ARRAY_INDEXES_33COL[glyph_index + zone_index + offset]
-        case Cols.THREE_ZONE_2A:
-            # No zone_index in 3Col mode
-            return PHONE2A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_26COL[glyph_index]
-        case Cols.TWENTY_SIX_ZONE:
-            # Offset the array index if the glyph_index is greater than (1 - 1) (TOP_LEFT_GLYPH has 24 zones in 26Col mode => 23 + 1)
-            offset += 23 if glyph_index > 0 else 0
-
-            if zone_index == -1:
-                # No zone_index provided => we need to address the whole glyph
-                return PHONE2A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_26COL[glyph_index]
-            else:
-                # Only address the zone
-                return PHONE2A_26COL_GLYPH_INDEX_TO_ARRAY_INDEXES_26COL[glyph_index + zone_index + offset]
-        case Cols.THREE_ZONE_3A:
-            # No zone_index in 3Col mode
-            return PHONE3A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_36COL[glyph_index]
-        case Cols.THIRTY_SIX_ZONE:
-            # Offset the array index if the glyph_index is greater than (1 - 1) (TOP_LEFT_GLYPH has 20 zones in 36Col mode => 19 + 1)
-            offset += 19 if glyph_index > 0 else 0
-            # Offset the array index if the glyph_index is greater than (2 - 1) (MIDDLE_RIGHT_GLYPH has 11 zones in 36Col mode => 10 + 1)
-            offset += 10 if glyph_index > 1 else 0
-
-            if zone_index == -1:
-                # No zone_index provided => we need to address the whole glyph
-                return PHONE3A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_36COL[glyph_index]
-            else:
-                # Only address the zone
-                return PHONE3A_36COL_GLYPH_INDEX_TO_ARRAY_INDEXES_36COL[glyph_index + zone_index + offset]
-        case Cols.SIX_ZONE | Cols.SEVEN_ZONE:
-            # No zone index in 6 and 7 Col mode
-            match columns_model:
-                case Cols.SIX_ZONE:
-                    return PHONE4A_6COL_GLYPH_INDEX_TO_ARRAY_INDEXES_6COL[glyph_index]
-                case Cols.SEVEN_ZONE:
-                    return PHONE4A_7COL_GLYPH_INDEX_TO_ARRAY_INDEXES_7COL[glyph_index]
-        case _:
-            raise ValueError(f"[Programming Error] Missing columns model in switch case: '{columns_model}'. Please report this error to the developer.")
-
-def get_custom_5col_id(glyph_index: int, columns_model: Cols) -> int:
-    # Offset the glyph_index
-    glyph_index -= 1
-
-    match columns_model:
-        case Cols.FIVE_ZONE | Cols.FIFTEEN_ZONE:
-            return PHONE1_5COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index][0]
-        case Cols.ELEVEN_ZONE | Cols.THIRTY_THREE_ZONE:
-            return PHONE2_11COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index][0]
-        case Cols.THREE_ZONE_2A | Cols.TWENTY_SIX_ZONE:
-            return PHONE2A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index][0]
-        case Cols.THREE_ZONE_3A | Cols.THIRTY_SIX_ZONE:
-            return PHONE3A_3COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index][0]
-        case Cols.SIX_ZONE | Cols.SEVEN_ZONE:
-            match columns_model:
-                case Cols.SIX_ZONE:
-                    return PHONE4A_6COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index][0]
-                case Cols.SEVEN_ZONE:
-                    return PHONE4A_7COL_GLYPH_INDEX_TO_ARRAY_INDEXES_5COL[glyph_index][0]
-        case _:
-            raise ValueError(f"[Programming Error] Missing columns model in switch case: '{columns_model}'. Please report this error to the developer.")
-
+            raise ValueError(f"[Programming Error] Missing light mode in switch case: '{light_mode}'. Please report this error to the developer.")
+
+    # np.rint rounds half to even just like round()
+    light_levels = np.rint(light_levels).astype(np.int16)
+    # The array is shared by everyone who gets it from the cache => make sure nobody can change it
+    light_levels.flags.writeable = False
+    return light_levels
+
+def draw_label(author_data: np.ndarray, label: LabelFile.Label, parsed_label: LabelFile.ParsedLabel, log: MessageLog, row_mask: np.ndarray | None = None) -> None:
+    # Get the rows and the light levels - only the rows set in the row mask if there is one
+    rows = np.arange(parsed_label.row_from, parsed_label.row_to)
+    light_levels = get_light_level_ramp(parsed_label.absolute_light_level_from, parsed_label.absolute_light_level_to, parsed_label.row_to - parsed_label.row_from, parsed_label.light_mode)
+    if row_mask is not None:
+        selected_rows = row_mask[parsed_label.row_from:parsed_label.row_to]
+        rows, light_levels = rows[selected_rows], light_levels[selected_rows]
+
+    # Set the AUTHOR data
+    target = np.ix_(rows, parsed_label.array_indexes)
+    # Check if there are already values present
+    overwrites: int = int(np.count_nonzero(author_data[target]))
+    # Write the light levels to the AUTHOR data
+    author_data[target] = light_levels[:, np.newaxis]
+
+    # Inform the user if there were any overwrites
+    if overwrites > 0:
+        log.warning(f"Overwrote {overwrites} values in the AUTHOR data for label '{label.text}' in line {label.line_num}.")
+
+def get_custom1_data(parsed_labels: list[tuple[LabelFile.Label, LabelFile.ParsedLabel]]) -> list[str]:
+    return [f"{round(label.time_from_ms)}-{parsed_label.custom_5col_id}" for label, parsed_label in parsed_labels]
 
 def get_nearest_divisable_by(number: float, divisor: float) -> float:
     # Return the nearest number that is divisable by the divisor
     return round(number / divisor) * divisor
 
-def encrypt_author_data(key: bytes, author_data: list[str], columns_model: Cols) -> list[str]:
+def author_data_to_rows(author_data: np.ndarray, chunk_size: int = 4096) -> Iterator[str]:
+    # Only convert a chunk of rows to python objects at a time to keep the memory usage low
+    for chunk_start in range(0, len(author_data), chunk_size):
+        for line in author_data[chunk_start:chunk_start + chunk_size].tolist():
+            yield f"{','.join(map(str, line))},"
+
+def encrypt_author_data(key: bytes, author_data: Iterable[str], columns_model: DeviceProfile.ColumnsModel) -> list[str]:
     # Get the number of columns
-    num_columns = get_numer_of_columns_from_columns_model(columns_model)
+    num_columns = columns_model.columns
     
     # Create encryption object
     f = Fernet(key)
 
-    # Concat the data and compress it
-    byte_data = '\r\n'.join(author_data).encode('utf-8')
-    data = zlib.compress(byte_data, zlib.Z_BEST_COMPRESSION)
-    token = zlib.compress(f.encrypt(data), zlib.Z_BEST_COMPRESSION)
+    # Concat the data and compress it - row by row so the uncompressed data never has to be in memory as a whole
+    compressor = ParallelCompressor()
+    compressed_chunks: list[bytes] = []
+    for i, row in enumerate(author_data):
+        compressed_chunks.append(compressor.compress((row if i == 0 else '\r\n' + row).encode('utf-8')))
+    compressed_chunks.append(compressor.flush())
+    data = b''.join(compressed_chunks)
+    compressor = ParallelCompressor()
+    token = compressor.compress(f.encrypt(data)) + compressor.flush()
 
     print_debug(f"length before encryption: {len(data)}")
     print_debug(f"length after encryption: {len(token)}")
@@ -937,7 +1034,253 @@ def encrypt_author_data(key: bytes, author_data: list[str], columns_model: Cols)
 
 
     return [f"{','.join([str(e) for e in line])}," for line in encrypt_author_data]
+
+def write_nglyph_file(file_path: str, nglyph_data: dict[str, ]) -> None:
+    # Writes the same output as json.dump(nglyph_data, f, indent=4) but the AUTHOR rows can be any iterable.
+    # They are written one by one so we never have to hold the whole AUTHOR data as strings in memory.
+    # The rows are only produced while writing, so write to a temporary file and only replace the target once all of them are written.
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', newline='\r\n', encoding='utf-8') as f:
+            f.write('{')
+            for n_key, (key, value) in enumerate(nglyph_data.items()):
+                f.write(f"{',' if n_key else ''}\n    {json.dumps(key)}: ")
+                if key != 'AUTHOR':
+                    # Indent the nested value one level deeper
+                    f.write(json.dumps(value, indent=4).replace('\n', '\n    '))
+                    continue
+
+                is_empty = True
+                for row in value:
+                    f.write(f"{'[' if is_empty else ','}\n        {json.dumps(row)}")
+                    is_empty = False
+                f.write('[]' if is_empty else '\n    ]')
+            f.write('\n}' if nglyph_data else '}')
+        os.replace(temp_path, file_path)
+    except BaseException:
+        # Also on Ctrl+C - never leave a truncated nglyph file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def check_label_file(file_path: str) -> None:
+    # Check if the file exists
+    if not os.path.isfile(file_path):
+        raise Exception(f"Label file does not exist: '{file_path}'")
+    # Check if the file has the right extension
+    if not file_path.endswith(".txt"):
+        raise Exception(f"File '{os.path.basename(file_path)}' is not a Label file.")
+
+def get_label_file_paths(paths: list[str], manifest_path: str | None = None) -> list[str]:
+    # Read the manifest file - one path per line
+    if manifest_path is not None:
+        try:
+            with open(manifest_path, newline=None, encoding='utf-8') as f:
+                manifest_lines = [line.strip() for line in f]
+        except Exception as e:
+            raise Exception(f"Error while reading the manifest file: {e}")
+        manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+        paths = paths + [os.path.join(manifest_dir, line) for line in manifest_lines if line != "" and not line.startswith('#')]
+
+    label_file_paths: list[str] = []
+    for path in paths:
+        # Expand glob patterns ourselves - not every shell does it (e.g. cmd.exe)
+        if any(c in path for c in '*?['):
+            matches = sorted(glob.glob(path))
+            if len(matches) == 0:
+                raise Exception(f"No files match the pattern: '{path}'")
+        # Use all Label files of a directory
+        elif os.path.isdir(path):
+            matches = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".txt"))
+        else:
+            matches = [path]
+        label_file_paths.extend(os.path.abspath(match) for match in matches)
+
+    # Remove duplicates but keep the order
+    return list(dict.fromkeys(label_file_paths))
+
+def translate_label_file(file_path: str, output_path: str, log: MessageLog, watermark_file: WatermarkFile | None = None) -> str:
+    # Read the Label file
+    label_file = LabelFile(file_path, log)
     
+    # Inform the user
+    log.info(f"Processed {len(label_file.labels)} Labels.")
+    log.info(f"Using phone model: {label_file.phone_model.name}, columns model: {label_file.columns_model.name}")
+
+    # Process the Labels
+    author_data, custom1_data = label_file.get_nglyph_data(log)
+    print_debug(f"light level ramp cache: {get_light_level_ramp.cache_info()}")
+
+    nglyph_data = build_nglyph_data(label_file, author_data, custom1_data, log, watermark_file)
+
+    # Write the nglyph file
+    nglyph_file_path = get_nglyph_file_path(file_path, output_path)
+    log.info(f"Writing the nglyph file to '{nglyph_file_path}'")
+    write_nglyph_file(nglyph_file_path, nglyph_data)
+
+    return nglyph_file_path
+
+def get_nglyph_file_path(file_path: str, output_path: str) -> str:
+    base_filename = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_path, base_filename + ".nglyph")
+
+def build_nglyph_data(label_file: LabelFile, author_data: Iterable[str], custom1_data: list[str], log: MessageLog, watermark_file: WatermarkFile | None = None) -> dict[str, ]:
+    # Create the nglyph data
+    nglyph_data = {
+        'VERSION': 1,
+        'PHONE_MODEL': label_file.phone_model.name,
+        'AUTHOR': author_data,
+        'CUSTOM1': custom1_data,
+    }
+    
+    # Get the watermark file data
+    if watermark_file is not None:
+        log.info(f"Processing watermark from file '{watermark_file.file}'...")
+        
+        # If there is a new line at the end of the file splitlines() will not make an extra empty line => add one if needed
+        nglyph_data['WATERMARK'] = watermark_file.content.splitlines() + ([''] if watermark_file.content.endswith('\n') else [])
+        nglyph_data['SALT'] = base64.b64encode(watermark_file._salt).decode('utf-8')
+
+        # Get the key
+        watermark_key = watermark_file.to_key(log)
+        nglyph_data['AUTHOR'] = encrypt_author_data(watermark_key, nglyph_data['AUTHOR'], label_file.columns_model)
+
+    return nglyph_data
+
+def watch_label_file(file_path: str, output_path: str, log: MessageLog, watermark_file: WatermarkFile | None = None) -> int:
+    nglyph_file_path = get_nglyph_file_path(file_path, output_path)
+    author_raster: AuthorRaster | None = None
+    last_file_state: tuple[int, int] | None = None
+
+    print_info(f"Watching '{file_path}' for changes. Press Ctrl+C to stop.")
+    try:
+        while True:
+            # Audacity replaces the file on export - it might be gone for a moment
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                time.sleep(WATCH_INTERVAL_S)
+                continue
+
+            file_state = (file_stat.st_mtime_ns, file_stat.st_size)
+            if file_state == last_file_state:
+                time.sleep(WATCH_INTERVAL_S)
+                continue
+            last_file_state = file_state
+
+            # Update the AUTHOR data - keep the last good state if the Label file is broken
+            start_time = time.perf_counter()
+            try:
+                label_file = LabelFile(file_path, log)
+                if author_raster is None:
+                    author_raster = AuthorRaster(label_file, log)
+                    redrawn_rows = len(author_raster.author_rows)
+                else:
+                    redrawn_rows = author_raster.update(label_file)
+            except (LabelFile.LabelFileException, DeviceProfile.DeviceProfileException) as e:
+                if isinstance(e, LabelFile.LabelFileException):
+                    print_label_errors(e.label_errors)
+                print_error(e)
+                print_info("Waiting for the next change...")
+                continue
+
+            # Rewrite the nglyph file
+            write_nglyph_file(nglyph_file_path, build_nglyph_data(label_file, author_raster.author_rows, author_raster.custom1_data, log, watermark_file))
+            print_info(f"Updated '{nglyph_file_path}' ({len(label_file.labels)} Labels, redrew {redrawn_rows} of {len(author_raster.author_rows)} rows in {(time.perf_counter() - start_time) * 1000:.0f}ms)")
+    except KeyboardInterrupt:
+        print_info("Stopped watching.", start="\n")
+    return 0
+
+# Print the errors of the single Labels in front of the error of the Label file
+def print_label_errors(label_errors: list[str]) -> None:
+    for label_error in label_errors:
+        print_error(label_error)
+
+def translate_label_file_job(file_path: str, output_path: str, watermark_file: WatermarkFile | None = None, compression_threads: int = 1) -> tuple[bool, str, list[str], str]:
+    # Runs in a worker process - collect the output so the messages of the Label files do not get mixed up
+    # Returns the output, the errors of the single Labels and the error or the path of the nglyph file
+    output = io.StringIO()
+    log = MessageLog(output)
+    try:
+        # Share the CPU cores between the jobs - class attributes are not set in spawned worker processes
+        ParallelCompressor.max_threads = compression_threads
+        check_label_file(file_path)
+        result = translate_label_file(file_path, output_path, log, watermark_file)
+    except LabelFile.LabelFileException as e:
+        return (False, output.getvalue(), e.label_errors, str(e))
+    except Exception as e:
+        # Also catch unexpected errors so one broken Label file does not stop the whole batch
+        return (False, output.getvalue(), [], str(e))
+    return (True, output.getvalue(), [], result)
+    
+
+# +------------------------------------+
+# |                                    |
+# |                API                 |
+# |                                    |
+# +------------------------------------+
+
+# For importing the GlyphTranslator as a module: these functions never print or exit the process.
+# Errors are raised as GlyphTranslatorError and the messages that the command line prints are returned with the results as (level, text) tuples.
+
+class GlyphTranslatorError(Exception):
+    def __init__(self, message: str, messages: list[tuple[str, str]] | None = None, label_errors: list[str] | None = None) -> None:
+        super().__init__(message)
+        # The messages up to the error
+        self.messages: list[tuple[str, str]] = messages if messages is not None else []
+        # The errors of the single Labels
+        self.label_errors: list[str] = label_errors if label_errors is not None else []
+
+# The nglyph file of translated Labels
+class NGlyph:
+    def __init__(self, nglyph_data: dict[str, ], label_file: LabelFile, messages: list[tuple[str, str]]) -> None:
+        # The content of the nglyph file - the AUTHOR data is encrypted if there is a watermark
+        self.nglyph_data: dict[str, ] = nglyph_data
+        self.phone_model: str = label_file.phone_model.name
+        self.columns_model: str = label_file.columns_model.name
+        self.n_labels: int = len(label_file.labels)
+        self.messages: list[tuple[str, str]] = messages
+
+    # Write the nglyph file
+    def save(self, nglyph_path: str) -> None:
+        try:
+            write_nglyph_file(nglyph_path, self.nglyph_data)
+        except OSError as e:
+            raise GlyphTranslatorError(f"Could not write the nglyph file: {e}")
+
+# Run a function with a new message log that is passed to it. Returns its result and the messages, failures are raised as GlyphTranslatorError.
+def run_logged(function: Callable[[MessageLog], any]) -> tuple[any, list[tuple[str, str]]]:
+    log = MessageLog()
+    try:
+        check_device_profiles()
+        result = function(log)
+    except LabelFile.LabelFileException as e:
+        raise GlyphTranslatorError(str(e), log.messages, e.label_errors) from e
+    except (DeviceProfile.DeviceProfileException, WatermarkFile.WatermarkFileException, KeyCache.KeyCacheException, OSError) as e:
+        raise GlyphTranslatorError(str(e), log.messages) from e
+    return (result, log.messages)
+
+# Translate the content of a Label file. The AUTHOR data is encrypted with the watermark if there is one.
+def translate_labels(text: str, watermark: str | None = None, key_cache_dir: str | None = None) -> NGlyph:
+    try:
+        watermark_file = WatermarkFile("<watermark>", KeyCache(key_cache_dir) if key_cache_dir is not None else None, watermark) if watermark is not None else None
+    except KeyCache.KeyCacheException as e:
+        raise GlyphTranslatorError(str(e)) from e
+    (nglyph_data, label_file), messages = run_logged(lambda log: translate_labels_with_log(text, watermark_file, log))
+    return NGlyph(nglyph_data, label_file, messages)
+
+# The part of translate_labels that reports its messages - run by run_logged
+def translate_labels_with_log(text: str, watermark_file: WatermarkFile | None, log: MessageLog) -> tuple[dict[str, ], LabelFile]:
+    label_file = LabelFile("<labels>", log, text)
+    log.info(f"Processed {len(label_file.labels)} Labels.")
+    log.info(f"Using phone model: {label_file.phone_model.name}, columns model: {label_file.columns_model.name}")
+
+    author_data, custom1_data = label_file.get_nglyph_data(log)
+    nglyph_data = build_nglyph_data(label_file, author_data, custom1_data, log, watermark_file)
+    # The rows are only generated while writing the nglyph file - the caller gets them as a list
+    nglyph_data['AUTHOR'] = list(nglyph_data['AUTHOR'])
+    return (nglyph_data, label_file)
+
 
 # +------------------------------------+
 # |                                    |
@@ -957,11 +1300,21 @@ def main() -> int:
     args = build_arguments_parser().parse_args()
     print_debug(f"args: {args}")
 
+    # Nothing works without the device profiles
+    try:
+        check_device_profiles()
+    except DeviceProfile.DeviceProfileException as e:
+        print_critical_error(e)
+
     # Check the requirements
     check_requirements()
 
+    # Print the messages of translating right away
+    log = MessageLog(sys.stdout)
+
     # Expand the paths
-    args.FILE[0] = os.path.abspath(args.FILE[0])
+    if args.manifest is not None:
+        args.manifest[0] = os.path.abspath(args.manifest[0])
     if args.watermark is not None:
         args.watermark[0] = os.path.abspath(args.watermark[0])
     args.output_path[0] = os.path.abspath(args.output_path[0])
@@ -970,59 +1323,90 @@ def main() -> int:
     # Perform all the checks
     try:
         perform_checks(args.__dict__)
+        label_file_paths = get_label_file_paths(args.FILE, args.manifest[0] if args.manifest is not None else None)
     except Exception as e:
         print_critical_error(e)
     
     print_debug("")
 
-    # Read the Label file
-    try:
-        label_file = LabelFile(args.FILE[0])
-    except LabelFile.LabelFileException as e:
-        print_critical_error(e)
-    
-    # Inform the user
-    print_info(f"Processed {len(label_file.labels)} Labels.")
-    print_info(f"Using phone model: {label_file.phone_model.name}, columns model: {label_file.columns_model.name}")
-
-    # Create the nglyph data
-    nglyph_data = {
-        'VERSION': 1,
-        'PHONE_MODEL': label_file.phone_model.name,
-    }
-
-    # Process the Labels
-    try:
-        nglyph_data['AUTHOR'], nglyph_data['CUSTOM1'] = label_file.get_nglyph_data()
-    except LabelFile.LabelFileException as e:
-        print_critical_error(e)
-    
-    # Get the watermark file data
+    # Read the watermark file
+    watermark_file: WatermarkFile | None = None
     if args.watermark is not None:
-        print_info(f"Processing watermark from file '{args.watermark[0]}'...")
         try:
-            watermark_file = WatermarkFile(args.watermark[0])
-        except WatermarkFile.WatermarkFileException as e:
+            watermark_file = WatermarkFile(args.watermark[0], KeyCache(args.key_cache) if args.key_cache is not None else None)
+        except (WatermarkFile.WatermarkFileException, KeyCache.KeyCacheException) as e:
             print_critical_error(e)
-        
-        # If there is a new line at the end of the file splitlines() will not make an extra empty line => add one if needed
-        nglyph_data['WATERMARK'] = watermark_file.content.splitlines() + ([''] if watermark_file.content.endswith('\n') else [])
-        nglyph_data['SALT'] = base64.b64encode(watermark_file._salt).decode('utf-8')
 
-        # Get the key
-        watermark_key = watermark_file.to_key()
-        nglyph_data['AUTHOR'] = encrypt_author_data(watermark_key, nglyph_data['AUTHOR'], label_file.columns_model)
-
-    # Get the file paths
-    base_filename = os.path.splitext(os.path.basename(args.FILE[0]))[0]
-    nglyph_file_path = os.path.join(args.output_path[0], base_filename + ".nglyph")
+        # Derive the key only once for all Label files
+        if args.reuse_salt:
+            watermark_file.use_fixed_salt(log)
+            watermark_file.to_key(log)
+    elif args.reuse_salt or args.key_cache is not None:
+        print_warning("'--reuse-salt' and '--key-cache' only have an effect together with '--watermark'.")
+
+    # Keep the nglyph file up to date
+    if args.watch:
+        if len(label_file_paths) != 1:
+            print_critical_error(f"'--watch' only works with a single Label file, got {len(label_file_paths)}.")
+        try:
+            check_label_file(label_file_paths[0])
+        except Exception as e:
+            print_critical_error(e)
+        return watch_label_file(label_file_paths[0], args.output_path[0], log, watermark_file)
 
-    # Print info
-    print_info(f"Writing the nglyph file to '{nglyph_file_path}'")
+    # A single Label file is processed directly
+    if len(label_file_paths) == 1:
+        try:
+            check_label_file(label_file_paths[0])
+        except Exception as e:
+            print_critical_error(e)
+        try:
+            translate_label_file(label_file_paths[0], args.output_path[0], log, watermark_file)
+        except LabelFile.LabelFileException as e:
+            print_label_errors(e.label_errors)
+            print_critical_error(e)
+        except (DeviceProfile.DeviceProfileException, WatermarkFile.WatermarkFileException) as e:
+            print_critical_error(e)
 
-    # Write the nglyph file
-    with open(nglyph_file_path, 'w', newline='\r\n', encoding='utf-8') as f:
-        json.dump(nglyph_data, f, indent=4)
+        cprint("Done!", color="green", attrs=["bold"])
+        return 0
+
+    # Files with the same name would overwrite each others nglyph file
+    output_names: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    for file_path in label_file_paths:
+        output_name = os.path.splitext(os.path.basename(file_path))[0].lower()
+        if output_name in output_names:
+            errors[file_path] = f"The nglyph file would overwrite the one of '{output_names[output_name]}'. Please rename one of the Label files."
+        else:
+            output_names[output_name] = file_path
+
+    # Process the Label files in parallel
+    n_jobs = min(args.jobs, len(label_file_paths))
+    print_info(f"Processing {len(label_file_paths)} Label files with {n_jobs} jobs...")
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {file_path: executor.submit(translate_label_file_job, file_path, args.output_path[0], watermark_file if watermark_file is None or args.reuse_salt else watermark_file.with_new_salt(), max(1, (os.cpu_count() or 1) // n_jobs)) for file_path in label_file_paths if file_path not in errors}
+
+        # Print the results in the order of the Label files
+        for file_path in label_file_paths:
+            print_info(f"Label file '{file_path}':", start="\n")
+            if file_path in errors:
+                print_error(errors[file_path])
+                continue
+            success, output, label_errors, message = futures[file_path].result()
+            print(output, end="", flush=True)
+            print_label_errors(label_errors)
+            if not success:
+                print_error(message)
+                errors[file_path] = message
+
+    # Print the summary
+    print("")
+    print_info(f"Translated {len(label_file_paths) - len(errors)} of {len(label_file_paths)} Label files.")
+    if len(errors) > 0:
+        for file_path in (file_path for file_path in label_file_paths if file_path in errors):
+            print_error(f"'{file_path}': {errors[file_path]}")
+        return 1
 
     cprint("Done!", color="green", attrs=["bold"])
 
@@ -26,6 +26,7 @@ if sys.version_info < (3, 10):
     print("This script requires Python 3.10 or higher! Please upgrade your python version and try again.")
     sys.exit(1)
 
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from typing import TypedDict
 import os
@@ -63,7 +64,7 @@ except ImportError:
 class NGlyphData(TypedDict):
     VERSION: int
     PHONE_MODEL: str
-    AUTHOR: list[str]
+    AUTHOR: Iterable[str]
     CUSTOM1: str
 
 class GenericVideoToPhone3NGlyphError(Exception):
@@ -200,9 +201,7 @@ def frame_to_nglyph_csv(frame: np.ndarray, resize_size: tuple[int, int]) -> str:
     csv_data = np.interp(flattened, (0, 255), (0, 4095)).astype(np.uint16)  # Scale the values to 0-4095
     return ','.join(csv_data.astype(str))  # Convert to string and join with commas
 
-def _process_video_precise(video_capture: cv2.VideoCapture, target_device: DeviceInfo, total_output_frames: int) -> list[str]:
-    nglyph_author_data: list[str] = []
-
+def _process_video_precise(video_capture: cv2.VideoCapture, target_device: DeviceInfo, total_output_frames: int) -> Iterator[str]:
     last_progress_update = 0.0
     for current_frame_index in range(total_output_frames):
         logger.debug(f"Processing frame {current_frame_index}/{total_output_frames}")
@@ -211,29 +210,25 @@ def _process_video_precise(video_capture: cv2.VideoCapture, target_device: Devic
             logger.warning(f"Could not read frame from input video for NGlyph frame {current_frame_index}/{total_output_frames}. Stopping video processing.")
             break
 
-        #cv2.imwrite(f"frames/frame_{len(nglyph_author_data)}.png", frame)
-        csv_str = f"{frame_to_nglyph_csv(frame, target_device.matrix_size)},"
-        nglyph_author_data.append(csv_str)
+        #cv2.imwrite(f"frames/frame_{current_frame_index}.png", frame)
+        yield f"{frame_to_nglyph_csv(frame, target_device.matrix_size)},"
 
         progress = current_frame_index / total_output_frames * 100
         if progress - last_progress_update >= 5.0:  # Update progress every 5%
             logger.info(f"Progress: {int(progress)}%")
             last_progress_update = progress
 
-    return nglyph_author_data
-
-def _process_video_interpolated(video_capture: cv2.VideoCapture, target_device: DeviceInfo, video_fps: float, total_output_frames: int) -> list[str]:
-    nglyph_author_data: list[str] = []
-    
+def _process_video_interpolated(video_capture: cv2.VideoCapture, target_device: DeviceInfo, video_fps: float, total_output_frames: int) -> Iterator[str]:
     last_progress_update = 0.0
     last_target_frame_index = -1
+    last_csv_str = ""
     for current_frame_index in range(total_output_frames):
         target_time_s = (current_frame_index / target_device.target_fps)
         target_frame_index = int(target_time_s * video_fps)
 
         if last_target_frame_index == target_frame_index:
             logger.debug(f"Using cached frame for frame index {current_frame_index} (target frame index {target_frame_index}).")
-            nglyph_author_data.append(nglyph_author_data[-1])  # Append the last frame's CSV string again, because it is the same as the target frame index
+            yield last_csv_str  # Yield the last frame's CSV string again, because it is the same as the target frame index
             continue  # We can skip the decoding and just use the cached frame, because it is the same as the target frame index
         
         # greater equal because we only can decode the target frame after grabbing it
@@ -241,7 +236,7 @@ def _process_video_interpolated(video_capture: cv2.VideoCapture, target_device:
             success = video_capture.grab()  # Grab the next frame without decoding it, to move the video forward
             if not success:
                 logger.warning(f"Could not grab frame at {target_time_s * 1000:.2f} ms (frame {target_frame_index}/{int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))}) from input video for NGlyph frame {current_frame_index}/{total_output_frames}. Stopping video processing.")
-                return nglyph_author_data
+                return
         
         logger.debug(f"Processing frame {current_frame_index}/{total_output_frames} at {target_time_s * 1000:.2f} ms => frame index {target_frame_index} of the input video.")
         success, frame = video_capture.retrieve()  # Retrieve the grabbed frame and decode it
@@ -249,24 +244,18 @@ def _process_video_interpolated(video_capture: cv2.VideoCapture, target_device:
             logger.warning(f"Could not decode frame at {target_time_s * 1000:.2f} ms (frame {target_frame_index}/{int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))}) from input video for NGlyph frame {current_frame_index}/{total_output_frames}. Stopping video processing.")
             break
 
-        #cv2.imwrite(f"frames/frame_{len(nglyph_author_data)}.png", frame)
-        csv_str = f"{frame_to_nglyph_csv(frame, target_device.matrix_size)},"
-        nglyph_author_data.append(csv_str)
+        #cv2.imwrite(f"frames/frame_{current_frame_index}.png", frame)
+        last_csv_str = f"{frame_to_nglyph_csv(frame, target_device.matrix_size)},"
+        yield last_csv_str
         last_target_frame_index = target_frame_index
 
         progress = current_frame_index / total_output_frames * 100
         if progress - last_progress_update >= 5.0:  # Update progress every 5%
             logger.info(f"Progress: {int(progress)}%")
             last_progress_update = progress
-    
-    return nglyph_author_data
-
-def process_video(video_path: str, target_device: DeviceInfo) -> list[str]:
-    video_capture = cv2.VideoCapture(video_path)
-    try: 
-        if not video_capture.isOpened():
-            raise InvalidVideoFileError(f"Could not open video file: {video_path}")
 
+def _process_video(video_capture: cv2.VideoCapture, target_device: DeviceInfo) -> Iterator[str]:
+    try:
         fps_match = True
         video_fps = video_capture.get(cv2.CAP_PROP_FPS)
         if video_fps != target_device.target_fps:
@@ -280,12 +269,50 @@ def process_video(video_path: str, target_device: DeviceInfo) -> list[str]:
         logger.debug(f"frames_in_output={total_output_frames}")
 
         if fps_match:
-            return _process_video_precise(video_capture, target_device, total_output_frames)
+            yield from _process_video_precise(video_capture, target_device, total_output_frames)
         else:
-            return _process_video_interpolated(video_capture, target_device, video_fps, total_output_frames)
+            yield from _process_video_interpolated(video_capture, target_device, video_fps, total_output_frames)
     finally:
         video_capture.release()
 
+# Opens the video file and returns the AUTHOR rows, one per output frame - raises InvalidVideoFileError if the video can't be opened.
+# The frames are only decoded while the rows are consumed, so the AUTHOR data never has to be held in memory as a whole.
+def process_video(video_path: str, target_device: DeviceInfo) -> Iterator[str]:
+    video_capture = cv2.VideoCapture(video_path)
+    if not video_capture.isOpened():
+        video_capture.release()
+        raise InvalidVideoFileError(f"Could not open video file: {video_path}")
+
+    return _process_video(video_capture, target_device)
+
+def write_nglyph_file(file_path: str, nglyph_data: NGlyphData) -> None:
+    # Writes the same output as json.dump(nglyph_data, f, indent=4) but the AUTHOR rows can be any iterable.
+    # They are written one by one so we never have to hold the whole AUTHOR data as strings in memory.
+    # The rows are only produced while writing, so write to a temporary file and only replace the target once all of them are written.
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', newline='\r\n', encoding='utf-8') as f:
+            f.write('{')
+            for n_key, (key, value) in enumerate(nglyph_data.items()):
+                f.write(f"{',' if n_key else ''}\n    {json.dumps(key)}: ")
+                if key != 'AUTHOR':
+                    # Indent the nested value one level deeper
+                    f.write(json.dumps(value, indent=4).replace('\n', '\n    '))
+                    continue
+
+                is_empty = True
+                for row in value:
+                    f.write(f"{'[' if is_empty else ','}\n        {json.dumps(row)}")
+                    is_empty = False
+                f.write('[]' if is_empty else '\n    ]')
+            f.write('\n}' if nglyph_data else '}')
+        os.replace(temp_path, file_path)
+    except BaseException:
+        # Also on Ctrl+C - never leave a truncated nglyph file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
 
 # +------------------------------------+
 # |                                    |
@@ -321,7 +348,7 @@ def main() -> int:
     device_info = PHONE_MODEL_INFO[phone_model_str]
     logger.debug(f"device_info={device_info!r}")
 
-    # Process the video
+    # Process the video - the frames are processed while the NGlyph file is written
     logger.info(f"Processing video: {video_path}")
     author_data = process_video(video_path, device_info)
 
@@ -335,8 +362,7 @@ def main() -> int:
         'AUTHOR': author_data,
         'CUSTOM1': ''
     }
-    with open(nglyph_file_path, 'w', newline='\r\n', encoding='utf-8') as f:
-        json.dump(nglyph_data, f, indent=4)
+    write_nglyph_file(nglyph_file_path, nglyph_data)
     
     cprint("Done!", color="green", attrs=["bold"])
     return 0
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# DeflateBenchmark - A tool to compare the parallel zlib compression of the GlyphModder against the serial zlib compression.
+# Copyright (C) 2025  Sebastian Aigner (aka. SebiAi)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+# Import the GlyphModder from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import GlyphModder
+
+# Builds AUTHOR data that compresses like a real composition: the light levels of each column change every few lines
+def generate_author_payload(n_rows: int, n_columns: int) -> bytes:
+    rng = np.random.default_rng(0)
+    keyframes = rng.integers(0, 4096, size=(n_rows // 8 + 1, n_columns)) * (rng.random((n_rows // 8 + 1, n_columns)) < 0.3)
+    return GlyphModder.AuthorData._to_csv(np.repeat(keyframes, 8, axis=0)[:n_rows])
+
+def measure(function, data: bytes, repeat: int) -> tuple[float, bytes]:
+    best = float('inf')
+    result = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(data)
+        best = min(best, time.perf_counter() - start)
+    return (best, result)
+
+def compress_parallel(data: bytes, n_threads: int) -> bytes:
+    compressor = GlyphModder.ParallelCompressor(n_threads=n_threads, min_size=0)
+    return compressor.compress(data) + compressor.flush()
+
+def main():
+    parser = argparse.ArgumentParser(add_help=False, description="A tool to compare the parallel zlib compression of the GlyphModder against the serial zlib compression.", epilog="Created by: Sebastian Aigner (aka. SebiAi)")
+
+    parser.add_argument('-h', '--help', action='help', help='Show this help message and exit.')
+    parser.add_argument('-n', help="The number of AUTHOR rows. The default is about one hour of Phone (3) data. - default: 216000", type=int, default=216000, dest='n_rows')
+    parser.add_argument('-c', help="The number of AUTHOR columns. - default: 625", type=int, default=625, dest='n_columns')
+    parser.add_argument('-t', help=f"The number of threads of the parallel compression. - default: {os.cpu_count() or 1}", type=int, default=os.cpu_count() or 1, dest='n_threads')
+    parser.add_argument('-r', help="How often each compression is run. The fastest run is reported. - default: 3", type=int, default=3, dest='repeat')
+
+    args = parser.parse_args()
+
+    data = generate_author_payload(args.n_rows, args.n_columns)
+    print(f"AUTHOR payload: {args.n_rows}x{args.n_columns} -> {len(data) / 1024 / 1024:.1f}MiB")
+
+    serial_time, serial_data = measure(lambda data: zlib.compress(data, zlib.Z_BEST_COMPRESSION), data, args.repeat)
+    parallel_time, parallel_data = measure(lambda data: compress_parallel(data, args.n_threads), data, args.repeat)
+
+    # Make sure the parallel output is a valid zlib stream of the same data
+    assert zlib.decompress(parallel_data) == data, "The parallel compression does not decompress to the original data."
+
+    print(f"serial: {serial_time * 1000:.1f}ms, {len(serial_data)} bytes")
+    print(f"parallel ({args.n_threads} threads): {parallel_time * 1000:.1f}ms, {len(parallel_data)} bytes ({serial_time / parallel_time:.2f}x faster, {(len(parallel_data) / len(serial_data) - 1) * 100:+.2f}% size)")
+
+    print("Done!")
+
+if __name__ == "__main__":
+    main()
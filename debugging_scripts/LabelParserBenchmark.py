@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# LabelParserBenchmark - A tool to compare the GlyphTranslator Label file parser against the old regex based parser.
+# Copyright (C) 2025  Sebastian Aigner (aka. SebiAi)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+# Import the GlyphTranslator from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import GlyphTranslator
+
+# The regex patterns GlyphTranslator used before the hand-written Label text parser
+REGEX_PATTERNS_LABEL_TEXT: dict[str, str] = {
+    'PHONE1': r'^([1-5])(?:\.((?:(?<![1-24-5]\.)[1-4])|(?:(?<![1-35]\.)[1-8])))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$',
+    'PHONE2': r'^([1-9]|1[0-1])(?:\.((?:(?<![0-35-9]\.)[1-9]|1[0-6])|(?:(?<![1-9]\.)[1-8])))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$',
+    'PHONE2A': r'^([1-3])(?:(?<![23])\.([1-9]|1\d|2[0-4]))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$',
+    'PHONE3A': r'^([1-3])(?:\.((?:(?<=1\.)(?:[1-9]|1\d|20))|(?:(?<=2\.)(?:[1-9]|1[0-1]))|(?:(?<=3\.)[1-5])))?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$',
+    'PHONE4A': r'^([1-7])()?-(\d{1,2}|100)(?:-(\d{1,2}|100))?(?:-(EXP|LIN|LOG))?$',
+}
+
+def generate_label_file(file_path: str, phone_model: str, n_labels: int) -> None:
+    glyph_ids = list(GlyphTranslator.DEVICE_PROFILES[phone_model].label_glyph_table.keys())
+
+    lines = ["0.000000\t0.000000\tLABEL_VERSION=1", f"0.000000\t0.000000\tPHONE_MODEL={phone_model}"]
+    for i in range(n_labels):
+        time_from = i * 0.05
+        # Use all forms of the Label text: 'glyphId-from', 'glyphId-from-to', 'glyphId-from-MODE' and 'glyphId-from-to-MODE'
+        text = random.choice(glyph_ids) + f"-{random.randint(0, 100)}"
+        match random.randrange(4):
+            case 1:
+                text += f"-{random.randint(0, 100)}"
+            case 2:
+                text += f"-{random.choice(['EXP', 'LIN', 'LOG'])}"
+            case 3:
+                text += f"-{random.randint(0, 100)}-{random.choice(['EXP', 'LIN', 'LOG'])}"
+        lines.append(f"{time_from:.6f}\t{time_from + 0.1:.6f}\t{text}")
+    lines.append(f"{n_labels * 0.05 + 1:.6f}\t{n_labels * 0.05 + 1:.6f}\tEND")
+
+    with open(file_path, 'w', newline='\n', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+# The old parsing path: the file is read twice and every Label runs up to three regex matches.
+# The checks after parsing (END Label, sorting, ...) are not included, so this is in favor of the regex path.
+def parse_with_regex(file_path: str) -> list[tuple]:
+    # Determine the phone model - first read of the file
+    phone_model = None
+    with open(file_path, newline='', encoding='utf-8') as f:
+        for line in f:
+            m = re.search(r'PHONE_MODEL=(\w+)', line)
+            if m is not None:
+                phone_model = m.group(1)
+    regex = re.compile(REGEX_PATTERNS_LABEL_TEXT[phone_model])
+
+    # Parse the Labels - second read of the file
+    labels: list[tuple] = []
+    with open(file_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter='\t', strict=True, skipinitialspace=True)
+        for row in reader:
+            if len(row) == 0 or row[0].strip() == "":
+                continue
+            label = GlyphTranslator.LabelFile.Label.from_list(row, reader.line_num)
+            if label.text == "END" or re.match(r'^LABEL_VERSION=(\d+)$', label.text) is not None or re.match(r'^PHONE_MODEL=(\w+)$', label.text) is not None:
+                continue
+            result = regex.match(label.text)
+            labels.append((label.time_from_ms, label.time_to_ms, int(result.group(1)), int(result.group(2)) if result.group(2) else 0, int(result.group(3)), int(result.group(4)) if result.group(4) is not None else int(result.group(3)), result.group(5) or "LIN"))
+    return labels
+
+def parse_with_label_file(file_path: str) -> list[tuple]:
+    label_file = GlyphTranslator.LabelFile(file_path, GlyphTranslator.MessageLog())
+    return [(label.time_from_ms, label.time_to_ms, label.glyph_index, label.zone_index, label.relative_light_level_from, label.relative_light_level_to, label.light_mode) for label in label_file.labels if not (label.is_end_label or label.is_version_label or label.is_phone_model_label)]
+
+def measure(function, file_path: str, repeat: int) -> tuple[float, list[tuple]]:
+    best = float('inf')
+    result: list[tuple] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(file_path)
+        best = min(best, time.perf_counter() - start)
+    return (best, result)
+
+def main():
+    parser = argparse.ArgumentParser(add_help=False, description="A tool to compare the GlyphTranslator Label file parser against the old regex based parser.", epilog="Created by: Sebastian Aigner (aka. SebiAi)")
+
+    parser.add_argument('-h', '--help', action='help', help='Show this help message and exit.')
+    parser.add_argument('-n', help="The number of Labels per generated Label file. - default: 100000", type=int, default=100000, dest='n_labels')
+    parser.add_argument('-r', help="How often each parser is run. The fastest run is reported. - default: 3", type=int, default=3, dest='repeat')
+
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for phone_model in GlyphTranslator.LabelFile._SUPPORTED_PHONE_MODELS:
+            file_path = os.path.join(temp_dir, f"{phone_model}.txt")
+            generate_label_file(file_path, phone_model, args.n_labels)
+
+            regex_time, regex_labels = measure(parse_with_regex, file_path, args.repeat)
+            label_file_time, label_file_labels = measure(parse_with_label_file, file_path, args.repeat)
+
+            # Make sure both parsers agree
+            assert len(regex_labels) == len(label_file_labels), "The parsers found a different number of Labels."
+            for regex_label, label_file_label in zip(regex_labels, label_file_labels):
+                assert regex_label == label_file_label, f"The parsers disagree: {regex_label} != {label_file_label}"
+
+            print(f"{phone_model}: {args.n_labels} Labels - regex: {regex_time * 1000:.1f}ms, LabelFile: {label_file_time * 1000:.1f}ms ({regex_time / label_file_time:.2f}x)")
+
+    print("Done!")
+
+if __name__ == "__main__":
+    main()
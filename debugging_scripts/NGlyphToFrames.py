@@ -18,18 +18,42 @@
 
 import argparse
 import json
+import math
 import os
+import struct
+
+import numpy as np
 
 from imagelib import *
+from nglyphlib import NGlyphFrameIndex
 
 # Output folder for the extracted frames
 OUTPUT_FOLDER = "nglyphframes"
 
+# nglyph v2 files start with this magic number, the AUTHOR data starts at a multiple of the alignment
+NGLYPH_V2_MAGIC = b'NGLYPHv2'
+NGLYPH_V2_ALIGNMENT = 64
+
+def read_nglyph(file_path: str) -> tuple[dict[str, any], np.ndarray | NGlyphFrameIndex]:
+    with open(file_path, "rb") as f:
+        if f.read(len(NGLYPH_V2_MAGIC)) != NGLYPH_V2_MAGIC:
+            # Version 1 is plain json - use the frame index so we only parse the frames we need
+            frame_index = NGlyphFrameIndex(file_path)
+            return (frame_index.fields, frame_index)
+        header_length = struct.unpack('<I', f.read(4))[0]
+        nglyph = json.loads(f.read(header_length))
+
+    # Version 2 - map the frames without reading the whole file
+    assert nglyph['AUTHOR']['ENCODING'] == 'FRAMES', "Only unencrypted nglyph files are supported."
+    offset = math.ceil((len(NGLYPH_V2_MAGIC) + 4 + header_length) / NGLYPH_V2_ALIGNMENT) * NGLYPH_V2_ALIGNMENT
+    return (nglyph, np.memmap(file_path, dtype='<i2', mode='r', offset=offset, shape=tuple(nglyph['AUTHOR']['SHAPE'])))
+
 def main():
     parser = argparse.ArgumentParser(add_help=False, description="A tool to convert Nothing Phone (3) light data in an NGlyph file to an image sequence.", epilog="Created by: Sebastian Aigner (aka. SebiAi)")
 
     parser.add_argument('-h', '--help', action='help', help='Show this help message and exit.')
     parser.add_argument('NGLYPH_PATH', help="A path to the nglyph file to read the light data from.", type=str, nargs=1) # NGLYPH_PATH
+    parser.add_argument('--frames', help="Only convert the frames START to END (END is not included), e.g. '100:200'. Either side can be left out. - default: all frames", type=str, default=':', metavar='START:END', dest='frames') # frames
 
     args = parser.parse_args()
 
@@ -46,21 +70,22 @@ def main():
         os.makedirs(OUTPUT_FOLDER)
     
     # Read the nglyph file
-    with open(args.NGLYPH_PATH[0], "r") as f:
-        nglyph: dict[str, any] = json.load(f)
+    nglyph, frames = read_nglyph(args.NGLYPH_PATH[0])
     
-    assert 'VERSION' in nglyph and int(nglyph['VERSION']) == 1, "Only nglyph version 1 is supported."
+    assert 'VERSION' in nglyph and int(nglyph['VERSION']) in (1, 2), "Only nglyph version 1 and 2 are supported."
     assert 'PHONE_MODEL' in nglyph and nglyph['PHONE_MODEL'] == "PHONE3", "Only Nothing Phone (3) is supported."
     assert 'WATERMARK' not in nglyph, "NGlyph files protected by a watermark are not supported."
-    assert 'AUTHOR' in nglyph and isinstance(nglyph['AUTHOR'], list) and all(isinstance(frame, str) for frame in nglyph['AUTHOR']), "The nglyph file does not contain valid frame data."
 
-    frame_data = nglyph['AUTHOR']
-    print(f"Found {len(frame_data)} frames in the nglyph file.")
+    print(f"Found {len(frames)} frames in the nglyph file.")
+
+    # Get the frame range
+    start, _, stop = args.frames.partition(':')
+    start, stop, _ = slice(int(start) if start else None, int(stop) if stop else None).indices(len(frames))
+    frame_data = frames[start:stop].tolist() if isinstance(frames, np.ndarray) else frames.get_frames(start, stop)
 
-    for frame_nr, frame in enumerate(frame_data):
-        print(f"Processing frame {frame_nr + 1}/{len(frame_data)}...")
+    for frame_nr, frame_ints in enumerate(frame_data, start):
+        print(f"Processing frame {frame_nr + 1}/{len(frames)}...")
         
-        frame_ints = [int(x.strip()) for x in frame.strip().split(",") if x.strip() != '']
         assert len(frame_ints) == 25*25, "Each frame must contain exactly 25x25=625 pixel values."
         assert all(0 <= x <= 4095 for x in frame_ints), "Each pixel value must be between 0 and 4095."
         mapped_ints = list(map(lambda x: x >> 4, frame_ints))  # Map to 0-255 range by bitshift (divide by 16)
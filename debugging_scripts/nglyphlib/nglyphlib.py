@@ -0,0 +1,217 @@
+# nglyphlib - A library for random access to the frames of nglyph files.
+# Copyright (C) 2025  Sebastian Aigner (aka. SebiAi)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+import numpy as np
+
+# Matches one JSON token: a string, a structural character or a number/literal
+_JSON_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}:,]|[^\s\[\]{}:,"]+')
+
+class NGlyphFrameIndex:
+    """Random access to the AUTHOR rows (frames) of a v1 nglyph file.
+
+    The nglyph file is scanned once and the byte offset of every AUTHOR row is stored in a sidecar file
+    next to it. Later instances only read the sidecar and seek to the requested rows. The sidecar is
+    rebuilt automatically when the size or modification time of the nglyph file changes.
+
+    Note that the rows of a nglyph file with a watermark contain the encrypted AUTHOR data.
+    """
+
+    # Sidecar layout: magic, header (nglyph size, nglyph mtime in ns, number of rows, length of the fields json), fields json, row starts, row ends
+    SIDECAR_EXTENSION = ".frameidx"
+    _SIDECAR_MAGIC = b'NGLYIDX1'
+    _SIDECAR_HEADER = struct.Struct('<QQQQ')
+
+    class NGlyphFrameIndexException(Exception):
+        pass
+
+    def __init__(self, nglyph_path: str, sidecar_path: str | None = None):
+        """Opens the index of a nglyph file and builds it if needed.
+        Args:
+            nglyph_path (str): The path to the v1 nglyph file.
+            sidecar_path (str | None): Where to store the index. Defaults to the nglyph path with SIDECAR_EXTENSION appended.
+        Raises:
+            NGlyphFrameIndexException: If the nglyph file can't be read or is not a v1 nglyph file.
+        """
+        self.nglyph_path: str = nglyph_path
+        self.sidecar_path: str = sidecar_path if sidecar_path is not None else nglyph_path + NGlyphFrameIndex.SIDECAR_EXTENSION
+        # All top level fields of the nglyph file except AUTHOR
+        self.fields: dict[str, any] = {}
+        self._file_state: tuple[int, int] = (0, 0)
+        self._row_starts: np.ndarray = np.zeros(0, dtype='<u8')
+        self._row_ends: np.ndarray = np.zeros(0, dtype='<u8')
+
+        self._load()
+
+    def __len__(self) -> int:
+        self._check_up_to_date()
+        return len(self._row_starts)
+
+    def get_frame(self, frame_nr: int) -> list[int]:
+        """Returns the light values of a single frame.
+        Args:
+            frame_nr (int): The index of the frame. Negative values count from the end.
+        Returns:
+            list[int]: The light values of the frame.
+        """
+        n_frames = len(self)
+        if not -n_frames <= frame_nr < n_frames:
+            raise IndexError(f"Frame {frame_nr} is out of range (the nglyph file has {n_frames} frames).")
+        frame_nr %= n_frames
+        return self.get_frames(frame_nr, frame_nr + 1)[0]
+
+    def get_frames(self, start: int, stop: int) -> list[list[int]]:
+        """Returns the light values of the frames in the range [start, stop) with a single read.
+        Args:
+            start (int): The first frame.
+            stop (int): The frame after the last frame - clamped to the number of frames.
+        Returns:
+            list[list[int]]: The light values of each frame.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+
+        # Read from the start of the first to the end of the last row and cut out the rows
+        first_offset = int(self._row_starts[start])
+        with open(self.nglyph_path, 'rb') as f:
+            f.seek(first_offset)
+            data = f.read(int(self._row_ends[stop - 1]) - first_offset)
+        return [[int(value) for value in data[row_start - first_offset:row_end - first_offset].split(b',') if value.strip()] for row_start, row_end in zip(self._row_starts[start:stop].tolist(), self._row_ends[start:stop].tolist())]
+
+    def _get_file_state(self) -> tuple[int, int]:
+        try:
+            stat = os.stat(self.nglyph_path)
+        except OSError as e:
+            raise NGlyphFrameIndex.NGlyphFrameIndexException(f"Can't access the nglyph file '{self.nglyph_path}': {e}")
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _check_up_to_date(self) -> None:
+        # The nglyph file changed => the offsets are no longer valid
+        if self._get_file_state() != self._file_state:
+            self._load()
+
+    def _load(self) -> None:
+        self._file_state = self._get_file_state()
+        if not self._read_sidecar():
+            self._build()
+            self._write_sidecar()
+
+    def _read_sidecar(self) -> bool:
+        try:
+            with open(self.sidecar_path, 'rb') as f:
+                if f.read(len(NGlyphFrameIndex._SIDECAR_MAGIC)) != NGlyphFrameIndex._SIDECAR_MAGIC:
+                    return False
+                size, mtime_ns, n_rows, fields_length = NGlyphFrameIndex._SIDECAR_HEADER.unpack(f.read(NGlyphFrameIndex._SIDECAR_HEADER.size))
+                if (size, mtime_ns) != self._file_state:
+                    return False
+                fields = json.loads(f.read(fields_length))
+                row_offsets = np.frombuffer(f.read(n_rows * 2 * 8), dtype='<u8')
+        except (OSError, struct.error, ValueError):
+            # Missing or broken sidecar - just build it again
+            return False
+        if len(row_offsets) != n_rows * 2:
+            return False
+
+        self.fields = fields
+        self._row_starts, self._row_ends = row_offsets[:n_rows], row_offsets[n_rows:]
+        return True
+
+    def _write_sidecar(self) -> None:
+        fields_bytes = json.dumps(self.fields, separators=(',', ':')).encode('utf-8')
+        try:
+            # Write to a temporary file first so other readers never see a half written sidecar
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.sidecar_path)), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(NGlyphFrameIndex._SIDECAR_MAGIC)
+                    f.write(NGlyphFrameIndex._SIDECAR_HEADER.pack(*self._file_state, len(self._row_starts), len(fields_bytes)))
+                    f.write(fields_bytes)
+                    f.write(self._row_starts.astype('<u8').tobytes())
+                    f.write(self._row_ends.astype('<u8').tobytes())
+                os.replace(temp_path, self.sidecar_path)
+            except OSError:
+                os.remove(temp_path)
+                raise
+        except OSError:
+            # Not being able to store the index is fine, it only has to be built again next time
+            pass
+
+    def _build(self) -> None:
+        try:
+            with open(self.nglyph_path, 'rb') as f:
+                # mmap can't map empty files
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise NGlyphFrameIndex.NGlyphFrameIndexException(f"The nglyph file '{self.nglyph_path}' is empty.")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    row_starts, row_ends, author_start, author_end = NGlyphFrameIndex._scan_author_rows(data)
+                    # Parse everything except the AUTHOR rows
+                    fields = json.loads(data[:author_start] + b'[]' + data[author_end:])
+        except OSError as e:
+            raise NGlyphFrameIndex.NGlyphFrameIndexException(f"Can't read the nglyph file '{self.nglyph_path}': {e}")
+        except ValueError as e:
+            raise NGlyphFrameIndex.NGlyphFrameIndexException(f"The nglyph file '{self.nglyph_path}' is not a valid v1 nglyph file: {e}")
+
+        if not isinstance(fields, dict) or fields.get('VERSION', None) != 1:
+            raise NGlyphFrameIndex.NGlyphFrameIndexException(f"The nglyph file '{self.nglyph_path}' is not a v1 nglyph file. Version 2 files can be memory-mapped directly.")
+        del fields['AUTHOR']
+
+        self.fields = fields
+        self._row_starts = np.array(row_starts, dtype='<u8')
+        self._row_ends = np.array(row_ends, dtype='<u8')
+
+    @staticmethod
+    def _scan_author_rows(data: mmap.mmap) -> tuple[list[int], list[int], int, int]:
+        # Walk the JSON tokens of the top level object until the end of the AUTHOR array
+        # Returns the start and end offsets of the content of each row and the offsets of the AUTHOR array itself
+        row_starts: list[int] = []
+        row_ends: list[int] = []
+        depth = 0
+        expect_key = False
+        key = b''
+        author_start = -1
+        for match in _JSON_TOKEN_PATTERN.finditer(data):
+            token = match.group()
+            if token == b'{' or token == b'[':
+                depth += 1
+                expect_key = token == b'{' and depth == 1
+                if depth == 2 and key == b'"AUTHOR"':
+                    if token != b'[':
+                        raise ValueError("AUTHOR is not an array")
+                    author_start = match.start()
+            elif token == b'}' or token == b']':
+                depth -= 1
+                if depth == 1 and author_start != -1:
+                    return (row_starts, row_ends, author_start, match.end())
+            elif token == b',':
+                expect_key = depth == 1
+            elif token == b':':
+                continue
+            elif expect_key:
+                key = token
+                expect_key = False
+            elif author_start != -1 and depth == 2:
+                if not token.startswith(b'"'):
+                    raise ValueError("AUTHOR contains an element that is not a string")
+                row_starts.append(match.start() + 1)
+                row_ends.append(match.end() - 1)
+        raise ValueError("No AUTHOR array found")